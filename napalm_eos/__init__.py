@@ -13,12 +13,53 @@
 # the License.
 
 """napalm_eos package."""
-from napalm_eos.eos import EOSDriver
-import pkg_resources
-
-try:
-    __version__ = pkg_resources.get_distribution('napalm-eos').version
-except pkg_resources.DistributionNotFound:
-    __version__ = "Not installed"
+import sys
+import types
 
 __all__ = ('EOSDriver',)
+
+
+def _get_version():
+    try:
+        from importlib import metadata
+    except ImportError:
+        metadata = None
+    if metadata is not None:
+        try:
+            return metadata.version('napalm-eos')
+        except metadata.PackageNotFoundError:
+            return "Not installed"
+
+    import pkg_resources
+    try:
+        return pkg_resources.get_distribution('napalm-eos').version
+    except pkg_resources.DistributionNotFound:
+        return "Not installed"
+
+
+class _Package(types.ModuleType):
+    """
+    The napalm_eos module, loading the driver, with napalm_base, and the version when first
+    used. A module subclass rather than a module __getattr__, which needs Python 3.7.
+    """
+
+    def __getattr__(self, name):
+        if name == 'EOSDriver':
+            from napalm_eos.eos import EOSDriver
+            value = EOSDriver
+        elif name == '__version__':
+            value = _get_version()
+        else:
+            raise AttributeError("module 'napalm_eos' has no attribute '{}'".format(name))
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(['EOSDriver', '__version__']))
+
+
+_package = _Package(__name__, __doc__)
+_package.__dict__.update(sys.modules[__name__].__dict__)
+# python 2 clears the globals of a module once it is collected, _get_version needs them
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
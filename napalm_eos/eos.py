@@ -21,32 +21,35 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 # std libs
+import os
 import re
+import sys
 import time
 
-from datetime import datetime
 from collections import defaultdict
-from netaddr import IPAddress
-from netaddr import IPNetwork
-
-from netaddr.core import AddrFormatError
-
-# third party libs
-import pyeapi
-from pyeapi.eapilib import ConnectionError
+from collections import deque
+from contextlib import contextmanager
 
 # NAPALM base
-import napalm_base.helpers
 from napalm_base.base import NetworkDriver
 from napalm_base.utils import string_parsers
 from napalm_base.utils import py23_compat
 from napalm_base.exceptions import ConnectionException, MergeConfigException, \
-                        ReplaceConfigException, SessionLockedException, CommandErrorException
+                        ReplaceConfigException, CommandErrorException
 
 import napalm_base.constants as c
 # local modules
-# here add local imports
-# e.g. import napalm_eos.helpers etc.
+from napalm_eos.utils import normalize
+from napalm_eos.utils import session_lock
+from napalm_eos.utils.lazy import LazyModule
+from napalm_eos.utils.records import ArpEntry, MacEntry, RouteEntry
+
+# imported when first used: pyeapi once a driver is opened, the others by the getters and
+# methods needing them
+pyeapi = LazyModule('pyeapi')
+netaddr = LazyModule('netaddr')
+helpers = LazyModule('napalm_base.helpers')
+template_cache = LazyModule('napalm_eos.utils.template_cache')
 
 
 class EOSDriver(NetworkDriver):
@@ -62,6 +65,16 @@ class EOSDriver(NetworkDriver):
     _RE_SNMP_COMM = re.compile(r"""^snmp-server\s+community\s+(?P<community>\S+)
                                 (\s+view\s+(?P<view>\S+))?(\s+(?P<access>ro|rw)?)
                                 (\s+ipv6\s+(?P<v6_acl>\S+))?(\s+(?P<v4_acl>\S+))?$""", re.VERBOSE)
+    _RE_CHECKPOINT = re.compile(r'\s(?P<name>rollback-(?P<timestamp>\d+)-(?P<hash>[0-9a-f]{32}))$')
+    _RE_MD5 = re.compile(r'[0-9a-f]{32}')
+    _RE_OPTICS_LANE = re.compile(r'^(?P<port>.+)/(?P<lane>\d+)$')
+    _RE_CLI_ERROR = re.compile(r'CLI command (?P<index>\d+) of (?P<total>\d+)')
+
+    _OPTICS_METRICS = (
+        ('input_power', 'rxPower'),
+        ('output_power', 'txPower'),
+        ('laser_bias_current', 'txBias'),
+    )
 
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         """Constructor."""
@@ -75,6 +88,7 @@ class EOSDriver(NetworkDriver):
 
         if optional_args is None:
             optional_args = {}
+        self.optional_args = optional_args
 
         # eos_transport is there for backwards compatibility, transport is the preferred method
         self.transport = optional_args.get('transport', optional_args.get('eos_transport', 'https'))
@@ -86,12 +100,87 @@ class EOSDriver(NetworkDriver):
 
         self.enablepwd = optional_args.get('enable_password', '')
 
+        # how long to wait for another config session to go away before giving up
+        self.lock_timeout = optional_args.get('lock_timeout', 0)
+        self.lock_backoff = optional_args.get('lock_backoff', 0.5)
+
+        self.rollback_checkpoints = optional_args.get('rollback_checkpoints', 1)
+
+        # send the commands of cli in eAPI requests of cli_batch commands, True for all of
+        # them at once, instead of one request per command, and get their outputs as
+        # cli_encoding, 'text' or 'json'
+        self.cli_batch = optional_args.get('cli_batch', 0)
+        self.cli_encoding = optional_args.get('cli_encoding', 'text')
+
+        # only fetch these interfaces in get_interfaces and get_interfaces_counters, either an
+        # EOS range such as 'Ethernet1-4,49/1' or a list of names, see also interfaces_filter
+        self.interfaces = optional_args.get('interfaces')
+        # use 'show interfaces counters' instead of the full 'show interfaces'
+        self.lightweight_counters = optional_args.get('lightweight_counters', False)
+
+        # number of get_optics samples avg/min/max are computed over, 0 to disable
+        self.optics_window = optional_args.get('optics_window', 0)
+        # report the lanes of a transceiver as channels of a single port
+        self.optics_lanes = optional_args.get('optics_lanes', False)
+        self._optics_samples = {}
+
+        # return the rows of get_arp_table, get_mac_address_table and get_route_to as slotted,
+        # read-only mappings sharing their interface, VRF and protocol names: to_dict() or
+        # records.json_default turn them into dicts
+        self.compact_tables = optional_args.get('compact_tables', False)
+        # return get_arp_table, get_mac_address_table and get_interfaces_counters as columns:
+        # True for NumPy structured arrays when NumPy is installed, 'array' for typed arrays
+        self.columnar_tables = optional_args.get('columnar_tables', False)
+
+        # collect the timings of the eAPI calls and getters, either an Instrumentation or True
+        self.instrumentation = optional_args.get('instrumentation')
+        if self.instrumentation is True:
+            from napalm_eos.utils.instrumentation import Instrumentation
+            self.instrumentation = Instrumentation()
+        if self.instrumentation is not None:
+            self._instrument_getters()
+
+        # profile one call in profile_sample of the profile_getters (all of them by default)
+        # with cProfile and tracemalloc, leaving the reports in profile_dir
+        self.profiler = None
+        if optional_args.get('profile_dir'):
+            from napalm_eos.utils.profiling import Profiler, profile_getters
+            self.profiler = Profiler(optional_args['profile_dir'],
+                                     getters=optional_args.get('profile_getters'),
+                                     sample=optional_args.get('profile_sample', 1))
+            profile_getters(self, self.profiler)
+
+        # path of an archive to append every eAPI call to, or to answer them from instead of
+        # connecting to the device
+        self.record = optional_args.get('record')
+        self.replay = optional_args.get('replay')
+
         self.profile = ["eos"]
 
+    def _table_entry(self, record):
+        # build the rows of a table getter, plain dicts unless compact_tables is set
+        return record if self.compact_tables else dict
+
+    def _columnar(self, table, *outputs):
+        # imported when used, NumPy taking a while to import
+        from napalm_eos.utils import columnar
+        structured = columnar.use_numpy(self.columnar_tables)
+        return getattr(columnar, table)(*outputs, structured=structured)
+
+    def _instrument_getters(self):
+        # wrapped on the instance only, so nothing is paid when instrumentation is off
+        for name in dir(self):
+            if name.startswith('get_') or name == 'cli':
+                setattr(self, name, self.instrumentation.wrap_getter(name, getattr(self, name)))
+
     def open(self):
         """Implementation of NAPALM method open."""
         try:
-            if self.transport in ('http', 'https'):
+            if self.replay is not None:
+                from napalm_eos.utils.archive import ReplayDevice
+                if self.device is None:
+                    self.device = ReplayDevice(self.replay)
+            elif self.transport in ('http', 'https'):
                 connection = pyeapi.client.connect(
                     transport=self.transport,
                     host=self.hostname,
@@ -107,11 +196,21 @@ class EOSDriver(NetworkDriver):
 
             if self.device is None:
                 self.device = pyeapi.client.Node(connection, enablepwd=self.enablepwd)
+            # the optional wrappers are imported when used, to keep importing the driver fast
+            if self.record is not None and self.replay is None:
+                from napalm_eos.utils.archive import RecordingDevice
+                from napalm_eos.utils.instrumentation import InstrumentedDevice
+                if not isinstance(self.device, (RecordingDevice, InstrumentedDevice)):
+                    self.device = RecordingDevice(self.device, self.record)
+            if self.instrumentation is not None:
+                from napalm_eos.utils.instrumentation import InstrumentedDevice
+                if not isinstance(self.device, InstrumentedDevice):
+                    self.device = InstrumentedDevice(self.device, self.instrumentation)
             # does not raise an Exception if unusable
 
             # let's try to run a very simple command
             self.device.run_commands(['show clock'], encoding='text')
-        except ConnectionError as ce:
+        except pyeapi.eapilib.ConnectionError as ce:
             # and this is raised either if device not avaiable
             # either if HTTP(S) agent is not enabled
             # show management api http-commands
@@ -120,24 +219,38 @@ class EOSDriver(NetworkDriver):
     def close(self):
         """Implementation of NAPALM method close."""
         self.discard_config()
+        # a recorded archive is a single gzip stream, ended on close
+        close_archive = getattr(self.device, 'close_archive', None)
+        if close_archive is not None:
+            close_archive()
 
     def is_alive(self):
         return {
             'is_alive': True  # always true as eAPI is HTTP-based
         }
 
-    def _lock(self):
-        if self.config_session is None:
-            self.config_session = 'napalm_{}'.format(datetime.now().microsecond)
-        sess = self.device.run_commands(['show configuration sessions'])[0]['sessions']
-        if [k for k, v in sess.items() if v['state'] == 'pending' and k != self.config_session]:
-            raise SessionLockedException('Session is already in use')
+    def _run_locked(self, commands):
+        """
+        Run commands inside our config session, taking the session lock before the first ones.
+
+        The lock is waited for with exponential backoff until ``lock_timeout`` expires, see
+        napalm_eos.utils.session_lock. Once we own a session, subsequent batches skip it.
+        """
+        if self.locked:
+            return self.device.run_commands(
+                ['configure session {}'.format(self.config_session)] + commands)
+
+        lock = session_lock.SessionLock(self.device, self.lock_timeout, self.lock_backoff)
+        try:
+            output = lock.acquire(commands)
+        finally:
+            self.config_session = lock.session
+        self.locked = True
+        return output
 
     def _load_config(self, filename=None, config=None, replace=True):
         commands = []
 
-        self._lock()
-        commands.append('configure session {}'.format(self.config_session))
         if replace:
             commands.append('rollback clean-config')
 
@@ -159,7 +272,7 @@ class EOSDriver(NetworkDriver):
             commands.append(line)
 
         try:
-            self.device.run_commands(commands)
+            self._run_locked(commands)
         except pyeapi.eapilib.CommandError as e:
             self.discard_config()
             if replace:
@@ -187,16 +300,63 @@ class EOSDriver(NetworkDriver):
 
             return result.strip()
 
+    def _parse_checkpoints(self, dir_output):
+        checkpoints = []
+        for line in dir_output.splitlines():
+            match = self._RE_CHECKPOINT.search(line.rstrip())
+            if match:
+                checkpoints.append({
+                    'file': 'flash:{}'.format(match.group('name')),
+                    'timestamp': int(match.group('timestamp')),
+                    'hash': match.group('hash'),
+                })
+        return sorted(checkpoints, key=lambda cp: cp['timestamp'], reverse=True)
+
+    def _get_checkpoints(self):
+        """Return the rollback checkpoints stored on flash, most recent first."""
+        output = self.device.run_commands(['dir flash:'], encoding='text')[0]['output']
+        return self._parse_checkpoints(output)
+
+    def _checkpoint_commands(self):
+        """
+        Return the commands that checkpoint the startup-config before a commit, and those
+        deleting the oldest checkpoints to keep ``rollback_checkpoints`` of them once it is done.
+
+        Checkpoints are named rollback-<timestamp>-<md5> so their metadata comes for free
+        with a directory listing. The startup-config is only copied when it differs from
+        the most recent checkpoint.
+        """
+        dir_output, verify_output = self.device.run_commands(
+            ['dir flash:', 'verify /md5 flash:startup-config'], encoding='text')
+        checkpoints = self._parse_checkpoints(dir_output['output'])
+        match = self._RE_MD5.search(verify_output['output'])
+        if match is None:
+            raise CommandErrorException(
+                'Cannot checkpoint the startup-config: {}'.format(verify_output['output'].strip()))
+        startup_hash = match.group(0)
+
+        commands = []
+        if not checkpoints or checkpoints[0]['hash'] != startup_hash:
+            name = 'rollback-{}-{}'.format(int(time.time()), startup_hash)
+            commands.append('copy startup-config flash:{}'.format(name))
+            checkpoints.insert(0, {'file': 'flash:{}'.format(name)})
+        prune = ['delete {}'.format(checkpoint['file'])
+                 for checkpoint in checkpoints[max(self.rollback_checkpoints, 1):]]
+        return commands, prune
+
     def commit_config(self):
         """Implementation of NAPALM method commit_config."""
-        commands = []
-        commands.append('copy startup-config flash:rollback-0')
+        commands, prune = self._checkpoint_commands()
         commands.append('configure session {}'.format(self.config_session))
         commands.append('commit')
         commands.append('write memory')
 
         self.device.run_commands(commands)
         self.config_session = None
+        self.locked = False
+        # only once the new checkpoint is there and the commit went through
+        if prune:
+            self.device.run_commands(prune)
 
     def discard_config(self):
         """Implementation of NAPALM method discard_config."""
@@ -206,26 +366,87 @@ class EOSDriver(NetworkDriver):
             commands.append('abort')
             self.device.run_commands(commands)
             self.config_session = None
+            self.locked = False
+
+    def _rollback(self, checkpoint=0):
+        """Replace the configuration with a checkpoint, 0 being the most recent one."""
+        checkpoints = self._get_checkpoints()
+        if checkpoint < len(checkpoints):
+            rollback_file = checkpoints[checkpoint]['file']
+        elif checkpoint == 0:
+            # checkpoint taken by an older version of the driver
+            rollback_file = 'flash:rollback-0'
+        else:
+            raise ReplaceConfigException(
+                'Rollback checkpoint {} not found, {} available'.format(
+                    checkpoint, len(checkpoints)))
 
-    def rollback(self):
-        """Implementation of NAPALM method rollback."""
         commands = []
-        commands.append('configure replace flash:rollback-0')
+        commands.append('configure replace {}'.format(rollback_file))
         commands.append('write memory')
         self.device.run_commands(commands)
 
+    def rollback(self):
+        """Implementation of NAPALM method rollback."""
+        self._rollback(0)
+
+    def _template_search_path(self):
+        # same lookup as napalm_base.helpers.load_template
+        module_file = sys.modules[type(self).__module__].__file__
+        return (os.path.join(os.path.dirname(os.path.abspath(module_file)), 'templates'),)
+
+    def load_template(self, template_name, template_source=None, template_path=None,
+                      **template_vars):
+        """Implementation of NAPALM method load_template using the compiled template cache."""
+        # a keyword of napalm_base>=1.0, left to it along with the templates it looks up
+        openconfig = template_vars.pop('openconfig', False)
+        if template_source is not None or template_path is not None or openconfig:
+            if openconfig:
+                template_vars['openconfig'] = openconfig
+            return super(EOSDriver, self).load_template(template_name,
+                                                        template_source=template_source,
+                                                        template_path=template_path,
+                                                        **template_vars)
+        configuration = template_cache.render(template_name, self._template_search_path(),
+                                              **template_vars)
+        return self.load_merge_candidate(config=configuration)
+
+    def _interface_range(self):
+        """Return the interface range to append to a show command."""
+        if not self.interfaces:
+            return ''
+        if isinstance(self.interfaces, py23_compat.string_types):
+            return ' {}'.format(self.interfaces)
+        return ' {}'.format(','.join(self.interfaces))
+
+    def _run_interfaces_commands(self, commands):
+        """
+        Run show interfaces commands filtered by ``interfaces``, with empty outputs when none
+        of the interfaces exists. An invalid range raises CommandErrorException.
+        """
+        try:
+            return self.device.run_commands(commands)
+        except pyeapi.eapilib.CommandError as e:
+            if not self.interfaces:
+                raise
+            if 'does not exist' in '{}'.format(e.command_error):
+                return [{'interfaces': {}} for command in commands]
+            raise CommandErrorException(
+                'Invalid interfaces filter {!r}: {}'.format(self.interfaces, e.message))
+
     def get_facts(self):
         """Implementation of NAPALM method get_facts."""
         commands = []
         commands.append('show version')
         commands.append('show hostname')
-        commands.append('show interfaces')
+        # the names only, without the status and counters of 'show interfaces'
+        commands.append('show interfaces description')
 
         result = self.device.run_commands(commands)
 
         version = result[0]
         hostname = result[1]
-        interfaces_dict = result[2]['interfaces']
+        interfaces_dict = result[2]['interfaceDescriptions']
 
         uptime = time.time() - version['bootupTimestamp']
 
@@ -245,8 +466,8 @@ class EOSDriver(NetworkDriver):
 
     def get_interfaces(self):
         commands = []
-        commands.append('show interfaces')
-        output = self.device.run_commands(commands)[0]
+        commands.append('show interfaces{}'.format(self._interface_range()))
+        output = self._run_interfaces_commands(commands)[0]
 
         interfaces = {}
 
@@ -268,8 +489,8 @@ class EOSDriver(NetworkDriver):
             interfaces[interface]['last_flapped'] = values.pop('lastStatusChangeTimestamp', None)
 
             interfaces[interface]['speed'] = int(values['bandwidth'] * 1e-6)
-            interfaces[interface]['mac_address'] = napalm_base.helpers.convert(
-                napalm_base.helpers.mac, values.pop('physicalAddress', u''))
+            interfaces[interface]['mac_address'] = helpers.convert(
+                normalize.mac, values.pop('physicalAddress', u''))
 
         return interfaces
 
@@ -294,8 +515,14 @@ class EOSDriver(NetworkDriver):
         return lldp
 
     def get_interfaces_counters(self):
-        commands = ['show interfaces']
-        output = self.device.run_commands(commands)
+        interface_range = self._interface_range()
+        if self.lightweight_counters:
+            return self._get_interfaces_counters_light(interface_range)
+
+        commands = ['show interfaces{}'.format(interface_range)]
+        output = self._run_interfaces_commands(commands)
+        if self.columnar_tables:
+            return self._columnar('interfaces_counters', output[0]['interfaces'])
         interface_counters = defaultdict(dict)
         for interface, data in output[0]['interfaces'].items():
             if data['hardware'] == 'subinterface':
@@ -318,6 +545,38 @@ class EOSDriver(NetworkDriver):
             )
         return interface_counters
 
+    def _get_interfaces_counters_light(self, interface_range):
+        """get_interfaces_counters from the counter-specific commands only."""
+        commands = [
+            'show interfaces{} counters'.format(interface_range),
+            'show interfaces{} counters errors'.format(interface_range)
+        ]
+        counters_output, errors_output = self._run_interfaces_commands(commands)
+        errors = errors_output.get('interfaceErrorCounters', {})
+        if self.columnar_tables:
+            return self._columnar('interfaces_counters', counters_output['interfaces'], errors)
+        interface_counters = defaultdict(dict)
+        for interface, counters in counters_output['interfaces'].items():
+            if '.' in interface:
+                # Subinterfaces will never have counters
+                continue
+            interface_errors = errors.get(interface, {})
+            interface_counters[interface].update(
+                tx_octets=counters.get('outOctets', -1),
+                rx_octets=counters.get('inOctets', -1),
+                tx_unicast_packets=counters.get('outUcastPkts', -1),
+                rx_unicast_packets=counters.get('inUcastPkts', -1),
+                tx_multicast_packets=counters.get('outMulticastPkts', -1),
+                rx_multicast_packets=counters.get('inMulticastPkts', -1),
+                tx_broadcast_packets=counters.get('outBroadcastPkts', -1),
+                rx_broadcast_packets=counters.get('inBroadcastPkts', -1),
+                tx_discards=counters.get('outDiscards', -1),
+                rx_discards=counters.get('inDiscards', -1),
+                tx_errors=interface_errors.get('outErrors', -1),
+                rx_errors=interface_errors.get('inErrors', -1)
+            )
+        return interface_counters
+
     def get_bgp_neighbors(self):
 
         def get_re_group(res, key, default=None):
@@ -373,7 +632,7 @@ class EOSDriver(NetworkDriver):
                         'is_enabled': is_enabled,
                         'uptime': int(time.time() - peer_data['upDownTime'])
                     }
-                    bgp_counters[vrf]['peers'][napalm_base.helpers.ip(peer)] = peer_info
+                    bgp_counters[vrf]['peers'][normalize.ip(peer)] = peer_info
         lines = []
         [lines.extend(x['output'].splitlines()) for x in output_neighbor_cmds]
         while lines:
@@ -404,7 +663,7 @@ class EOSDriver(NetworkDriver):
             local_as = re.match(self._RE_BGP_LOCAL, lines.pop(0))
             data = {
                 'remote_as': int(neighbor_info.group('as')),
-                'remote_id': napalm_base.helpers.ip(get_re_group(rid_info, 'rid', '0.0.0.0')),
+                'remote_id': normalize.ip(get_re_group(rid_info, 'rid', '0.0.0.0')),
                 'local_as': int(local_as.group('as')),
                 'description': py23_compat.text_type(desc),
                 'address_family': {
@@ -420,7 +679,7 @@ class EOSDriver(NetworkDriver):
                     }
                 }
             }
-            peer_addr = napalm_base.helpers.ip(neighbor_info.group('neighbor'))
+            peer_addr = normalize.ip(neighbor_info.group('neighbor'))
             vrf = rid_info.group('vrf')
             if peer_addr not in bgp_counters[vrf]['peers']:
                 bgp_counters[vrf]['peers'][peer_addr] = {
@@ -534,7 +793,7 @@ class EOSDriver(NetworkDriver):
                 capabilities_list.sort()
                 remote_chassis_id = neighbor.get('chassisId', u'')
                 if neighbor.get("chassisIdType", u'') == "macAddress":
-                    remote_chassis_id = napalm_base.helpers.mac(remote_chassis_id)
+                    remote_chassis_id = normalize.mac(remote_chassis_id)
                 neighbor_interface_info = neighbor.get('neighborInterfaceInfo', {})
                 lldp_neighbors_out[interface].append(
                     {
@@ -559,10 +818,13 @@ class EOSDriver(NetworkDriver):
         if type(commands) is not list:
             raise TypeError('Please enter a valid list of commands!')
 
+        if self.cli_batch:
+            return self._cli_batched(commands)
+
         for command in commands:
             try:
-                cli_output[py23_compat.text_type(command)] = self.device.run_commands(
-                    [command], encoding='text')[0].get('output')
+                cli_output[py23_compat.text_type(command)] = self._cli_result(
+                    self.device.run_commands([command], encoding=self.cli_encoding)[0])
                 # not quite fair to not exploit rum_commands
                 # but at least can have better control to point to wrong command in case of failure
             except pyeapi.eapilib.CommandError:
@@ -579,6 +841,74 @@ class EOSDriver(NetworkDriver):
 
         return cli_output
 
+    def _cli_result(self, result):
+        return result if self.cli_encoding == 'json' else result.get('output')
+
+    def _failed_cli_command(self, error, batch_size):
+        """Index in a batch of cli_batch commands of the one failing with ``error``, or None."""
+        if batch_size == 1:
+            return 0
+        # 'CLI command 3 of 5 ...' counting the enable command pyeapi sends first
+        match = self._RE_CLI_ERROR.search(error.error_text or '')
+        if match is None:
+            return None
+        index = int(match.group('index')) - 1 - (int(match.group('total')) - batch_size)
+        return index if 0 <= index < batch_size else None
+
+    def _cli_batched(self, commands):
+        """
+        cli sending cli_batch commands per eAPI request. The commands after a failing one
+        are sent in the next request, and when a failure can not be attributed to a command
+        the commands left are sent one at a time. CommandErrorException is raised once
+        every command ran, with the outputs and the errors of all of them.
+        """
+        cli_output = {}
+        failed = False
+        size = len(commands) if self.cli_batch is True else self.cli_batch
+        pending = list(commands)
+
+        while pending:
+            batch = pending[:size]
+            try:
+                results = self.device.run_commands(batch, encoding=self.cli_encoding)
+            except pyeapi.eapilib.CommandError as e:
+                index = self._failed_cli_command(e, len(batch))
+                if index is None:
+                    size = 1
+                    continue
+                # the outputs of the commands before the failing one, and its error
+                results = list(e.output or [])[-index - 1:]
+                error = results.pop() if results else {}
+                if len(results) != index:
+                    # no outputs in the error, run the commands before the failing one again
+                    size = index
+                    continue
+                command = batch[index]
+                msg = 'Invalid command: "{cmd}"'.format(cmd=command)
+                if error.get('errors'):
+                    msg += ' ({})'.format(', '.join(error['errors']))
+                cli_output[py23_compat.text_type(command)] = msg
+                failed = True
+                batch = batch[:index]
+                pending = pending[index + 1:]
+            except Exception as e:
+                if len(batch) > 1:
+                    size = 1
+                    continue
+                command = batch[0]
+                msg = 'Unable to execute command "{cmd}": {err}'.format(cmd=command, err=e)
+                cli_output[py23_compat.text_type(command)] = msg
+                raise CommandErrorException(str(cli_output))
+            else:
+                pending = pending[len(batch):]
+
+            for command, result in zip(batch, results):
+                cli_output[py23_compat.text_type(command)] = self._cli_result(result)
+
+        if failed:
+            raise CommandErrorException(str(cli_output))
+        return cli_output
+
     def get_bgp_config(self, group='', neighbor=''):
         """Implementation of NAPALM method get_bgp_config."""
         _GROUP_FIELD_MAP_ = {
@@ -683,9 +1013,9 @@ class EOSDriver(NetworkDriver):
 
             if not default_value:
                 if len(options) > 1:
-                    field_value = napalm_base.helpers.convert(field_type,
-                                                              options[1],
-                                                              _DATATYPE_DEFAULT_.get(field_type))
+                    field_value = helpers.convert(field_type,
+                                                  options[1],
+                                                  _DATATYPE_DEFAULT_.get(field_type))
                 else:
                     if field_type is bool:
                         field_value = True
@@ -745,7 +1075,7 @@ class EOSDriver(NetworkDriver):
                 # will try to parse the neighbor name
                 # which sometimes is the IP Address of the neigbor
                 # or the name of the BGP group
-                IPAddress(group_or_neighbor)
+                netaddr.IPAddress(group_or_neighbor)
                 # if passes the test => it is an IP Address, thus a Neighbor!
                 peer_address = group_or_neighbor
                 if peer_address not in bgp_neighbors:
@@ -769,7 +1099,7 @@ class EOSDriver(NetworkDriver):
                 bgp_neighbors[peer_address].update(
                     parse_options(options, default_value)
                 )
-            except AddrFormatError:
+            except netaddr.AddrFormatError:
                 # exception trying to parse group name
                 # group_or_neighbor represents the name of the group
                 group_name = group_or_neighbor
@@ -794,6 +1124,7 @@ class EOSDriver(NetworkDriver):
     def get_arp_table(self):
 
         arp_table = []
+        entry = self._table_entry(ArpEntry)
 
         commands = ['show arp']
 
@@ -801,7 +1132,9 @@ class EOSDriver(NetworkDriver):
         try:
             ipv4_neighbors = self.device.run_commands(commands)[0].get('ipV4Neighbors', [])
         except pyeapi.eapilib.CommandError:
-            return []
+            pass
+        if self.columnar_tables:
+            return self._columnar('arp_table', ipv4_neighbors)
 
         for neighbor in ipv4_neighbors:
             interface = py23_compat.text_type(neighbor.get('interface'))
@@ -809,12 +1142,12 @@ class EOSDriver(NetworkDriver):
             ip = py23_compat.text_type(neighbor.get('address'))
             age = float(neighbor.get('age'))
             arp_table.append(
-                {
-                    'interface': interface,
-                    'mac': napalm_base.helpers.mac(mac_raw),
-                    'ip': napalm_base.helpers.ip(ip),
-                    'age': age
-                }
+                entry(
+                    interface=interface,
+                    mac=normalize.mac(mac_raw),
+                    ip=normalize.ip(ip),
+                    age=age
+                )
             )
 
         return arp_table
@@ -824,7 +1157,7 @@ class EOSDriver(NetworkDriver):
 
         raw_ntp_config = self.device.run_commands(commands, encoding='text')[0].get('output', '')
 
-        ntp_config = napalm_base.helpers.textfsm_extractor(self, 'ntp_peers', raw_ntp_config)
+        ntp_config = helpers.textfsm_extractor(self, 'ntp_peers', raw_ntp_config)
 
         return {py23_compat.text_type(ntp_peer.get('ntppeer')): {}
                 for ntp_peer in ntp_config if ntp_peer.get('ntppeer', '')}
@@ -902,7 +1235,7 @@ class EOSDriver(NetworkDriver):
             if iface_details.get('primaryIp', {}).get('address') != '0.0.0.0':
                 ipv4_list.append(
                     {
-                        'address': napalm_base.helpers.ip(iface_details.get(
+                        'address': normalize.ip(iface_details.get(
                             'primaryIp', {}).get('address')),
                         'masklen': iface_details.get('primaryIp', {}).get('maskLen')
                     }
@@ -910,7 +1243,7 @@ class EOSDriver(NetworkDriver):
             for secondary_ip in iface_details.get('secondaryIpsOrderedList', []):
                 ipv4_list.append(
                     {
-                        'address': napalm_base.helpers.ip(secondary_ip.get('address')),
+                        'address': normalize.ip(secondary_ip.get('address')),
                         'masklen': secondary_ip.get('maskLen')
                     }
                 )
@@ -935,9 +1268,8 @@ class EOSDriver(NetworkDriver):
 
             ipv6_list.append(
                 {
-                    'address': napalm_base.helpers.convert(
-                        napalm_base.helpers.ip, interface_details.get('linkLocal', {})
-                                                                 .get('address')),
+                    'address': helpers.convert(
+                        normalize.ip, interface_details.get('linkLocal', {}).get('address')),
                     'masklen': int(
                         interface_details.get('linkLocal', {}).get('subnet', '::/0').split('/')[-1])
                     # when no link-local set, address will be None and maslken 0
@@ -946,7 +1278,7 @@ class EOSDriver(NetworkDriver):
             for address in interface_details.get('addresses'):
                 ipv6_list.append(
                     {
-                        'address': napalm_base.helpers.ip(address.get('address')),
+                        'address': normalize.ip(address.get('address')),
                         'masklen': int(address.get('subnet').split('/')[-1])
                     }
                 )
@@ -963,11 +1295,14 @@ class EOSDriver(NetworkDriver):
     def get_mac_address_table(self):
 
         mac_table = []
+        entry = self._table_entry(MacEntry)
 
         commands = ['show mac address-table']
 
         mac_entries = self.device.run_commands(commands)[0].get(
             'unicastTable', {}).get('tableEntries', [])
+        if self.columnar_tables:
+            return self._columnar('mac_address_table', mac_entries)
 
         for mac_entry in mac_entries:
             vlan = mac_entry.get('vlanId')
@@ -977,21 +1312,22 @@ class EOSDriver(NetworkDriver):
             last_move = mac_entry.get('lastMove', 0.0)
             moves = mac_entry.get('moves', 0)
             mac_table.append(
-                {
-                    'mac': napalm_base.helpers.mac(mac_raw),
-                    'interface': interface,
-                    'vlan': vlan,
-                    'active': True,
-                    'static': static,
-                    'moves': moves,
-                    'last_move': last_move
-                }
+                entry(
+                    mac=normalize.mac(mac_raw),
+                    interface=interface,
+                    vlan=vlan,
+                    active=True,
+                    static=static,
+                    moves=moves,
+                    last_move=last_move
+                )
             )
 
         return mac_table
 
     def get_route_to(self, destination='', protocol=''):
         routes = {}
+        entry = self._table_entry(RouteEntry)
 
         # Placeholder for vrf arg
         vrf = ''
@@ -1008,9 +1344,9 @@ class EOSDriver(NetworkDriver):
 
         try:
             ipv = ''
-            if IPNetwork(destination).version == 6:
+            if netaddr.IPNetwork(destination).version == 6:
                 ipv = 'v6'
-        except AddrFormatError:
+        except netaddr.AddrFormatError:
             return 'Please specify a valid destination!'
 
         commands = []
@@ -1034,25 +1370,11 @@ class EOSDriver(NetworkDriver):
                 if prefix not in routes.keys():
                     routes[prefix] = []
                 route_protocol = route_details.get('routeType')
-                preference = route_details.get('preference', 0)
-
-                route = {
-                    'current_active': True,
-                    'last_active': True,
-                    'age': 0,
-                    'next_hop': u'',
-                    'protocol': route_protocol,
-                    'outgoing_interface': u'',
-                    'preference': preference,
-                    'inactive_reason': u'',
-                    'routing_table': _vrf,
-                    'selected_next_hop': True,
-                    'protocol_attributes': {}
-                }
+                route = self._rib_route(_vrf, route_details)
                 if protocol == 'bgp' or route_protocol.lower() in ('ebgp', 'ibgp'):
                     nexthop_interface_map = {}
                     for next_hop in route_details.get('vias'):
-                        nexthop_ip = napalm_base.helpers.ip(next_hop.get('nexthopAddr'))
+                        nexthop_ip = normalize.ip(next_hop.get('nexthopAddr'))
                         nexthop_interface_map[nexthop_ip] = next_hop.get('interface')
                     metric = route_details.get('metric')
                     command = 'show ip{ipv} bgp {destination} detail vrf {_vrf}'.format(
@@ -1069,10 +1391,10 @@ class EOSDriver(NetworkDriver):
                         bgp_route = route.copy()
                         as_path = bgp_route_details.get('asPathEntry', {}).get('asPath', u'')
                         remote_as = int(as_path.split()[-1])
-                        remote_address = napalm_base.helpers.ip(bgp_route_details.get(
+                        remote_address = normalize.ip(bgp_route_details.get(
                             'routeDetail', {}).get('peerEntry', {}).get('peerAddr', ''))
                         local_preference = bgp_route_details.get('localPreference')
-                        next_hop = napalm_base.helpers.ip(bgp_route_details.get('nextHop'))
+                        next_hop = normalize.ip(bgp_route_details.get('nextHop'))
                         active_route = bgp_route_details.get('routeType', {}).get('active', False)
                         last_active = active_route  # should find smth better
                         communities = bgp_route_details.get('routeDetail', {}).get(
@@ -1097,34 +1419,59 @@ class EOSDriver(NetworkDriver):
                                 'communities': communities
                             }
                         })
-                        routes[prefix].append(bgp_route)
+                        routes[prefix].append(entry(**bgp_route))
                 else:
-                    if route_details.get('routeAction') in ('drop',):
-                        route['next_hop'] = 'NULL'
-                    if route_details.get('routingDisabled') is True:
-                        route['last_active'] = False
-                        route['current_active'] = False
-                    for next_hop in route_details.get('vias'):
-                        route_next_hop = route.copy()
-                        if next_hop.get('nexthopAddr') is None:
-                            route_next_hop.update(
-                                {
-                                    'next_hop': '',
-                                    'outgoing_interface': next_hop.get('interface')
-                                }
-                            )
-                        else:
-                            route_next_hop.update(
-                                {
-                                    'next_hop': napalm_base.helpers.ip(next_hop.get('nexthopAddr')),
-                                    'outgoing_interface': next_hop.get('interface')
-                                }
-                            )
-                        routes[prefix].append(route_next_hop)
-                    if route_details.get('vias') == []:  # empty list
-                        routes[prefix].append(route)
+                    for route_next_hop in self._rib_next_hops(route, route_details):
+                        routes[prefix].append(entry(**route_next_hop))
         return routes
 
+    @staticmethod
+    def _rib_route(vrf, route_details):
+        # the attributes shared by all the next hops of a route of 'show ip route detail'
+        return {
+            'current_active': True,
+            'last_active': True,
+            'age': 0,
+            'next_hop': u'',
+            'protocol': route_details.get('routeType'),
+            'outgoing_interface': u'',
+            'preference': route_details.get('preference', 0),
+            'inactive_reason': u'',
+            'routing_table': vrf,
+            'selected_next_hop': True,
+            'protocol_attributes': {}
+        }
+
+    @staticmethod
+    def _rib_next_hops(route, route_details):
+        # a copy of route per next hop, as get_route_to returns the routes of the RIB
+        next_hops = []
+        if route_details.get('routeAction') in ('drop',):
+            route['next_hop'] = 'NULL'
+        if route_details.get('routingDisabled') is True:
+            route['last_active'] = False
+            route['current_active'] = False
+        for next_hop in route_details.get('vias'):
+            route_next_hop = route.copy()
+            if next_hop.get('nexthopAddr') is None:
+                route_next_hop.update(
+                    {
+                        'next_hop': '',
+                        'outgoing_interface': next_hop.get('interface')
+                    }
+                )
+            else:
+                route_next_hop.update(
+                    {
+                        'next_hop': normalize.ip(next_hop.get('nexthopAddr')),
+                        'outgoing_interface': next_hop.get('interface')
+                    }
+                )
+            next_hops.append(route_next_hop)
+        if route_details.get('vias') == []:  # empty list
+            next_hops.append(route)
+        return next_hops
+
     def get_snmp_information(self):
         """get_snmp_information() for EOS.  Re-written to not use TextFSM"""
 
@@ -1280,8 +1627,8 @@ class EOSDriver(NetworkDriver):
             for probe_index in range(probes):
                 host_name = hop_details[3+probe_index*5]
                 hop_addr = hop_details[4+probe_index*5]
-                ip_address = napalm_base.helpers.convert(
-                    napalm_base.helpers.ip, hop_addr, hop_addr
+                ip_address = helpers.convert(
+                    normalize.ip, hop_addr, hop_addr
                 )
                 rtt = hop_details[5+probe_index*5]
                 if rtt:
@@ -1324,7 +1671,7 @@ class EOSDriver(NetworkDriver):
 
             # Using preset template to extract peer info
             peer_info = (
-                napalm_base.helpers.textfsm_extractor(
+                helpers.textfsm_extractor(
                     self, 'bgp_detail', peer_output))
 
             for item in peer_info:
@@ -1350,31 +1697,31 @@ class EOSDriver(NetworkDriver):
 
                 # Converting certain fields into int
                 for key in int_fields:
-                    item[key] = napalm_base.helpers.convert(int, item[key], 0)
+                    item[key] = helpers.convert(int, item[key], 0)
 
                 # Conforming with the datatypes defined by the base class
                 item['export_policy'] = (
-                    napalm_base.helpers.convert(
+                    helpers.convert(
                         py23_compat.text_type, item['export_policy']))
                 item['last_event'] = (
-                    napalm_base.helpers.convert(
+                    helpers.convert(
                         py23_compat.text_type, item['last_event']))
-                item['remote_address'] = napalm_base.helpers.ip(item['remote_address'])
+                item['remote_address'] = normalize.ip(item['remote_address'])
                 item['previous_connection_state'] = (
-                    napalm_base.helpers.convert(
+                    helpers.convert(
                         py23_compat.text_type, item['previous_connection_state']))
                 item['import_policy'] = (
-                    napalm_base.helpers.convert(
+                    helpers.convert(
                         py23_compat.text_type, item['import_policy']))
                 item['connection_state'] = (
-                    napalm_base.helpers.convert(
+                    helpers.convert(
                         py23_compat.text_type, item['connection_state']))
                 item['routing_table'] = (
-                    napalm_base.helpers.convert(
+                    helpers.convert(
                         py23_compat.text_type, item['routing_table']))
-                item['router_id'] = napalm_base.helpers.ip(item['router_id'])
-                item['local_address'] = napalm_base.helpers.convert(
-                    napalm_base.helpers.ip, item['local_address'])
+                item['router_id'] = normalize.ip(item['router_id'])
+                item['local_address'] = helpers.convert(
+                    normalize.ip, item['local_address'])
 
                 peer_details.append(item)
 
@@ -1392,27 +1739,55 @@ class EOSDriver(NetworkDriver):
 
             bgp_dict[vrf_name][remote_as].append(peer_info)
 
-        commands = []
-        summary_commands = []
-        if not neighbor_address:
-            commands.append('show ip bgp neighbors vrf all')
-            commands.append('show ipv6 bgp neighbors vrf all')
-            summary_commands.append('show ip bgp summary vrf all')
-            summary_commands.append('show ipv6 bgp summary vrf all')
-        else:
-            try:
-                peer_ver = IPAddress(neighbor_address).version
-            except Exception as e:
-                raise e
+        def _neighbors_detail(neighbors):
+            """
+            Details of the given neighbors, all fetched in one request, and the summaries of
+            only the address families and VRFs they were found in, for their accepted prefixes.
+            """
+            afs = ['ipv6' if netaddr.IPAddress(neighbor).version == 6 else 'ip'
+                   for neighbor in neighbors]
+            commands = ['show {} bgp neighbors {} vrf all'.format(af, neighbor)
+                        for af, neighbor in zip(afs, neighbors)]
+            raw_output = self.device.run_commands(commands, encoding='text')
+            peers = [(af, peer_info) for af, output in zip(afs, raw_output)
+                     for peer_info in _parse_per_peer_bgp_detail(output['output'])]
+
+            summaries = sorted(set((af, peer_info['routing_table']) for af, peer_info in peers))
+            summary_commands = ['show {} bgp summary vrf {}'.format(af, vrf)
+                                for af, vrf in summaries]
+            bgp_summary = {}
+            if summary_commands:
+                bgp_summary = dict(zip(summaries, self.device.run_commands(
+                    summary_commands, encoding='json')))
+
+            bgp_detail_info = {}
+            for af, peer_info in peers:
+                vrf_name = peer_info['routing_table']
+                summary_peers = bgp_summary[af, vrf_name].get('vrfs', {}).get(
+                    vrf_name, {}).get('peers', {})
+                peer_info['accepted_prefix_count'] = summary_peers.get(
+                    peer_info['remote_address'], {}).get('prefixAccepted', 0)
+                _append(bgp_detail_info, peer_info)
+            return bgp_detail_info
+
+        if neighbor_address:
+            # a neighbor or a list of them
+            if isinstance(neighbor_address, py23_compat.string_types):
+                neighbor_address = [neighbor_address]
+            neighbors = []
+            for neighbor in neighbor_address:
+                if neighbor not in neighbors:
+                    neighbors.append(neighbor)
+            return _neighbors_detail(neighbors)
 
-            if peer_ver == 4:
-                commands.append('show ip bgp neighbors %s vrf all' %
-                                neighbor_address)
-                summary_commands.append('show ip bgp summary vrf all')
-            elif peer_ver == 6:
-                commands.append('show ipv6 bgp neighbors %s vrf all' %
-                                neighbor_address)
-                summary_commands.append('show ipv6 bgp summary vrf all')
+        commands = [
+            'show ip bgp neighbors vrf all',
+            'show ipv6 bgp neighbors vrf all'
+        ]
+        summary_commands = [
+            'show ip bgp summary vrf all',
+            'show ipv6 bgp summary vrf all'
+        ]
 
         raw_output = (
             self.device.run_commands(commands, encoding='text'))
@@ -1421,21 +1796,9 @@ class EOSDriver(NetworkDriver):
 
         bgp_detail_info = {}
 
-        v4_peer_info = []
-        v6_peer_info = []
-
-        if neighbor_address:
-            peer_info = _parse_per_peer_bgp_detail(raw_output[0]['output'])
-
-            if peer_ver == 4:
-                v4_peer_info.append(peer_info[0])
-            else:
-                v6_peer_info.append(peer_info[0])
-
-        else:
-            # Using preset template to extract peer info
-            v4_peer_info = _parse_per_peer_bgp_detail(raw_output[0]['output'])
-            v6_peer_info = _parse_per_peer_bgp_detail(raw_output[1]['output'])
+        # Using preset template to extract peer info
+        v4_peer_info = _parse_per_peer_bgp_detail(raw_output[0]['output'])
+        v6_peer_info = _parse_per_peer_bgp_detail(raw_output[1]['output'])
 
         for peer_info in v4_peer_info:
 
@@ -1463,8 +1826,65 @@ class EOSDriver(NetworkDriver):
 
         return bgp_detail_info
 
+    def _optics_channels(self, output):
+        """Map each interface of 'show interfaces transceiver' to a (port, channel index)."""
+        channels = {interface: (interface, 0) for interface in output}
+        if not self.optics_lanes:
+            return channels
+
+        # lanes of the same transceiver, e.g. Ethernet3/1/1-4, share the serial number
+        transceivers = defaultdict(list)
+        for interface, values in output.items():
+            match = self._RE_OPTICS_LANE.match(interface)
+            if match and values.get('vendorSn'):
+                transceivers[(match.group('port'), values['vendorSn'])].append(
+                    (interface, int(match.group('lane'))))
+        for (port, _), lanes in transceivers.items():
+            if len(lanes) > 1:
+                for interface, lane in lanes:
+                    channels[interface] = (port, lane - 1)
+        return channels
+
+    def _optics_state(self, port, index, values):
+        instant = [values.get(key) for _, key in self._OPTICS_METRICS]
+
+        if not self.optics_window:
+            # avg, min and max are not returned by the device
+            return {
+                metric: {
+                    'instant': value if value is not None else 0.0,
+                    'avg': 0.0,
+                    'min': 0.0,
+                    'max': 0.0
+                }
+                for (metric, _), value in zip(self._OPTICS_METRICS, instant)
+            }
+
+        samples = self._optics_samples.get((port, index))
+        if samples is None or samples.maxlen != self.optics_window:
+            samples = self._optics_samples[(port, index)] = deque(samples or (),
+                                                                  maxlen=self.optics_window)
+        samples.append(instant)
+
+        state = {}
+        for position, (metric, _) in enumerate(self._OPTICS_METRICS):
+            window = [sample[position] for sample in samples if sample[position] is not None]
+            state[metric] = {
+                'instant': instant[position] if instant[position] is not None else 0.0,
+                'avg': sum(window) / len(window) if window else 0.0,
+                'min': min(window) if window else 0.0,
+                'max': max(window) if window else 0.0
+            }
+        return state
+
     def get_optics(self):
+        """
+        Implementation of NAPALM method get_optics.
 
+        With the ``optics_window`` optional argument, avg, min and max are computed over the
+        last ``optics_window`` calls. With ``optics_lanes``, the lanes of a multi-lane
+        transceiver are reported as the channels of their parent port.
+        """
         command = ['show interfaces transceiver']
 
         output = (
@@ -1474,43 +1894,16 @@ class EOSDriver(NetworkDriver):
         # Formatting data into return data structure
         optics_detail = {}
 
-        for port, port_values in output.items():
-            port_detail = {}
-
-            port_detail['physical_channels'] = {}
-            port_detail['physical_channels']['channel'] = []
-
-            # Defaulting avg, min, max values to 0.0 since device does not
-            # return these values
-            optic_states = {
-                'index': 0,
-                'state': {
-                    'input_power': {
-                        'instant': (port_values['rxPower']
-                                    if 'rxPower' in port_values else 0.0),
-                        'avg': 0.0,
-                        'min': 0.0,
-                        'max': 0.0
-                    },
-                    'output_power': {
-                        'instant': (port_values['txPower']
-                                    if 'txPower' in port_values else 0.0),
-                        'avg': 0.0,
-                        'min': 0.0,
-                        'max': 0.0
-                    },
-                    'laser_bias_current': {
-                        'instant': (port_values['txBias']
-                                    if 'txBias' in port_values else 0.0),
-                        'avg': 0.0,
-                        'min': 0.0,
-                        'max': 0.0
-                    }
-                }
-            }
+        for interface, (port, index) in self._optics_channels(output).items():
+            if port not in optics_detail:
+                optics_detail[port] = {'physical_channels': {'channel': []}}
+            optics_detail[port]['physical_channels']['channel'].append({
+                'index': index,
+                'state': self._optics_state(port, index, output[interface])
+            })
 
-            port_detail['physical_channels']['channel'].append(optic_states)
-            optics_detail[port] = port_detail
+        for port_detail in optics_detail.values():
+            port_detail['physical_channels']['channel'].sort(key=lambda channel: channel['index'])
 
         return optics_detail
 
@@ -1565,9 +1958,22 @@ class EOSDriver(NetworkDriver):
         # This command has no JSON yet
         raw_output = self.device.run_commands(commands, encoding='text')[0].get('output', '')
 
-        output = napalm_base.helpers.textfsm_extractor(self, 'vrf', raw_output)
+        return self._parse_vrf(raw_output)
 
-        return output
+    def _parse_vrf(self, raw_output):
+        return helpers.textfsm_extractor(self, 'vrf', raw_output)
+
+    @staticmethod
+    def _ip_interface_names(raw_output):
+        """Names of the interfaces listed by 'show ip interface brief'."""
+        names = []
+        table = False
+        for line in raw_output.splitlines():
+            if line.startswith('-'):
+                table = True
+            elif table and line.strip():
+                names.append(py23_compat.text_type(line.split()[0]))
+        return names
 
     def _get_vrfs(self):
         output = self._show_vrf()
@@ -1581,7 +1987,22 @@ class EOSDriver(NetworkDriver):
     def get_network_instances(self, name=''):
         """get_network_instances implementation for EOS."""
 
-        output = self._show_vrf()
+        # the interfaces of the default instance are the ones of no VRF, so the VRFs and the
+        # interfaces come in one request, both in text as 'show vrf' has no JSON yet
+        default = not name or name == 'default'
+        if default:
+            commands = ['show vrf', 'show ip interface brief']
+        else:
+            commands = ['show vrf {}'.format(name)]
+        try:
+            raw_output = self.device.run_commands(commands, encoding='text')
+        except pyeapi.eapilib.CommandError:
+            if default:
+                raise
+            # no such VRF
+            return {}
+
+        output = self._parse_vrf(raw_output[0].get('output', ''))
         vrfs = {}
         all_vrf_interfaces = {}
         for vrf in output:
@@ -1608,19 +2029,20 @@ class EOSDriver(NetworkDriver):
                               u'interface': interfaces,
                           },
             }
-        all_interfaces = self.get_interfaces_ip().keys()
-        vrfs[u'default'] = {
-            u'name': u'default',
-            u'type': u'DEFAULT_INSTANCE',
-            u'state': {
-                u'route_distinguisher': u'',
-            },
-            u'interfaces': {
-                u'interface': {
-                    k: {} for k in all_interfaces if k not in all_vrf_interfaces.keys()
+        if default:
+            all_interfaces = self._ip_interface_names(raw_output[1].get('output', ''))
+            vrfs[u'default'] = {
+                u'name': u'default',
+                u'type': u'DEFAULT_INSTANCE',
+                u'state': {
+                    u'route_distinguisher': u'',
                 },
-            },
-        }
+                u'interfaces': {
+                    u'interface': {
+                        k: {} for k in all_interfaces if k not in all_vrf_interfaces
+                    },
+                },
+            }
 
         if name:
             if name in vrfs:
@@ -1723,3 +2145,25 @@ class EOSDriver(NetworkDriver):
                     })
             ping_dict['success'].update({'results': results_array})
         return ping_dict
+
+
+def rollback_to(driver, checkpoint):
+    """
+    Replace the configuration of an opened EOSDriver with one of its rollback checkpoints,
+    0 being the most recent one, as rollback does. A function rather than a driver method,
+    the methods of a driver being those of NetworkDriver.
+    """
+    driver._rollback(checkpoint)
+
+
+@contextmanager
+def interfaces_filter(driver, interfaces):
+    """
+    Only fetch ``interfaces`` in the get_interfaces and get_interfaces_counters calls made on
+    ``driver`` within the block, instead of those of its ``interfaces`` option.
+    """
+    previous, driver.interfaces = driver.interfaces, interfaces
+    try:
+        yield driver
+    finally:
+        driver.interfaces = previous
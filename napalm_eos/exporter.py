@@ -0,0 +1,290 @@
+"""Serve the results of the EOS getters as OpenMetrics text over HTTP."""
+from __future__ import unicode_literals
+
+import math
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from napalm_eos.scheduler import PollScheduler
+from napalm_eos.utils.counters import COUNTER_FIELDS
+
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+DEFAULT_INTERVALS = {
+    'get_interfaces_counters': 30,
+    'get_environment': 60,
+    'get_optics': 60,
+    'get_bgp_neighbors': 60,
+}
+
+
+def _environment_temperature(result):
+    for sensor, values in result['temperature'].items():
+        yield (('sensor', sensor),), values['temperature']
+
+
+def _environment_fans(result):
+    for fan, values in result['fans'].items():
+        yield (('fan', fan),), values['status']
+
+
+def _environment_power_status(result):
+    for psu, values in result['power'].items():
+        yield (('psu', psu),), values['status']
+
+
+def _environment_power_output(result):
+    for psu, values in result['power'].items():
+        yield (('psu', psu),), values['output']
+
+
+def _environment_cpu(result):
+    for cpu, values in result['cpu'].items():
+        yield (('cpu', cpu),), values['%usage']
+
+
+def _environment_memory(key):
+    def extract(result):
+        # reported in KiB by 'show processes top once'
+        yield (), result['memory'][key] * 1024
+    return extract
+
+
+def _is_columnar(result):
+    # a table of the columnar_tables option: a NumPy structured array or a dict of columns
+    return hasattr(result, 'dtype') or isinstance(result.get('interface'), list)
+
+
+def _counter(field):
+    def extract(result):
+        if _is_columnar(result):
+            rows = zip(result['interface'], result[field])
+        else:
+            rows = ((interface, counters.get(field, -1)) for interface, counters in result.items())
+        for interface, value in rows:
+            if value >= 0:
+                yield (('interface', '{}'.format(interface)),), int(value)
+    return extract
+
+
+def _optics(key):
+    def extract(result):
+        for interface, values in result.items():
+            for channel in values['physical_channels']['channel']:
+                yield ((('interface', interface), ('channel', channel['index'])),
+                       channel['state'][key]['instant'])
+    return extract
+
+
+def _bgp_peers(key):
+    def extract(result):
+        for vrf, vrf_data in result.items():
+            for peer, peer_data in vrf_data['peers'].items():
+                yield (('vrf', vrf), ('peer', peer)), peer_data[key]
+    return extract
+
+
+def _bgp_prefixes(key):
+    def extract(result):
+        for vrf, vrf_data in result.items():
+            for peer, peer_data in vrf_data['peers'].items():
+                for family, prefixes in peer_data.get('address_family', {}).items():
+                    if prefixes[key] >= 0:
+                        yield (('vrf', vrf), ('peer', peer), ('family', family)), prefixes[key]
+    return extract
+
+
+# name, type, help, getter, extractor
+METRICS = [
+    ('eos_temperature_celsius', 'gauge', 'Temperature of a sensor.',
+     'get_environment', _environment_temperature),
+    ('eos_fan_ok', 'gauge', 'Whether a fan is working.',
+     'get_environment', _environment_fans),
+    ('eos_power_supply_ok', 'gauge', 'Whether a power supply is working.',
+     'get_environment', _environment_power_status),
+    ('eos_power_supply_output_watts', 'gauge', 'Output power of a power supply.',
+     'get_environment', _environment_power_output),
+    ('eos_cpu_usage_percent', 'gauge', 'CPU usage.',
+     'get_environment', _environment_cpu),
+    ('eos_memory_used_bytes', 'gauge', 'Used memory.',
+     'get_environment', _environment_memory('used_ram')),
+    ('eos_memory_available_bytes', 'gauge', 'Available memory.',
+     'get_environment', _environment_memory('available_ram')),
+] + [
+    ('eos_interface_{}'.format(field), 'counter', 'Interface {}.'.format(field.replace('_', ' ')),
+     'get_interfaces_counters', _counter(field))
+    for field in COUNTER_FIELDS
+] + [
+    ('eos_optics_input_power_dbm', 'gauge', 'Optical input power.',
+     'get_optics', _optics('input_power')),
+    ('eos_optics_output_power_dbm', 'gauge', 'Optical output power.',
+     'get_optics', _optics('output_power')),
+    ('eos_optics_laser_bias_current_milliamperes', 'gauge', 'Laser bias current.',
+     'get_optics', _optics('laser_bias_current')),
+    ('eos_bgp_peer_up', 'gauge', 'Whether a BGP session is established.',
+     'get_bgp_neighbors', _bgp_peers('is_up')),
+    ('eos_bgp_peer_enabled', 'gauge', 'Whether a BGP peer is administratively enabled.',
+     'get_bgp_neighbors', _bgp_peers('is_enabled')),
+    ('eos_bgp_peer_uptime_seconds', 'gauge', 'Time since the BGP session last changed state.',
+     'get_bgp_neighbors', _bgp_peers('uptime')),
+    ('eos_bgp_peer_received_prefixes', 'gauge', 'Prefixes received from a BGP peer.',
+     'get_bgp_neighbors', _bgp_prefixes('received_prefixes')),
+    ('eos_bgp_peer_sent_prefixes', 'gauge', 'Prefixes sent to a BGP peer.',
+     'get_bgp_neighbors', _bgp_prefixes('sent_prefixes')),
+]
+
+# metrics about the collection itself, from the scheduler job stats
+POLL_METRICS = [
+    ('eos_poll_duration_seconds', 'gauge', 'Duration of the last poll of a getter.',
+     'last_duration'),
+    ('eos_poll_lag_seconds', 'gauge', 'How late the last poll of a getter started.',
+     'last_lag'),
+    ('eos_poll_last_timestamp_seconds', 'gauge', 'When a getter was last polled.',
+     'last_run'),
+    ('eos_poll_errors', 'counter', 'Failed polls of a getter.', 'errors'),
+    ('eos_poll_overruns', 'counter', 'Polls of a getter that ran past their interval.',
+     'overruns'),
+]
+
+EXPORT_ERRORS = ('eos_export_errors', 'counter',
+                 'Results of a getter left out of the metrics for having an unexpected form.')
+
+
+def _escape(value):
+    return ('{}'.format(value)
+            .replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(float(value))
+    return '{}'.format(value)
+
+
+def _sample(name, labels, value):
+    return '{}{{{}}} {}\n'.format(
+        name, ','.join('{}="{}"'.format(k, _escape(v)) for k, v in labels), _format_value(value))
+
+
+class MetricsExporter(object):
+    """
+    Poll a set of opened drivers in the background and serve the cached results.
+
+    Collection runs on a PollScheduler at the per-getter ``intervals``, so a scrape only ever
+    reads the last results and never waits on eAPI. The text is written as it is generated.
+    """
+
+    def __init__(self, drivers, intervals=None, max_workers=16, scheduler=None):
+        self.drivers = drivers
+        self.intervals = intervals or DEFAULT_INTERVALS
+        self.scheduler = scheduler or PollScheduler(max_workers=max_workers)
+        self.jobs = {}
+        # (hostname, getter) -> results left out of a scrape
+        self.export_errors = {}
+        self._errors_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self, port=9945, address=''):
+        """Start polling and serving ``/metrics`` on ``address:port``."""
+        for driver in self.drivers:
+            for getter, interval in self.intervals.items():
+                self.jobs[(driver.hostname, getter)] = self.scheduler.add(driver, getter, interval)
+        self.scheduler.start()
+
+        self._server = _ThreadingHTTPServer((address, port), _MetricsHandler)
+        self._server.exporter = self
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='napalm-eos-exporter')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and polling."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.scheduler.stop()
+
+    def generate(self):
+        """Yield the OpenMetrics text, a few lines at a time."""
+        for name, metric_type, help_text, getter, extract in METRICS:
+            yield '# TYPE {} {}\n# HELP {} {}\n'.format(name, metric_type, name, help_text)
+            sample_name = name + '_total' if metric_type == 'counter' else name
+            for (hostname, job_getter), job in self.jobs.items():
+                if job_getter != getter or job.last_result is None:
+                    continue
+                device = (('device', hostname),)
+                try:
+                    for labels, value in extract(job.last_result):
+                        yield _sample(sample_name, device + labels, value)
+                except (KeyError, TypeError, AttributeError, ValueError):
+                    # skip a device returning something unexpected rather than the whole scrape,
+                    # counting it in EXPORT_ERRORS
+                    with self._errors_lock:
+                        key = (hostname, getter)
+                        self.export_errors[key] = self.export_errors.get(key, 0) + 1
+
+        for name, metric_type, help_text, key in POLL_METRICS:
+            yield '# TYPE {} {}\n# HELP {} {}\n'.format(name, metric_type, name, help_text)
+            sample_name = name + '_total' if metric_type == 'counter' else name
+            for (hostname, getter), job in self.jobs.items():
+                value = getattr(job, key)
+                if value is not None:
+                    yield _sample(sample_name, (('device', hostname), ('getter', getter)), value)
+
+        name, metric_type, help_text = EXPORT_ERRORS
+        yield '# TYPE {} {}\n# HELP {} {}\n'.format(name, metric_type, name, help_text)
+        with self._errors_lock:
+            export_errors = sorted(self.export_errors.items())
+        for (hostname, getter), value in export_errors:
+            yield _sample(name + '_total', (('device', hostname), ('getter', getter)), value)
+
+        yield '# EOF\n'
+
+    def write(self, write, buffer_size=65536):
+        """Write the OpenMetrics text through ``write``, in chunks of about ``buffer_size``."""
+        chunk = []
+        size = 0
+        for text in self.generate():
+            chunk.append(text)
+            size += len(text)
+            if size >= buffer_size:
+                write(''.join(chunk).encode('utf-8'))
+                chunk = []
+                size = 0
+        if chunk:
+            write(''.join(chunk).encode('utf-8'))
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.end_headers()
+        self.server.exporter.write(self.wfile.write)
+
+    def log_message(self, format, *args):
+        pass
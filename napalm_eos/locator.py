@@ -0,0 +1,167 @@
+"""Find the ports hosts are connected to, from the ARP, MAC and LLDP tables of a fleet."""
+from __future__ import unicode_literals
+
+import socket
+import threading
+
+from napalm_eos.utils import normalize
+
+
+def _is_ip(value):
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, value)
+            return True
+        except (socket.error, ValueError):
+            pass
+    return False
+
+
+class EndpointLocator(object):
+    """
+    Hash indexes of where the IP and MAC addresses of a fleet of devices are learned.
+
+    collect() reads the ARP, MAC address and LLDP tables of a device once, replacing what was
+    known about it, and locate() then answers from the indexes IP -> MAC -> (device, VLAN,
+    interface) and (device, interface) -> LLDP neighbor, without asking any device.
+
+    A MAC address learned on a port facing another collected device, as told by LLDP, is
+    followed to that device until a port with no such neighbor, the edge port, is reached.
+    The LLDP hostnames are matched against the hostname and FQDN of the collected devices,
+    with or without their domain.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # ip -> {device: (mac, interface)}
+        self._arp = {}
+        # mac -> {device: [(vlan, interface)]}
+        self._macs = {}
+        # device -> {interface: [(hostname, port)]}
+        self._lldp = {}
+        # hostname, fqdn and their short names -> device
+        self._names = {}
+        # device -> (ips, macs, names) it contributed, to forget them on the next collect
+        self._devices = {}
+
+    def __len__(self):
+        return len(self._devices)
+
+    def collect(self, driver, device=None):
+        """Read the tables of an opened ``driver``, known as ``device`` or its hostname."""
+        facts = driver.get_facts()
+        self.add(device or driver.hostname, driver.get_arp_table(),
+                 driver.get_mac_address_table(), driver.get_lldp_neighbors(),
+                 names=(facts.get('hostname'), facts.get('fqdn')))
+
+    def add(self, device, arp_table, mac_table, lldp_neighbors, names=()):
+        """Index the tables of ``device``, as returned by the getters."""
+        arp = {}
+        for entry in arp_table:
+            arp[normalize.ip(entry['ip'])] = (normalize.mac(entry['mac']), entry['interface'])
+        macs = {}
+        for entry in mac_table:
+            macs.setdefault(normalize.mac(entry['mac']), []).append(
+                (entry['vlan'], entry['interface']))
+        lldp = dict((interface, [(neighbor['hostname'], neighbor['port'])
+                                 for neighbor in neighbors])
+                    for interface, neighbors in lldp_neighbors.items())
+        aliases = set([device])
+        for name in names:
+            if name:
+                aliases.update([name, name.split('.')[0]])
+
+        with self._lock:
+            self._remove(device)
+            for ip, value in arp.items():
+                self._arp.setdefault(ip, {})[device] = value
+            for mac, locations in macs.items():
+                self._macs.setdefault(mac, {})[device] = locations
+            self._lldp[device] = lldp
+            for name in aliases:
+                self._names[name] = device
+            self._devices[device] = (list(arp), list(macs), aliases)
+
+    def remove(self, device):
+        """Forget everything about ``device``."""
+        with self._lock:
+            self._remove(device)
+
+    def _remove(self, device):
+        if device not in self._devices:
+            return
+        ips, macs, names = self._devices.pop(device)
+        for index, keys in ((self._arp, ips), (self._macs, macs)):
+            for key in keys:
+                entries = index.get(key, {})
+                entries.pop(device, None)
+                if not entries:
+                    index.pop(key, None)
+        for name in names:
+            if self._names.get(name) == device:
+                del self._names[name]
+        self._lldp.pop(device, None)
+
+    def _neighbor(self, device, interface):
+        # the collected device at the other end of a port, if any
+        for hostname, _ in self._lldp.get(device, {}).get(interface, ()):
+            neighbor = self._names.get(hostname, self._names.get(hostname.split('.')[0]))
+            if neighbor is not None and neighbor != device:
+                return neighbor
+        return None
+
+    def _follow(self, mac, start):
+        # the edge ports reached from the ports start learned mac on, with their path
+        learned = self._macs.get(mac, {})
+        edges = []
+        visited = set([start])
+        stack = [(start, [])]
+        while stack:
+            device, path = stack.pop()
+            for vlan, interface in learned.get(device, ()):
+                hops = path + [{'device': device, 'interface': interface}]
+                neighbor = self._neighbor(device, interface)
+                if neighbor is not None and neighbor in learned:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        stack.append((neighbor, hops))
+                    continue
+                # no collected device behind the port, or one which did not learn the mac
+                edges.append({'device': device, 'interface': interface, 'vlan': vlan,
+                              'path': hops})
+        return edges
+
+    def locate(self, address):
+        """
+        Return where the host with the IP or MAC ``address`` is connected, as a list of
+        ``{'ip', 'mac', 'device', 'interface', 'vlan', 'path'}``, ``path`` being the ports
+        the MAC address was followed through from the device resolving the IP address, or
+        learning the MAC address, to the edge port. When the device resolving the IP address
+        did not learn the MAC address, every device which did is a start.
+        """
+        with self._lock:
+            if _is_ip(address):
+                ip = normalize.ip(address)
+                macs = []
+                for device, (mac, _) in sorted(self._arp.get(ip, {}).items()):
+                    learned = self._macs.get(mac, {})
+                    if device in learned:
+                        macs.append((mac, device))
+                    else:
+                        # a router resolving the IP on a routed port does not learn the MAC,
+                        # start from every device which did instead
+                        macs.extend((mac, other) for other in sorted(learned))
+            else:
+                ip = ''
+                mac = normalize.mac(address)
+                macs = [(mac, device) for device in sorted(self._macs.get(mac, {}))]
+
+            locations = {}
+            for mac, start in macs:
+                for edge in self._follow(mac, start):
+                    key = (mac, edge['device'], edge['interface'], edge['vlan'])
+                    if key not in locations or \
+                            len(edge['path']) < len(locations[key]['path']):
+                        edge.update(ip=ip, mac=mac)
+                        locations[key] = edge
+        return [locations[key] for key in sorted(locations)]
@@ -0,0 +1,299 @@
+"""Longest prefix match over a snapshot of the RIB of a device, without asking the device."""
+from __future__ import unicode_literals
+
+import binascii
+import socket
+
+from napalm_eos.utils.records import RouteEntry, intern_string
+
+
+# fields of the nodes of a PrefixTrie
+KEY, LENGTH, VALUE, LEFT, RIGHT = range(5)
+
+
+class PrefixTrie(object):
+    """
+    Path-compressed binary trie of the prefixes of one address family.
+
+    Prefixes are ``(key, length)`` pairs, ``key`` being the integer value of the network
+    address. Nodes are lists of ``[key, length, value, left, right]``, only the nodes
+    holding a value or joining two branches exist, so a lookup visits at most as many
+    nodes as there are distinct prefix lengths on its path.
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self._root = [0, 0, None, None, None]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _bit(self, key, position):
+        return (key >> (self.bits - 1 - position)) & 1
+
+    def _mask(self, length):
+        return ((1 << length) - 1) << (self.bits - length)
+
+    def _common(self, a, b, limit):
+        # length of the common prefix of the keys a and b, limit bits at most
+        difference = (a ^ b) >> (self.bits - limit) if limit else 0
+        return limit - difference.bit_length()
+
+    def insert(self, key, length, value):
+        """Set the value of a prefix, returning the previous one."""
+        key &= self._mask(length)
+        node = self._root
+        while True:
+            if node[LENGTH] == length:
+                previous = node[VALUE]
+                node[VALUE] = value
+                if previous is None:
+                    self._size += 1
+                return previous
+            branch = LEFT + self._bit(key, node[LENGTH])
+            child = node[branch]
+            if child is None:
+                node[branch] = [key, length, value, None, None]
+                self._size += 1
+                return None
+            common = self._common(key, child[KEY], min(length, child[LENGTH]))
+            if common == child[LENGTH]:
+                node = child
+                continue
+            if common == length:
+                new = [key, length, value, None, None]
+                new[LEFT + self._bit(child[KEY], length)] = child
+            else:
+                new = [key & self._mask(common), common, None, None, None]
+                new[LEFT + self._bit(key, common)] = [key, length, value, None, None]
+                new[LEFT + self._bit(child[KEY], common)] = child
+            node[branch] = new
+            self._size += 1
+            return None
+
+    def _find(self, key, length, path=None):
+        node = self._root
+        while node is not None and node[LENGTH] < length:
+            if path is not None:
+                path.append(node)
+            node = node[LEFT + self._bit(key, node[LENGTH])]
+        if node is None or node[LENGTH] != length or node[KEY] != key:
+            return None
+        return node
+
+    def get(self, key, length):
+        """Return the value of exactly this prefix, or None."""
+        node = self._find(key & self._mask(length), length)
+        return None if node is None else node[VALUE]
+
+    def remove(self, key, length):
+        """Remove a prefix, returning its value, and the nodes it no longer needs."""
+        path = []
+        node = self._find(key & self._mask(length), length, path)
+        if node is None or node[VALUE] is None:
+            return None
+        value = node[VALUE]
+        node[VALUE] = None
+        self._size -= 1
+        while path and node[VALUE] is None:
+            children = [child for child in (node[LEFT], node[RIGHT]) if child is not None]
+            if len(children) == 2:
+                break
+            parent = path.pop()
+            parent[LEFT if parent[LEFT] is node else RIGHT] = children[0] if children else None
+            node = parent
+        return value
+
+    def lookup(self, address, max_length=None, accept=None):
+        """
+        Return the value of the longest prefix holding ``address``, no longer than
+        ``max_length`` and whose value passes ``accept`` when given, or None.
+        """
+        bits = self.bits
+        limit = bits if max_length is None else max_length
+        best = None
+        node = self._root
+        while node is not None and node[LENGTH] <= limit:
+            length = node[LENGTH]
+            if length and (address ^ node[KEY]) >> (bits - length):
+                break
+            if node[VALUE] is not None and (accept is None or accept(node[VALUE])):
+                best = node[VALUE]
+            if length == bits:
+                break
+            node = node[LEFT + ((address >> (bits - 1 - length)) & 1)]
+        return best
+
+    def items(self):
+        """Iterate over the ``(key, length, value)`` of the prefixes."""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node[VALUE] is not None:
+                yield node[KEY], node[LENGTH], node[VALUE]
+            stack.extend(child for child in (node[RIGHT], node[LEFT]) if child is not None)
+
+
+def _parse_address(address):
+    # (bits, value) of an IPv4 or IPv6 address
+    if ':' in address:
+        return 128, int(binascii.hexlify(socket.inet_pton(socket.AF_INET6, address)), 16)
+    return 32, int(binascii.hexlify(socket.inet_pton(socket.AF_INET, address)), 16)
+
+
+def _parse(destination):
+    # (bits, value, prefix length or None) of an address or a prefix
+    address, _, length = destination.partition('/')
+    bits, value = _parse_address(address)
+    if not length:
+        return bits, value, None
+    length = int(length)
+    if not 0 <= length <= bits:
+        raise ValueError('Invalid prefix length {}'.format(length))
+    return bits, value, length
+
+
+def _compact(route_details):
+    # the attributes of a route the getters use, as tuples of interned strings
+    vias = route_details.get('vias')
+    if vias is not None:
+        vias = tuple((via.get('nexthopAddr'), intern_string(via.get('interface')))
+                     for via in vias)
+    return (intern_string(route_details.get('routeType')),
+            route_details.get('preference', 0),
+            intern_string(route_details.get('routeAction')),
+            route_details.get('routingDisabled'),
+            vias)
+
+
+def _expand(compact):
+    # back to the 'show ip route detail' attributes of a route
+    route_type, preference, action, disabled, vias = compact
+    route_details = {'routeType': route_type, 'preference': preference, 'routeAction': action,
+                     'routingDisabled': disabled}
+    if vias is not None:
+        route_details['vias'] = [{'nexthopAddr': next_hop, 'interface': interface}
+                                 if next_hop is not None else {'interface': interface}
+                                 for next_hop, interface in vias]
+    return route_details
+
+
+def _protocol_filter(protocol):
+    # what 'show ip route <destination> <protocol>' keeps, e.g. eBGP and iBGP routes for bgp
+    def accept(match):
+        return protocol in (match[1][0] or '').lower()
+    return accept
+
+
+class RouteIndex(object):
+    """
+    Longest prefix match over the RIB of an opened driver, fetched by refresh().
+
+    The routes of every VRF, or only of ``vrfs``, are kept in a PrefixTrie per VRF and
+    address family. route_to() answers like get_route_to from it, in microseconds instead of
+    an eAPI call per destination. BGP routes are reported like the others, with the next
+    hops and interfaces of the RIB and without the protocol_attributes get_route_to reads
+    from 'show ip bgp'.
+
+    refresh() fetches the RIB again and only touches the prefixes which changed, so the
+    index can be kept current by calling it periodically or on a single VRF.
+    """
+
+    def __init__(self, driver, vrfs=None, ipv6=True):
+        self.driver = driver
+        self.vrfs = vrfs
+        self.ipv6 = ipv6
+        self._tries = {}
+
+    def __len__(self):
+        return sum(len(trie) for trie in self._tries.values())
+
+    def _fetch(self, vrfs, everything):
+        commands = ['show ip route vrf all detail'] if everything else \
+            ['show ip route vrf {} detail'.format(vrf) for vrf in vrfs]
+        if self.ipv6:
+            commands += ['show ipv6 route vrf {} detail'.format(vrf) for vrf in vrfs]
+        outputs = self.driver.device.run_commands(commands)
+
+        ribs = {}
+        ipv4 = outputs[0].get('vrfs', {}) if everything else \
+            dict((vrf, output.get('vrfs', {}).get(vrf, {})) for vrf, output in zip(vrfs, outputs))
+        for vrf in vrfs:
+            ribs[vrf, 32] = ipv4.get(vrf, {}).get('routes', {})
+        if self.ipv6:
+            for vrf, output in zip(vrfs, outputs[-len(vrfs):]):
+                ribs[vrf, 128] = output.get('routes', {})
+        return ribs
+
+    def refresh(self, vrfs=None):
+        """
+        Fetch the RIB of ``vrfs``, all the VRFs of the index by default, and update the
+        prefixes which changed. Return the number of prefixes added, changed and removed.
+        """
+        everything = vrfs is None and self.vrfs is None
+        if vrfs is None:
+            vrfs = self.vrfs if self.vrfs is not None else self.driver._get_vrfs()
+        vrfs = sorted(vrfs)
+        counts = {'added': 0, 'changed': 0, 'removed': 0}
+
+        for (vrf, bits), routes in self._fetch(vrfs, everything).items():
+            trie = self._tries.get((vrf, bits))
+            if trie is None:
+                trie = self._tries[vrf, bits] = PrefixTrie(bits)
+            for prefix, route_details in routes.items():
+                key, length = _parse(prefix)[1:]
+                compact = _compact(route_details)
+                previous = trie.get(key, length)
+                if previous is None:
+                    counts['added'] += 1
+                elif previous[1] != compact:
+                    counts['changed'] += 1
+                else:
+                    continue
+                trie.insert(key, length, (prefix, compact))
+            gone = [(key, length) for key, length, (prefix, _) in trie.items()
+                    if prefix not in routes]
+            for key, length in gone:
+                trie.remove(key, length)
+            counts['removed'] += len(gone)
+
+        if everything:
+            # VRFs removed from the device
+            for vrf, bits in list(self._tries):
+                if vrf not in vrfs:
+                    counts['removed'] += len(self._tries.pop((vrf, bits)))
+        return counts
+
+    def longest_match(self, destination, vrf='default'):
+        """Return the prefix of ``vrf`` matching ``destination``, or None."""
+        bits, value, length = _parse(destination)
+        trie = self._tries.get((vrf, bits))
+        match = trie.lookup(value, length) if trie is not None else None
+        return None if match is None else match[0]
+
+    def route_to(self, destination='', protocol=''):
+        """Return the routes to ``destination`` in every VRF, as get_route_to does."""
+        if protocol.lower() == 'direct':
+            protocol = 'connected'
+        protocol = protocol.lower()
+        try:
+            bits, value, length = _parse(destination)
+        except (ValueError, socket.error):
+            return 'Please specify a valid destination!'
+
+        accept = _protocol_filter(protocol) if protocol else None
+        entry = self.driver._table_entry(RouteEntry)
+        routes = {}
+        for (vrf, trie_bits), trie in sorted(self._tries.items()):
+            if trie_bits != bits:
+                continue
+            match = trie.lookup(value, length, accept)
+            if match is None:
+                continue
+            prefix, compact = match
+            route_details = _expand(compact)
+            route = self.driver._rib_route(vrf, route_details)
+            routes.setdefault(prefix, []).extend(
+                entry(**route) for route in self.driver._rib_next_hops(route, route_details))
+        return routes
@@ -0,0 +1,279 @@
+"""Poll getters of many EOS devices at their own intervals over a shared worker pool."""
+from __future__ import division
+from __future__ import unicode_literals
+
+import heapq
+import itertools
+import random
+import threading
+import time
+
+
+# getters that usually take long enough to hog a worker
+HEAVY_GETTERS = frozenset([
+    'get_bgp_neighbors_detail',
+    'get_bgp_config',
+    'get_config',
+    'get_mac_address_table',
+    'get_arp_table',
+    'get_route_to',
+])
+
+
+def open_lane(driver):
+    """
+    Open a second driver to the device of ``driver``, for its heavy getters.
+
+    It is built from the same arguments, EOSDriver keeping its ``optional_args``, but for
+    ``record``: two drivers cannot write the same archive.
+    """
+    optional_args = dict(getattr(driver, 'optional_args', None) or {})
+    optional_args.pop('record', None)
+    lane = type(driver)(driver.hostname, driver.username, driver.password,
+                        timeout=driver.timeout, optional_args=optional_args)
+    lane.open()
+    return lane
+
+
+class PollJob(object):
+    """A getter polled periodically on one driver, with its last result and lag metrics."""
+
+    def __init__(self, driver, getter, interval, callback=None, error_callback=None,
+                 args=None, kwargs=None, heavy=False):
+        self.driver = driver
+        self.getter = getter
+        self.interval = interval
+        self.callback = callback
+        self.error_callback = error_callback
+        self.args = args or ()
+        self.kwargs = kwargs or {}
+        self.heavy = heavy
+
+        self.due = None
+        self.base_due = None
+        self.last_result = None
+        self.last_error = None
+        self.last_run = None
+        self.runs = 0
+        self.errors = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+
+    def stats(self):
+        """Return the lag and duration metrics of the job."""
+        return {
+            'hostname': getattr(self.driver, 'hostname', ''),
+            'getter': self.getter,
+            'interval': self.interval,
+            'runs': self.runs,
+            'errors': self.errors,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'last_run': self.last_run,
+            'last_lag': self.last_lag,
+            'max_lag': self.max_lag,
+            'last_duration': self.last_duration,
+            'max_duration': self.max_duration,
+            'avg_duration': self.total_duration / self.runs if self.runs else 0.0,
+        }
+
+
+class PollScheduler(object):
+    """
+    Run getters on a bounded pool of threads, each at its own interval.
+
+    Drivers are expected to be opened by the caller and are reused across polls. Each device
+    has two lanes, each running one getter at a time: the light getters run on the driver,
+    and the heavy ones on a second connection opened by ``lane_factory`` on their first poll,
+    so a light getter never waits for a heavy one of the same device. Without a
+    ``lane_factory``, both run on the driver, one at a time. When several jobs are due, the
+    one with the shortest interval runs first, and heavy getters may only use half of the
+    workers, so slow getters never starve the light ones of workers either.
+
+    A job still running when its next run is due is counted as an overrun and the missed
+    cycles are skipped rather than queued up.
+    """
+
+    def __init__(self, max_workers=8, jitter=0.1, heavy_getters=HEAVY_GETTERS,
+                 lane_factory=open_lane):
+        self.max_workers = max_workers
+        self.jitter = jitter
+        self.heavy_getters = heavy_getters
+        self.heavy_slots = max(1, max_workers // 2)
+        self.lane_factory = lane_factory
+
+        self.jobs = []
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._busy = set()
+        self._lanes = {}
+        self._running_heavy = 0
+        self._threads = []
+        self._stopped = True
+
+    def add(self, driver, getter, interval, callback=None, error_callback=None,
+            args=None, kwargs=None, heavy=None):
+        """
+        Poll ``driver.<getter>(*args, **kwargs)`` every ``interval`` seconds.
+
+        ``callback(job, result)`` is called after every successful poll and
+        ``error_callback(job, exception)`` after every failed one.
+        """
+        if heavy is None:
+            heavy = getter in self.heavy_getters
+        job = PollJob(driver, getter, interval, callback=callback,
+                      error_callback=error_callback, args=args, kwargs=kwargs, heavy=heavy)
+        with self._condition:
+            self.jobs.append(job)
+            self._push(job, time.time())
+            self._condition.notify()
+        return job
+
+    def start(self):
+        """Start the workers."""
+        with self._condition:
+            if not self._stopped:
+                return
+            self._stopped = False
+        self._threads = [threading.Thread(target=self._worker,
+                                          name='napalm-eos-poller-{}'.format(i))
+                         for i in range(self.max_workers)]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def stop(self, wait=True):
+        """Stop the workers, letting the running getters finish if ``wait`` is set."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            # the heavy lanes were opened here, the drivers are closed by the caller
+            for lane in self._lanes.values():
+                try:
+                    lane.close()
+                except Exception:
+                    pass
+            self._lanes = {}
+        self._threads = []
+
+    def stats(self):
+        """Return the metrics of every job."""
+        with self._condition:
+            return [job.stats() for job in self.jobs]
+
+    def _push(self, job, base_due):
+        # jitter keeps devices added together from polling in lockstep, it is not carried over
+        # to the next cycle so the polls do not drift
+        job.base_due = base_due
+        job.due = base_due + random.uniform(0, job.interval * self.jitter)
+        heapq.heappush(self._queue, (job.due, next(self._sequence), job))
+
+    def _next_job(self):
+        """
+        Pop the job to run next, if any.
+
+        Return the job, or None and how long to wait before something may become due.
+        """
+        now = time.time()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue))
+        timeout = self._queue[0][0] - now if self._queue else None
+
+        job = None
+        runnable = [entry for entry in due
+                    if self._lane(entry[2]) not in self._busy and
+                    (not entry[2].heavy or self._running_heavy < self.heavy_slots)]
+        if runnable:
+            chosen = min(runnable, key=lambda entry: (entry[2].interval, entry[0]))
+            due.remove(chosen)
+            job = chosen[2]
+        # due jobs waiting for a lane or a heavy slot are woken up by notify
+        for entry in due:
+            heapq.heappush(self._queue, entry)
+        return job, timeout
+
+    def _lane(self, job):
+        return id(job.driver), job.heavy and self.lane_factory is not None
+
+    def _driver(self, job):
+        """The driver to run ``job`` on, opening the heavy lane of its device if needed."""
+        if not job.heavy or self.lane_factory is None:
+            return job.driver
+        # only the worker holding the heavy lane of the device gets here
+        lane = self._lanes.get(id(job.driver))
+        if lane is None:
+            lane = self._lanes[id(job.driver)] = self.lane_factory(job.driver)
+        return lane
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                job = None
+                while job is None:
+                    if self._stopped:
+                        return
+                    job, timeout = self._next_job()
+                    if job is None:
+                        self._condition.wait(timeout)
+                self._busy.add(self._lane(job))
+                if job.heavy:
+                    self._running_heavy += 1
+
+            started = time.time()
+            result, error = None, None
+            try:
+                result = getattr(self._driver(job), job.getter)(*job.args, **job.kwargs)
+            except Exception as e:
+                error = e
+            finished = time.time()
+
+            with self._condition:
+                self._busy.discard(self._lane(job))
+                if job.heavy:
+                    self._running_heavy -= 1
+                self._record(job, started, finished, result, error)
+                self._condition.notify_all()
+
+            try:
+                if error is None:
+                    if job.callback is not None:
+                        job.callback(job, result)
+                elif job.error_callback is not None:
+                    job.error_callback(job, error)
+            except Exception:
+                # a broken callback must not kill the worker
+                pass
+
+    def _record(self, job, started, finished, result, error):
+        duration = finished - started
+        job.runs += 1
+        job.last_run = finished
+        job.last_lag = max(started - job.due, 0.0)
+        job.max_lag = max(job.max_lag, job.last_lag)
+        job.last_duration = duration
+        job.max_duration = max(job.max_duration, duration)
+        job.total_duration += duration
+        if error is None:
+            job.last_result = result
+            job.last_error = None
+        else:
+            job.errors += 1
+            job.last_error = error
+
+        next_due = job.base_due + job.interval
+        if next_due < finished:
+            missed = int((finished - next_due) // job.interval) + 1
+            job.overruns += 1
+            job.skipped += missed
+            next_due += missed * job.interval
+        self._push(job, next_due)
@@ -0,0 +1 @@
+"""napalm_eos.test package."""
@@ -0,0 +1,727 @@
+"""
+Generate the eAPI outputs of a synthetic EOS device, at any scale.
+
+All the outputs describe the same device: the MAC addresses are learned on ports of their
+VLAN, the ARP entries resolve to those MAC addresses within the subnet of the VLAN
+interface, the BGP peers sit in those subnets and the routes they advertise point back to
+them, and the running-config configures all of it.
+"""
+from __future__ import division
+from __future__ import unicode_literals
+
+import json
+import os
+import random
+import re
+import time
+
+from napalm_base.test.double import BaseTestDouble
+
+
+_BGP_NEIGHBOR = """BGP neighbor is {address}, remote AS {remote_as}, external link
+  Description: {description}
+  BGP version 4, remote router ID {router_id}, VRF {vrf}
+  Negotiated BGP version 4
+  Last read 00:00:{last_read:02d}, last write 00:00:{last_write:02d}
+  Hold time is 180, keepalive interval is 60 seconds
+  Configured hold time is 180, keepalive interval is 60 seconds
+  Connect timer is inactive
+  Configured idle-restart time is 300 seconds
+  Idle-restart timer is inactive
+  BGP state is {state}, {updown} for {uptime}
+  Number of transitions to established: {transitions}
+  Last state was {last_state}
+  Last event was {last_event}
+  Neighbor Capabilities:
+    Multiprotocol IPv4 Unicast: advertised and received and negotiated
+    Four Octet ASN: advertised and received
+    Route Refresh: advertised and received and negotiated
+    Send End-of-RIB messages: advertised and received and negotiated
+  Restart timer is inactive
+  End of rib timer is inactive
+  Message statistics:
+    InQ depth is 0
+    OutQ depth is 0
+                         Sent      Rcvd
+    Opens:           {opens:>8} {opens:>9}
+    Notifications:          0         0
+    Updates:         {updates_sent:>8} {updates_received:>9}
+    Keepalives:      {keepalives:>8} {keepalives:>9}
+    Route-Refresh:          0         0
+    Total messages:  {total_sent:>8} {total_received:>9}
+  Prefix statistics:
+                         Sent      Rcvd
+    IPv4 Unicast:    {sent_prefixes:>8} {received_prefixes:>9}
+    IPv6 Unicast:           0         0
+  Inbound route map is {import_policy}
+  Outbound route map is {export_policy}
+Local AS is {local_as}, local router ID {local_router_id}
+TTL is 1
+Local TCP address is {local_address}, local port is 179
+Remote TCP address is {address}, remote port is {remote_port}
+Auto-Local-Addr is disabled
+TCP Socket Information:
+  TCP state is ESTABLISHED
+  Outgoing Maximum Segment Size (MSS): 1448
+  Total Number of TCP retransmissions: 0
+  Options:
+    Timestamps enabled: yes
+    Selective Acknowledgments enabled: yes
+    Window Scale enabled: yes
+    Explicit Congestion Notification (ECN) enabled: no
+"""
+
+_RE_ROUTE = re.compile(r'^show ip route vrf (?P<vrf>\S+) (?P<destination>\S+) +'
+                       r'(?:(?P<protocol>\S+) +)?detail$')
+_RE_RIB = re.compile(r'^show ip route vrf (?P<vrf>\S+) detail$')
+_RE_RIB6 = re.compile(r'^show ipv6 route vrf (?P<vrf>\S+) detail$')
+_RE_BGP_ROUTE = re.compile(r'^show ip bgp (?P<prefix>\S+) detail vrf (?P<vrf>\S+)$')
+_RE_BGP_SUMMARY = re.compile(r'^show ip(?P<v6>v6)? bgp summary vrf (?P<vrf>\S+)$')
+_RE_VRF = re.compile(r'^show vrf (?P<name>\S+)$')
+_RE_BGP_NEIGHBOR = re.compile(r'^show ip(?P<v6>v6)? bgp neighbors (?P<address>\S+) vrf all$')
+
+
+def _ip(value):
+    return '.'.join('{}'.format(value >> shift & 255) for shift in (24, 16, 8, 0))
+
+
+def _ip_value(address):
+    value = 0
+    for part in address.split('.'):
+        value = value << 8 | int(part)
+    return value
+
+
+def _mac(value):
+    return ':'.join('{:02x}'.format(value >> shift & 255) for shift in (40, 32, 24, 16, 8, 0))
+
+
+def _dotted_mac(value):
+    digits = '{:012x}'.format(value)
+    return '.'.join(digits[i:i + 4] for i in (0, 4, 8))
+
+
+def _duration(seconds):
+    days, seconds = divmod(int(seconds), 86400)
+    return '{:>5}d{:02d}h'.format(days, seconds // 3600)
+
+
+def _section(text, pattern):
+    """Mimic ``| section``: top-level blocks with a line matching ``pattern``."""
+    regex = re.compile(pattern)
+    blocks = []
+    for line in text.splitlines():
+        if not line.startswith(' ') or not blocks:
+            blocks.append([])
+        blocks[-1].append(line)
+    return ''.join('\n'.join(block) + '\n' for block in blocks
+                   if block[0] != '!' and any(regex.search(line) for line in block))
+
+
+def _include(text, pattern):
+    """Mimic ``| include``."""
+    regex = re.compile(pattern)
+    return ''.join(line + '\n' for line in text.splitlines() if regex.search(line))
+
+
+class DeviceGenerator(object):
+    """
+    A synthetic EOS device, rendering the output of its show commands.
+
+    ``interfaces`` is the number of Ethernet ports, the device also has a Management1, a
+    Loopback0 and an interface per VLAN. VLAN interfaces are spread over the default VRF
+    and ``vrfs`` more VRFs, BGP peers over all the VRFs and routes over the established
+    peers. The outputs only depend on the arguments, ``now`` excepted.
+    """
+
+    def __init__(self, interfaces=48, vlans=10, vrfs=0, mac_addresses=100, arp_entries=50,
+                 bgp_peers=4, routes=100, acl_entries=0, hostname='eos-synthetic', asn=65000,
+                 seed=0, now=None):
+        self.hostname = hostname
+        self.asn = asn
+        self.acl_entries = acl_entries
+        self.now = time.time() if now is None else now
+        self._random = random.Random(seed)
+
+        self.vrfs = ['default'] + ['VRF{}'.format(i) for i in range(1, vrfs + 1)]
+        self.vlans = list(range(10, 10 + max(vlans, len(self.vrfs))))
+        self.ports = ['Ethernet{}/{}'.format(i // 48 + 1, i % 48 + 1) for i in range(interfaces)]
+        self.router_id = '172.31.255.1'
+
+        self._build_vlans(arp_entries, bgp_peers)
+        self._build_macs(max(mac_addresses, arp_entries), arp_entries)
+        self._build_peers(bgp_peers)
+        self._build_routes(routes)
+
+    def _build_vlans(self, arp_entries, bgp_peers):
+        # every VLAN gets a subnet large enough for its hosts and peers
+        count = len(self.vlans)
+        needed = -(-arp_entries // count) + -(-bgp_peers // count) + 8
+        size = max(256, 2 ** (needed - 1).bit_length())
+        self.vlan_vrf = {}
+        self.vlan_subnet = {}
+        for index, vlan in enumerate(self.vlans):
+            self.vlan_vrf[vlan] = self.vrfs[index % len(self.vrfs)]
+            self.vlan_subnet[vlan] = (_ip_value('10.0.0.0') + index * size, size)
+
+        # access ports when there are enough of them, trunks carrying every VLAN otherwise
+        self.trunks = len(self.ports) < count
+        self.port_vlan = {}
+        self.vlan_ports = {vlan: [] for vlan in self.vlans}
+        if not self.trunks:
+            for index, port in enumerate(self.ports):
+                vlan = self.vlans[index % count]
+                self.port_vlan[port] = vlan
+                self.vlan_ports[vlan].append(port)
+
+    def _build_macs(self, mac_addresses, arp_entries):
+        self.macs = []
+        self.arp = []
+        count = len(self.vlans)
+        for index in range(mac_addresses):
+            vlan = self.vlans[index % count]
+            if self.trunks:
+                port = self.ports[index % len(self.ports)]
+            else:
+                ports = self.vlan_ports[vlan]
+                port = ports[index // count % len(ports)]
+            mac = 0x001c73000000 + index
+            self.macs.append((mac, vlan, port))
+            if index < arp_entries:
+                address = self.vlan_subnet[vlan][0] + 2 + index // count
+                self.arp.append((address, mac, vlan, port))
+
+    def _build_peers(self, bgp_peers):
+        self.peers = []
+        vrf_vlans = {vrf: [vlan for vlan in self.vlans if self.vlan_vrf[vlan] == vrf]
+                     for vrf in self.vrfs}
+        used = {vlan: 0 for vlan in self.vlans}
+        for index in range(bgp_peers):
+            vrf = self.vrfs[index % len(self.vrfs)]
+            vlans = vrf_vlans[vrf]
+            vlan = vlans[index // len(self.vrfs) % len(vlans)]
+            base, size = self.vlan_subnet[vlan]
+            used[vlan] += 1
+            self.peers.append({
+                'address': _ip(base + size - 1 - used[vlan]),
+                'vrf': vrf,
+                'vlan': vlan,
+                'remote_as': 64512 + index % 1000,
+                'router_id': _ip(_ip_value('172.30.0.0') + index),
+                'established': index % 10 != 9,
+                'uptime': self._random.randint(60, 400 * 86400),
+                'received_prefixes': 0,
+                'sent_prefixes': self._random.randint(0, 20),
+            })
+
+    def _build_routes(self, routes):
+        # vrf -> prefix -> route, connected subnets first then BGP /24s from 11.0.0.0
+        self.routes = {vrf: {} for vrf in self.vrfs}
+        self.routes['default'][self.router_id + '/32'] = {'type': 'connected',
+                                                          'interface': 'Loopback0'}
+        for vlan in self.vlans:
+            base, size = self.vlan_subnet[vlan]
+            prefix = '{}/{}'.format(_ip(base), 32 - (size - 1).bit_length())
+            self.routes[self.vlan_vrf[vlan]][prefix] = {'type': 'connected',
+                                                        'interface': 'Vlan{}'.format(vlan)}
+        established = [peer for peer in self.peers if peer['established']]
+        if not established:
+            return
+        for index in range(routes):
+            peer = established[index % len(established)]
+            peer['received_prefixes'] += 1
+            prefix = '{}/24'.format(_ip(_ip_value('11.0.0.0') + index * 256))
+            self.routes[peer['vrf']][prefix] = {
+                'type': 'eBGP',
+                'interface': 'Vlan{}'.format(peer['vlan']),
+                'peer': peer,
+                'as_path': '{} {} {}'.format(peer['remote_as'], 3356 + index % 7,
+                                             15169 + index % 1000),
+            }
+
+    def _gateway(self, vlan):
+        return _ip(self.vlan_subnet[vlan][0] + 1)
+
+    def _prefix_length(self, vlan):
+        return 32 - (self.vlan_subnet[vlan][1] - 1).bit_length()
+
+    def _counters(self, port_index):
+        scale = 10 ** (3 + port_index % 7)
+        return {
+            'inOctets': scale * 1000 + port_index,
+            'outOctets': scale * 900 + port_index,
+            'inUcastPkts': scale,
+            'outUcastPkts': scale - 1,
+            'inMulticastPkts': scale // 100,
+            'outMulticastPkts': scale // 90,
+            'inBroadcastPkts': scale // 1000,
+            'outBroadcastPkts': scale // 1100,
+            'inDiscards': port_index % 7,
+            'outDiscards': port_index % 5,
+            'totalInErrors': port_index % 3,
+            'totalOutErrors': 0,
+            'linkStatusChanges': 1 + port_index % 4,
+            'counterRefreshTime': self.now,
+            'inputErrorsDetail': {'runtFrames': 0, 'rxPause': 0, 'fcsErrors': port_index % 3,
+                                  'alignmentErrors': 0, 'giantFrames': 0, 'symbolErrors': 0},
+            'outputErrorsDetail': {'deferredTransmissions': 0, 'txPause': 0, 'collisions': 0,
+                                   'lateCollisions': 0},
+        }
+
+    def _interface(self, name, hardware, forwarding, bandwidth, mac, description='',
+                   address=None, counters=None, mtu=9214):
+        interface = {
+            'name': name,
+            'description': description,
+            'interfaceStatus': 'connected',
+            'lineProtocolStatus': 'up',
+            'lastStatusChangeTimestamp': self.now - 60 - mac * 7919 % (400 * 86400),
+            'hardware': hardware,
+            'forwardingModel': forwarding,
+            'bandwidth': bandwidth,
+            'mtu': mtu,
+            'duplex': 'duplexFull',
+            'autoNegotiate': 'unknown',
+            'loopbackMode': 'loopbackNone',
+            'physicalAddress': _mac(mac),
+            'burnedInAddress': _mac(mac),
+            'interfaceAddress': [],
+        }
+        if address is not None:
+            interface['interfaceAddress'].append({
+                'primaryIp': {'address': address[0], 'maskLen': address[1]},
+                'secondaryIps': {},
+                'secondaryIpsOrderedList': [],
+                'virtualIp': {'address': '0.0.0.0', 'maskLen': 0},
+                'broadcastAddress': '255.255.255.255',
+            })
+        if counters is not None:
+            interface['interfaceCounters'] = counters
+            interface['interfaceStatistics'] = {'inBitsRate': 0.0, 'outBitsRate': 0.0,
+                                                'inPktsRate': 0.0, 'outPktsRate': 0.0,
+                                                'updateInterval': 300.0}
+        return interface
+
+    def show_interfaces(self):
+        system_mac = 0x001c73ff0000
+        interfaces = {}
+        for index, port in enumerate(self.ports):
+            interfaces[port] = self._interface(
+                port, 'ethernet', 'bridged', 100000000000, system_mac + index + 1,
+                description='host port {}'.format(index), counters=self._counters(index))
+        interfaces['Management1'] = self._interface(
+            'Management1', 'ethernet', 'routed', 1000000000, system_mac,
+            address=('192.168.0.10', 24), counters=self._counters(0), mtu=1500)
+        interfaces['Loopback0'] = self._interface(
+            'Loopback0', 'loopback', 'routed', 0, 0, address=(self.router_id, 32), mtu=65535)
+        for vlan in self.vlans:
+            name = 'Vlan{}'.format(vlan)
+            interfaces[name] = self._interface(
+                name, 'vlan', 'routed', 0, system_mac,
+                description='vlan {} in {}'.format(vlan, self.vlan_vrf[vlan]),
+                address=(self._gateway(vlan), self._prefix_length(vlan)), mtu=1500)
+        return {'interfaces': interfaces}
+
+    def show_interfaces_description(self):
+        descriptions = {}
+        for name, interface in self.show_interfaces()['interfaces'].items():
+            descriptions[name] = {
+                'description': interface['description'],
+                'interfaceStatus': 'up' if interface['interfaceStatus'] == 'connected'
+                                   else 'down',
+                'lineProtocolStatus': interface['lineProtocolStatus'],
+            }
+        return {'interfaceDescriptions': descriptions}
+
+    def show_mac_address_table(self):
+        return {
+            'multicastTable': {'tableEntries': []},
+            'unicastTable': {'tableEntries': [
+                {
+                    'macAddress': _mac(mac),
+                    'vlanId': vlan,
+                    'interface': port,
+                    'entryType': 'dynamic',
+                    'moves': 1,
+                    'lastMove': self.now - (mac % 86400),
+                }
+                for mac, vlan, port in self.macs
+            ]},
+        }
+
+    def show_arp(self):
+        neighbors = [
+            {
+                'address': _ip(address),
+                'hwAddress': _dotted_mac(mac),
+                'interface': 'Vlan{}, {}'.format(vlan, port),
+                'age': address % 14400,
+            }
+            for address, mac, vlan, port in self.arp
+        ]
+        return {
+            'ipV4Neighbors': neighbors,
+            'dynamicEntries': len(neighbors),
+            'staticEntries': 0,
+            'totalEntries': len(neighbors),
+            'notLearnedEntries': 0,
+        }
+
+    def show_ip_bgp_summary_vrf_all(self, vrf_name='all'):
+        vrfs = {}
+        for peer in self.peers:
+            if vrf_name != 'all' and peer['vrf'] != vrf_name:
+                continue
+            vrf = vrfs.setdefault(peer['vrf'], {
+                'vrf': peer['vrf'],
+                'routerId': self.router_id,
+                'asn': self.asn,
+                'peers': {},
+            })
+            vrf['peers'][peer['address']] = {
+                'asn': peer['remote_as'],
+                'peerState': 'Established' if peer['established'] else 'Active',
+                'upDownTime': self.now - peer['uptime'],
+                'prefixReceived': peer['received_prefixes'],
+                'prefixAccepted': peer['received_prefixes'],
+                'msgSent': peer['uptime'] // 60,
+                'msgReceived': peer['uptime'] // 60 + peer['received_prefixes'],
+                'inMsgQueue': 0,
+                'outMsgQueue': 0,
+                'underMaintenance': False,
+                'version': 4,
+            }
+        return {'vrfs': vrfs}
+
+    def show_ip_bgp_neighbors_vrf_all(self, address=None):
+        blocks = []
+        for index, peer in enumerate(self.peers):
+            if address is not None and peer['address'] != address:
+                continue
+            keepalives = peer['uptime'] // 60
+            updates_received = peer['received_prefixes'] if peer['established'] else 0
+            updates_sent = peer['sent_prefixes'] if peer['established'] else 0
+            blocks.append(_BGP_NEIGHBOR.format(
+                address=peer['address'],
+                remote_as=peer['remote_as'],
+                description='peer {} in {}'.format(index, peer['vrf']),
+                router_id=peer['router_id'],
+                vrf=peer['vrf'],
+                last_read=index % 60,
+                last_write=index % 60,
+                state='Established' if peer['established'] else 'Active',
+                updown='up' if peer['established'] else 'down',
+                uptime=_duration(peer['uptime']),
+                transitions=1 + index % 3,
+                last_state='OpenConfirm' if peer['established'] else 'Established',
+                last_event='RecvKeepAlive' if peer['established'] else 'Stop',
+                opens=1 + index % 3,
+                updates_sent=updates_sent,
+                updates_received=updates_received,
+                keepalives=keepalives,
+                total_sent=keepalives + updates_sent + 1 + index % 3,
+                total_received=keepalives + updates_received + 1 + index % 3,
+                sent_prefixes=updates_sent,
+                received_prefixes=updates_received,
+                import_policy='PEER-{}-IN'.format(peer['remote_as']),
+                export_policy='PEER-{}-OUT'.format(peer['remote_as']),
+                local_as=self.asn,
+                local_router_id=self.router_id,
+                local_address=self._gateway(peer['vlan']),
+                remote_port=30000 + index % 30000,
+            ))
+        return ''.join(blocks)
+
+    def _lookup(self, vrf, destination):
+        routes = self.routes.get(vrf, {})
+        if destination is None:
+            return sorted(routes, key=lambda prefix: _ip_value(prefix.split('/')[0]))
+        if '/' in destination:
+            return [destination] if destination in routes else []
+        address = _ip_value(destination)
+        for length in range(32, -1, -1):
+            mask = (0xffffffff << (32 - length)) & 0xffffffff
+            prefix = '{}/{}'.format(_ip(address & mask), length)
+            if prefix in routes:
+                return [prefix]
+        return []
+
+    def show_ip_route(self, vrf, destination=None, protocol=''):
+        """
+        The routes of ``vrf`` to ``destination``, all of them without a destination. With the
+        'all' VRF, the whole RIB.
+        """
+        if vrf == 'all':
+            return {'vrfs': {name: self.show_ip_route(name, destination, protocol)['vrfs'][name]
+                             for name in sorted(self.vrfs)}}
+        routes = {}
+        for prefix in self._lookup(vrf, destination):
+            route = self.routes[vrf][prefix]
+            if protocol == 'bgp' and route['type'] != 'eBGP' or \
+                    protocol == 'connected' and route['type'] != 'connected':
+                continue
+            if route['type'] == 'connected':
+                routes[prefix] = {'routeType': 'connected', 'preference': 0, 'metric': 0,
+                                  'directlyConnected': True, 'routeAction': 'forward',
+                                  'vias': [{'interface': route['interface']}]}
+            else:
+                routes[prefix] = {'routeType': 'eBGP', 'preference': 200, 'metric': 0,
+                                  'directlyConnected': False, 'routeAction': 'forward',
+                                  'vias': [{'interface': route['interface'],
+                                            'nexthopAddr': route['peer']['address']}]}
+            routes[prefix].update(kernelProgrammed=True, hardwareProgrammed=True)
+        return {'vrfs': {vrf: {
+            'routes': routes,
+            'routingDisabled': False,
+            'allRoutesProgrammedKernel': True,
+            'allRoutesProgrammedHardware': True,
+            'defaultRouteState': 'notSet',
+        }}}
+
+    def show_ip_bgp_route(self, prefix, vrf):
+        entries = {}
+        route = self.routes.get(vrf, {}).get(prefix)
+        if route is not None and route['type'] == 'eBGP':
+            peer = route['peer']
+            entries[prefix] = {
+                'address': prefix.split('/')[0],
+                'maskLength': int(prefix.split('/')[1]),
+                'totalPaths': 1,
+                'bgpRoutePaths': [{
+                    'asPathEntry': {'asPathType': 'External', 'asPath': route['as_path']},
+                    'med': 0,
+                    'localPreference': 100,
+                    'weight': 0,
+                    'nextHop': peer['address'],
+                    'routeType': {'active': True, 'valid': True, 'ecmp': False,
+                                  'ecmpHead': False, 'ecmpContributor': False,
+                                  'backup': False, 'stale': False, 'suppressed': False,
+                                  'queued': False, 'atomicAggregator': False},
+                    'routeDetail': {
+                        'origin': 'Igp',
+                        'peerEntry': {'peerAddr': peer['address'],
+                                      'peerRouterId': peer['router_id']},
+                        'communityList': ['{}:100'.format(peer['remote_as'])],
+                        'extCommunityList': [],
+                        'recvdFromRRClient': False,
+                    },
+                }],
+            }
+        return {'vrfs': {vrf: {'vrf': vrf, 'routerId': self.router_id, 'asn': self.asn,
+                               'bgpRouteEntries': entries}}}
+
+    def show_ip_interface_brief(self):
+        lines = ['Interface              IP Address         Status     Protocol          MTU',
+                 '---------------------- ------------------ ---------- -------------- ------']
+        routed = [('Management1', '192.168.0.10/24', 1500),
+                  ('Loopback0', '{}/32'.format(self.router_id), 65535)]
+        routed += [('Vlan{}'.format(vlan),
+                    '{}/{}'.format(self._gateway(vlan), self._prefix_length(vlan)), 1500)
+                   for vlan in self.vlans]
+        for name, address, mtu in routed:
+            lines.append('{:<22} {:<18} {:<10} {:<14} {:>6}'.format(
+                name, address, 'up', 'up', mtu))
+        return '\n'.join(lines) + '\n'
+
+    def show_vrf(self, name=None):
+        if name is not None and name not in self.vrfs[1:]:
+            raise ValueError('VRF {} does not exist'.format(name))
+        lines = ['Maximum number of vrfs allowed: 1024',
+                 ' Vrf     RD           Protocols    State                    Interfaces',
+                 '------- ------------ ------------ ------------------------- -------------------']
+        for index, vrf in enumerate(self.vrfs[1:]):
+            if name is not None and vrf != name:
+                continue
+            interfaces = ['Vlan{}'.format(vlan) for vlan in self.vlans
+                          if self.vlan_vrf[vlan] == vrf]
+            rows = [', '.join(interfaces[i:i + 3]) for i in range(0, len(interfaces), 3)]
+            rows = [row + ',' for row in rows[:-1]] + rows[-1:]
+            rows += [''] * (2 - len(rows))
+            lines.append(' {:<7} {:<12} {:<12} {:<25}{}'.format(
+                vrf, '{}:{}'.format(self.asn, index + 1), 'ipv4,ipv6', 'v4:routing,', rows[0]))
+            lines.append('{}{:<25}{}'.format(' ' * 35, 'v6:no routing', rows[1]).rstrip())
+            lines.extend(' ' * 60 + row for row in rows[2:])
+            lines.append('')
+        return '\n'.join(lines) + '\n'
+
+    def show_running_config(self):
+        lines = ['! Command: show running-config',
+                 '! device: {} (DCS-7280SR-48C6, EOS-4.20.1F)'.format(self.hostname),
+                 '!',
+                 'hostname {}'.format(self.hostname),
+                 '!',
+                 'spanning-tree mode mstp',
+                 '!']
+        for vlan in self.vlans:
+            lines.extend(['vlan {}'.format(vlan), '   name VLAN{}'.format(vlan), '!'])
+        for index, vrf in enumerate(self.vrfs[1:]):
+            lines.extend(['vrf definition {}'.format(vrf),
+                          '   rd {}:{}'.format(self.asn, index + 1), '!'])
+        for index, port in enumerate(self.ports):
+            lines.extend(['interface {}'.format(port),
+                          '   description host port {}'.format(index)])
+            if self.trunks:
+                lines.append('   switchport mode trunk')
+            else:
+                lines.append('   switchport access vlan {}'.format(self.port_vlan[port]))
+            lines.append('!')
+        lines.extend(['interface Loopback0',
+                      '   ip address {}/32'.format(self.router_id),
+                      '!',
+                      'interface Management1',
+                      '   ip address 192.168.0.10/24',
+                      '!'])
+        for vlan in self.vlans:
+            lines.extend(['interface Vlan{}'.format(vlan),
+                          '   description vlan {} in {}'.format(vlan, self.vlan_vrf[vlan])])
+            if self.vlan_vrf[vlan] != 'default':
+                lines.append('   vrf forwarding {}'.format(self.vlan_vrf[vlan]))
+            lines.extend(['   ip address {}/{}'.format(self._gateway(vlan),
+                                                       self._prefix_length(vlan)),
+                          '!'])
+        if self.acl_entries:
+            lines.append('ip access-list SYNTHETIC')
+            for index in range(self.acl_entries):
+                lines.append('   {} permit ip host {} any'.format(
+                    (index + 1) * 10, _ip(_ip_value('10.0.0.0') + index)))
+            lines.append('!')
+        lines.append('ip routing')
+        lines.extend('ip routing vrf {}'.format(vrf) for vrf in self.vrfs[1:])
+        lines.extend(['!', 'router bgp {}'.format(self.asn),
+                      '   router-id {}'.format(self.router_id)])
+        for vrf in self.vrfs:
+            indent = '   '
+            if vrf != 'default':
+                lines.extend(['   !', '   vrf {}'.format(vrf)])
+                indent = '      '
+            for peer in self.peers:
+                if peer['vrf'] != vrf:
+                    continue
+                address = peer['address']
+                lines.extend([
+                    '{}neighbor {} remote-as {}'.format(indent, address, peer['remote_as']),
+                    '{}neighbor {} description peer {}'.format(indent, address,
+                                                               peer['router_id']),
+                    '{}neighbor {} route-map PEER-{}-IN in'.format(
+                        indent, address, peer['remote_as']),
+                    '{}neighbor {} route-map PEER-{}-OUT out'.format(
+                        indent, address, peer['remote_as']),
+                    '{}neighbor {} maximum-routes 12000'.format(indent, address),
+                ])
+        lines.extend(['!', 'end'])
+        return '\n'.join(lines) + '\n'
+
+    def show_version(self):
+        return {
+            'modelName': 'DCS-7280SR-48C6',
+            'internalVersion': '4.20.1F-6820520.4201F',
+            'systemMacAddress': _mac(0x001c73ff0000),
+            'serialNumber': 'SSJ17000000',
+            'memTotal': 32458000,
+            'bootupTimestamp': self.now - 400 * 86400,
+            'memFree': 20000000,
+            'version': '4.20.1F',
+            'architecture': 'i386',
+            'isIntlVersion': False,
+            'internalBuildId': '3d4b6e2a-0e6b-4b7c-9c2b-0d2d2b6f0a1e',
+            'hardwareRevision': '11.00',
+        }
+
+    def show_hostname(self):
+        return {'hostname': self.hostname, 'fqdn': '{}.example.net'.format(self.hostname)}
+
+    def show_clock(self):
+        return '{}\nTimezone: UTC\nClock source: local\n'.format(
+            time.strftime('%a %b %d %H:%M:%S %Y', time.gmtime(self.now)))
+
+    def output(self, command, encoding='json'):
+        """
+        Return the output of ``command``, a dictionary for json or a string for text.
+
+        Text outputs support the ``include`` and ``section`` pipes. Raise ValueError for any
+        command the device does not know about.
+        """
+        command, _, pipe = command.partition(' | ')
+        json_outputs = {
+            'show interfaces': self.show_interfaces,
+            'show interfaces description': self.show_interfaces_description,
+            'show mac address-table': self.show_mac_address_table,
+            'show arp': self.show_arp,
+            'show ip bgp summary vrf all': self.show_ip_bgp_summary_vrf_all,
+            'show ipv6 bgp summary vrf all': lambda: {'vrfs': {}},
+            'show version': self.show_version,
+            'show hostname': self.show_hostname,
+        }
+        text_outputs = {
+            'show ip bgp neighbors vrf all': self.show_ip_bgp_neighbors_vrf_all,
+            'show ipv6 bgp neighbors vrf all': lambda: '',
+            'show running-config': self.show_running_config,
+            'show startup-config': self.show_running_config,
+            'show vrf': self.show_vrf,
+            'show ip interface brief': self.show_ip_interface_brief,
+            'show clock': self.show_clock,
+        }
+        route = _RE_ROUTE.match(command)
+        rib = _RE_RIB.match(command)
+        bgp_route = _RE_BGP_ROUTE.match(command)
+        bgp_summary = _RE_BGP_SUMMARY.match(command)
+        bgp_neighbor = _RE_BGP_NEIGHBOR.match(command)
+        if encoding == 'json' and not pipe and command in json_outputs:
+            return json_outputs[command]()
+        if encoding == 'json' and not pipe and route:
+            return self.show_ip_route(route.group('vrf'), route.group('destination'),
+                                      route.group('protocol') or '')
+        if encoding == 'json' and not pipe and rib:
+            return self.show_ip_route(rib.group('vrf'))
+        if encoding == 'json' and not pipe and _RE_RIB6.match(command):
+            # no IPv6 routes
+            return {'routes': {}}
+        if encoding == 'json' and not pipe and bgp_route:
+            return self.show_ip_bgp_route(bgp_route.group('prefix'), bgp_route.group('vrf'))
+        if encoding == 'json' and not pipe and bgp_summary:
+            # no IPv6 peers
+            if bgp_summary.group('v6'):
+                return {'vrfs': {}}
+            return self.show_ip_bgp_summary_vrf_all(bgp_summary.group('vrf'))
+        if encoding == 'text' and not pipe and _RE_VRF.match(command):
+            return self.show_vrf(_RE_VRF.match(command).group('name'))
+        if encoding == 'text' and not pipe and bgp_neighbor:
+            if bgp_neighbor.group('v6'):
+                return ''
+            return self.show_ip_bgp_neighbors_vrf_all(bgp_neighbor.group('address'))
+        if encoding == 'text' and command in text_outputs:
+            text = text_outputs[command]()
+            if pipe.startswith('include '):
+                return _include(text, pipe[len('include '):])
+            if pipe.startswith('section '):
+                return _section(text, pipe[len('section '):])
+            if not pipe:
+                return text
+        raise ValueError('Invalid input: {} ({})'.format(command, encoding))
+
+    def route_commands(self, destination, protocol=''):
+        """Commands get_route_to runs for ``destination``, in every VRF."""
+        commands = []
+        for vrf in sorted(self.vrfs):
+            commands.append('show ip route vrf {} {} {} detail'.format(
+                vrf, destination, protocol))
+            for prefix in self._lookup(vrf, destination):
+                if self.routes[vrf][prefix]['type'] == 'eBGP':
+                    commands.append('show ip bgp {} detail vrf {}'.format(prefix, vrf))
+        return commands
+
+    def write(self, directory, commands):
+        """
+        Write the output of ``commands`` to ``directory``, named the way FakeEOSDevice
+        looks for them. Commands are either a string, for json, or a (command, encoding).
+        """
+        for command in commands:
+            command, encoding = (command, 'json') if not isinstance(command, tuple) else command
+            output = self.output(command, encoding)
+            path = os.path.join(directory, '{}.{}'.format(
+                BaseTestDouble.sanitize_text(command), encoding))
+            with open(path, 'w') as f:
+                if encoding == 'json':
+                    json.dump(output, f)
+                else:
+                    f.write(output)
@@ -0,0 +1,313 @@
+"""
+A local stand-in for the eAPI of an EOS device.
+
+It answers ``runCmds`` over HTTP or HTTPS from a DeviceGenerator or from recorded fixtures,
+adding the latency, bandwidth limits and errors of a real network on request, so the
+transport can be benchmarked end to end without a device::
+
+    python -m napalm_eos.test.server --port 12443 --latency 0.05 --bandwidth 1000000 \\
+        --certfile cert.pem --keyfile key.pem --size interfaces=4000 --size bgp_peers=1000
+"""
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import base64
+import gzip
+import io
+import json
+import os
+import random
+import ssl
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from napalm_base.test.double import BaseTestDouble
+
+from napalm_eos.test.generator import DeviceGenerator
+
+
+# commands changing the CLI mode, accepted whatever the source
+NO_OUTPUT = ('enable', 'configure', 'end', 'exit', 'abort', 'commit')
+
+ERROR_KINDS = ('command', 'http', 'disconnect')
+
+# eAPI error code of a command failing
+INVALID_COMMAND = 1002
+
+
+class FixtureSource(object):
+    """Outputs recorded in a directory, named the way FakeEOSDevice looks for them."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def output(self, command, encoding='json'):
+        path = os.path.join(self.directory, '{}.{}'.format(
+            BaseTestDouble.sanitize_text(command), encoding))
+        if not os.path.exists(path):
+            raise ValueError('Invalid input: {} ({})'.format(command, encoding))
+        with open(path) as f:
+            return json.load(f) if encoding == 'json' else f.read()
+
+
+class EapiServer(object):
+    """
+    Serve ``runCmds`` for the commands of ``source``, an object with an
+    ``output(command, encoding)`` method such as a DeviceGenerator or a FixtureSource.
+
+    Every response is delayed by ``latency`` plus ``command_latency`` per command plus up to
+    ``jitter`` seconds, and written at ``bandwidth`` bytes per second at most. A request
+    fails with probability ``error_rate``, in one of ``error_kinds``: an eAPI error on one
+    of its commands, an HTTP 500 or the connection being dropped. Responses are gzipped for
+    clients asking for it, and served over TLS when ``certfile`` is given.
+    """
+
+    def __init__(self, source, address='127.0.0.1', port=0, latency=0.0, command_latency=0.0,
+                 jitter=0.0, bandwidth=None, error_rate=0.0, error_kinds=ERROR_KINDS,
+                 certfile=None, keyfile=None, username=None, password=None, seed=None):
+        self.source = source
+        self.latency = latency
+        self.command_latency = command_latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_kinds = error_kinds
+        self.username = username
+        self.password = password
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+
+        self._server = _ThreadingHTTPServer((address, port), _EapiHandler)
+        self._server.eapi = self
+        if certfile is not None:
+            context = ssl.SSLContext(getattr(ssl, 'PROTOCOL_TLS_SERVER', ssl.PROTOCOL_SSLv23))
+            context.load_cert_chain(certfile, keyfile)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self.transport = 'https' if certfile is not None else 'http'
+        self.address, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                'requests': 0,
+                'commands': 0,
+                'errors': 0,
+                'bytes_received': 0,
+                'bytes_sent': 0,
+            }
+
+    def count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def start(self):
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='napalm-eos-eapi-server')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def run_cmds(self, request, inject_error=False):
+        """
+        Return the JSON-RPC response to a decoded ``runCmds`` request, failing one of its
+        commands at random if ``inject_error`` is set.
+        """
+        params = request.get('params', {})
+        encoding = params.get('format', 'json')
+        commands = [command['cmd'] if isinstance(command, dict) else command
+                    for command in params.get('cmds', [])]
+        fail_at = None
+        if inject_error and commands:
+            fail_at = self._random.randrange(len(commands))
+
+        results = []
+        for index, command in enumerate(commands):
+            try:
+                if index == fail_at:
+                    raise ValueError('Injected error')
+                results.append(self._run(command, encoding))
+            except ValueError as e:
+                self.count(errors=1)
+                return {
+                    'jsonrpc': '2.0',
+                    'id': request.get('id'),
+                    'error': {
+                        'code': INVALID_COMMAND,
+                        'message': "CLI command {} of {} '{}' failed: invalid command".format(
+                            index + 1, len(commands), command),
+                        'data': results + [{'errors': ['{}'.format(e)]}],
+                    },
+                }
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': results}
+
+    def _run(self, command, encoding):
+        if command.split(' ')[0] in NO_OUTPUT:
+            output = {} if encoding == 'json' else ''
+        else:
+            output = self.source.output(command, encoding)
+        return output if encoding == 'json' else {'output': output}
+
+    def pick_error(self):
+        """Return the kind of error to inject in a request, if any."""
+        if self.error_rate > 0 and self.error_kinds and self._random.random() < self.error_rate:
+            return self._random.choice(self.error_kinds)
+        return None
+
+    def delay(self, commands):
+        return (self.latency + self.command_latency * commands +
+                self._random.uniform(0, self.jitter))
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _EapiHandler(BaseHTTPRequestHandler):
+
+    # keep the connections alive, as eAPI does
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        eapi = self.server.eapi
+        if self.path != '/command-api':
+            self._reply(404, b'')
+            return
+        if eapi.username is not None and not self._authorized(eapi):
+            self._reply(401, b'', [('WWW-Authenticate', 'Basic realm="eAPI"')])
+            return
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            request = json.loads(body.decode('utf-8'))
+        except ValueError:
+            self._reply(400, b'')
+            return
+        commands = len(request.get('params', {}).get('cmds', []))
+        eapi.count(requests=1, commands=commands, bytes_received=len(body))
+
+        kind = eapi.pick_error()
+        time.sleep(eapi.delay(commands))
+        if kind == 'disconnect':
+            eapi.count(errors=1)
+            self.close_connection = True
+            return
+        if kind == 'http':
+            eapi.count(errors=1)
+            self._reply(500, b'')
+            return
+
+        content = json.dumps(eapi.run_cmds(request, inject_error=kind == 'command'))
+        content = content.encode('utf-8')
+        headers = [('Content-Type', 'application/json')]
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            compressed = io.BytesIO()
+            with gzip.GzipFile(fileobj=compressed, mode='wb') as f:
+                f.write(content)
+            content = compressed.getvalue()
+            headers.append(('Content-Encoding', 'gzip'))
+        self._reply(200, content, headers)
+
+    def _authorized(self, eapi):
+        expected = base64.b64encode('{}:{}'.format(eapi.username, eapi.password)
+                                    .encode('utf-8')).decode('ascii')
+        return self.headers.get('Authorization', '') == 'Basic {}'.format(expected)
+
+    def _reply(self, status, content, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', '{}'.format(len(content)))
+        self.end_headers()
+        # counted first, so the stats are complete once the client has the response
+        self.server.eapi.count(bytes_sent=len(content))
+        self._write(content)
+
+    def _write(self, content):
+        bandwidth = self.server.eapi.bandwidth
+        if not bandwidth:
+            self.wfile.write(content)
+            return
+        # ten chunks per second at most, paced to the bandwidth
+        chunk = max(int(bandwidth // 10), 1)
+        started = time.time()
+        for offset in range(0, len(content), chunk):
+            self.wfile.write(content[offset:offset + chunk])
+            ahead = (offset + chunk) / bandwidth - (time.time() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _size(value):
+    name, _, count = value.partition('=')
+    return name, int(count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--address', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fixtures', help='directory of recorded outputs, instead of the '
+                                           'generated ones')
+    parser.add_argument('--size', type=_size, action='append', default=[],
+                        help='argument of the DeviceGenerator, e.g. bgp_peers=1000')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every request')
+    parser.add_argument('--command-latency', type=float, default=0.0,
+                        help='seconds added for every command of a request')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='up to this many seconds added at random')
+    parser.add_argument('--bandwidth', type=float, help='bytes per second')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-kind', action='append', choices=ERROR_KINDS)
+    parser.add_argument('--certfile')
+    parser.add_argument('--keyfile')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        source = FixtureSource(args.fixtures)
+    else:
+        source = DeviceGenerator(**dict(args.size))
+    server = EapiServer(source, address=args.address, port=args.port, latency=args.latency,
+                        command_latency=args.command_latency, jitter=args.jitter,
+                        bandwidth=args.bandwidth, error_rate=args.error_rate,
+                        error_kinds=tuple(args.error_kind or ERROR_KINDS),
+                        certfile=args.certfile, keyfile=args.keyfile,
+                        username=args.username, password=args.password, seed=args.seed)
+    print('Serving eAPI on {}://{}:{}/command-api'.format(
+        server.transport, server.address, server.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""Topology graph of a fleet of EOS devices, from their LLDP neighbors."""
+from __future__ import unicode_literals
+
+import re
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from collections import deque
+
+
+# interface types, an abbreviation being expanded to the first one it starts
+INTERFACE_TYPES = (
+    'Ethernet',
+    'Management',
+    'Port-Channel',
+    'Loopback',
+    'Vlan',
+    'Vxlan',
+    'Tunnel',
+    'GigabitEthernet',
+    'TenGigabitEthernet',
+    'FortyGigabitEthernet',
+    'HundredGigabitEthernet',
+    'FastEthernet',
+)
+
+# abbreviations which are not the start of their type
+INTERFACE_ALIASES = {
+    'mgmt': 'Management',
+}
+
+_RE_INTERFACE = re.compile(r'^(?P<name>[a-zA-Z-]+)\s*(?P<number>\d.*)$')
+
+_interface_names = {}
+
+
+def canonical_interface(name):
+    """Return ``name`` with its type spelled in full, e.g. ``Ethernet1/1`` for ``Et1/1``."""
+    canonical = _interface_names.get(name)
+    if canonical is None:
+        canonical = name.strip()
+        match = _RE_INTERFACE.match(canonical)
+        if match:
+            prefix = match.group('name').lower()
+            full = INTERFACE_ALIASES.get(prefix)
+            if full is None and len(prefix) >= 2:
+                full = next((interface_type for interface_type in INTERFACE_TYPES
+                             if interface_type.lower().startswith(prefix)), None)
+            if full is not None:
+                canonical = full + match.group('number')
+        if len(_interface_names) < 65536:
+            _interface_names[name] = canonical
+    return canonical
+
+
+def _node(hostname):
+    # devices are known by their hostname without the domain
+    return hostname.split('.')[0] if hostname else hostname
+
+
+def poll(drivers, getter, workers=16):
+    """
+    Call ``getter`` on every driver from ``workers`` threads. Return the results and the
+    exceptions raised, both keyed by driver.
+    """
+    results, errors = {}, {}
+    pending = queue.Queue()
+    for driver in drivers:
+        pending.put(driver)
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            try:
+                driver = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                result = getattr(driver, getter)()
+                with lock:
+                    results[driver] = result
+            except Exception as e:
+                with lock:
+                    errors[driver] = e
+
+    threads = [threading.Thread(target=work, name='napalm-eos-topology-{}'.format(index))
+               for index in range(max(min(workers, len(drivers)), 1))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class Topology(object):
+    """
+    Adjacency lists of the devices and of the neighbors they report over LLDP.
+
+    Nodes are hostnames without their domain and links are kept with the canonical names of
+    their interfaces on both ends, counted once whether one or both ends report them.
+    refresh() polls get_lldp_neighbors on every driver in parallel and only updates the
+    devices whose neighbors changed. With ``detail``, get_lldp_neighbors_detail is polled on
+    those devices only, for the chassis ID, description and capabilities of their
+    neighbors, kept in ``attributes``.
+    """
+
+    def __init__(self, drivers=(), workers=16, detail=False):
+        self.drivers = list(drivers)
+        self.workers = workers
+        self.detail = detail
+        self.errors = {}
+        self.attributes = {}
+        self._lock = threading.RLock()
+        # node -> neighbor -> {(local interface, remote interface): number of reporters}
+        self._adjacency = {}
+        # node -> the (local interface, neighbor, remote interface) it reported
+        self._reported = {}
+        # driver -> node and the neighbors it last reported
+        self._names = {}
+        self._neighbors = {}
+
+    def __len__(self):
+        return len(self._adjacency)
+
+    def __contains__(self, node):
+        return node in self._adjacency
+
+    def refresh(self):
+        """Poll the drivers and update the devices whose neighbors changed, returned."""
+        unnamed = [driver for driver in self.drivers if driver not in self._names]
+        facts, errors = poll(unnamed, 'get_facts', self.workers)
+        for driver, result in facts.items():
+            self._names[driver] = _node(result['hostname'])
+
+        named = [driver for driver in self.drivers if driver in self._names]
+        lldp, lldp_errors = poll(named, 'get_lldp_neighbors', self.workers)
+        errors.update(lldp_errors)
+        changed = [driver for driver, neighbors in lldp.items()
+                   if self._neighbors.get(driver) != neighbors]
+
+        details = {}
+        if self.detail and changed:
+            details, detail_errors = poll(changed, 'get_lldp_neighbors_detail', self.workers)
+            errors.update(detail_errors)
+            changed = [driver for driver in changed if driver in details]
+
+        with self._lock:
+            self.errors = dict((getattr(driver, 'hostname', driver), error)
+                               for driver, error in errors.items())
+            for driver in changed:
+                self._neighbors[driver] = lldp[driver]
+                self.update(self._names[driver], lldp[driver], details.get(driver))
+        return sorted(self._names[driver] for driver in changed)
+
+    def update(self, node, neighbors, detail=None):
+        """
+        Replace the links reported by ``node`` with ``neighbors``, as returned by
+        get_lldp_neighbors, and the attributes of its neighbors with ``detail``, as
+        returned by get_lldp_neighbors_detail.
+        """
+        reported = set()
+        for interface, entries in neighbors.items():
+            for entry in entries:
+                reported.add((canonical_interface(interface), _node(entry['hostname']),
+                              canonical_interface(entry['port'])))
+        with self._lock:
+            self._adjacency.setdefault(node, {})
+            previous = self._reported.get(node, set())
+            for link in previous - reported:
+                self._unlink(node, *link)
+            for link in reported - previous:
+                self._link(node, *link)
+            self._reported[node] = reported
+            if detail is not None:
+                for interface, entries in detail.items():
+                    for entry in entries:
+                        self.attributes[_node(entry.get('remote_system_name'))] = {
+                            'chassis_id': entry.get('remote_chassis_id', ''),
+                            'description': entry.get('remote_system_description', ''),
+                            'capabilities': entry.get('remote_system_capab', ''),
+                        }
+
+    def remove(self, node):
+        """Remove the links reported by ``node``."""
+        self.update(node, {})
+        with self._lock:
+            self._reported.pop(node, None)
+            if not self._adjacency.get(node):
+                self._adjacency.pop(node, None)
+
+    def _link(self, node, interface, neighbor, port):
+        for a, b, key in ((node, neighbor, (interface, port)), (neighbor, node, (port, interface))):
+            links = self._adjacency.setdefault(a, {}).setdefault(b, {})
+            links[key] = links.get(key, 0) + 1
+
+    def _unlink(self, node, interface, neighbor, port):
+        for a, b, key in ((node, neighbor, (interface, port)), (neighbor, node, (port, interface))):
+            links = self._adjacency[a][b]
+            links[key] -= 1
+            if not links[key]:
+                del links[key]
+            if not links:
+                del self._adjacency[a][b]
+            if not self._adjacency[a] and a not in self._reported:
+                del self._adjacency[a]
+
+    def nodes(self):
+        return sorted(self._adjacency)
+
+    def neighbors(self, node):
+        """Return the neighbors of ``node`` with the (local, remote) interfaces of the links."""
+        return dict((neighbor, sorted(links))
+                    for neighbor, links in self._adjacency.get(node, {}).items())
+
+    def degree(self, node):
+        """Number of links of ``node``."""
+        return sum(len(links) for links in self._adjacency.get(node, {}).values())
+
+    def degrees(self):
+        return dict((node, sum(len(links) for links in neighbors.values()))
+                    for node, neighbors in self._adjacency.items())
+
+    def links(self):
+        """Every link once, as ``(node, interface, neighbor, interface)``."""
+        return sorted((node, interface, neighbor, port)
+                      for node, neighbors in self._adjacency.items()
+                      for neighbor, links in neighbors.items()
+                      for interface, port in links
+                      if (node, interface) < (neighbor, port))
+
+    def shortest_path(self, source, target):
+        """Return the nodes of a shortest path from ``source`` to ``target``, or None."""
+        with self._lock:
+            adjacency = self._adjacency
+            if source not in adjacency or target not in adjacency:
+                return None
+            if source == target:
+                return [source]
+            # breadth first from both ends, always expanding the smaller frontier
+            parents = {source: None}
+            children = {target: None}
+            forward, backward = deque([source]), deque([target])
+            while forward and backward:
+                if len(forward) <= len(backward):
+                    meeting = self._expand(forward, parents, children)
+                else:
+                    meeting = self._expand(backward, children, parents)
+                if meeting is not None:
+                    break
+            else:
+                return None
+
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = parents[node]
+        path.reverse()
+        node = children[meeting]
+        while node is not None:
+            path.append(node)
+            node = children[node]
+        return path
+
+    def _expand(self, frontier, seen, other):
+        # one level of a breadth first search, returning a node reached from both ends
+        for _ in range(len(frontier)):
+            node = frontier.popleft()
+            for neighbor in self._adjacency[node]:
+                if neighbor not in seen:
+                    seen[neighbor] = node
+                    if neighbor in other:
+                        return neighbor
+                    frontier.append(neighbor)
+        return None
@@ -0,0 +1,185 @@
+"""Record the eAPI calls of a driver to an archive and replay them without a device."""
+from __future__ import unicode_literals
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+
+from pyeapi.eapilib import CommandError
+
+from napalm_base.exceptions import ConnectionException
+
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+# the configuration session names, unique to every run
+_RE_SESSION = re.compile(r'^(configure session |show session-config named )(\S+)')
+
+
+def _key(commands, encoding):
+    # calls in a configuration session match whatever the name of the session
+    return encoding, _dumps([_RE_SESSION.sub(r'\1<session>', command) for command in commands])
+
+
+def _sessions(commands):
+    return [match.group(2) for match in map(_RE_SESSION.match, commands) if match]
+
+
+class Archive(object):
+    """
+    A gzipped stream of JSON lines holding the calls made to run_commands.
+
+    Outputs are stored once, under the SHA-1 of their content, and the calls only refer to
+    them, so polling the same device over and over mostly adds references. They are kept
+    encoded and every replay decodes a fresh copy, as pyeapi would. The whole archive is one
+    compressed stream, so that similar outputs compress against each other. Recording to an
+    existing archive rewrites it as a single stream first. The stream is flushed after every
+    call, so an interrupted recording is still readable.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.blobs = {}
+        self.calls = defaultdict(list)
+        self._lock = threading.Lock()
+        self._writer = None
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with gzip.open(self.path, 'rb') as f:
+            try:
+                for line in f:
+                    record = json.loads(line.decode('utf-8'))
+                    if 'blob' in record:
+                        self.blobs[record['blob']] = _dumps(record['data'])
+                    else:
+                        self.calls[_key(record['commands'], record['encoding'])].append(record)
+            except EOFError:
+                # the recording was not closed, everything up to its last flush is there
+                pass
+
+    def _open(self):
+        # what was loaded is written again, so that the archive stays a single stream
+        self._writer = gzip.open(self.path, 'wb')
+        for digest, content in self.blobs.items():
+            self._writer.write(self._line({'blob': digest, 'data': json.loads(content)}))
+        for calls in self.calls.values():
+            for call in calls:
+                self._writer.write(self._line(call))
+
+    @staticmethod
+    def _line(record):
+        return (_dumps(record) + '\n').encode('utf-8')
+
+    def append(self, commands, encoding, outputs=None, error=None):
+        """Store a call, with either the ``outputs`` or the ``error`` it got."""
+        records = []
+        call = {'commands': list(commands), 'encoding': encoding}
+        with self._lock:
+            if self._writer is None:
+                self._open()
+            if error is not None:
+                call['error'] = error
+            else:
+                call['outputs'] = []
+                for output in outputs:
+                    content = _dumps(output)
+                    digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+                    if digest not in self.blobs:
+                        self.blobs[digest] = content
+                        records.append({'blob': digest, 'data': output})
+                    call['outputs'].append(digest)
+            records.append(call)
+            for record in records:
+                self._writer.write(self._line(record))
+            self._writer.flush()
+            self.calls[_key(commands, encoding)].append(call)
+
+    def close(self):
+        """Write the end of the stream."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+class RecordingDevice(object):
+    """Wrap a pyeapi Node to append every call to an Archive."""
+
+    def __init__(self, device, path):
+        self._device = device
+        self._archive = Archive(path)
+
+    def run_commands(self, commands, encoding='json', **kwargs):
+        try:
+            outputs = self._device.run_commands(commands, encoding=encoding, **kwargs)
+        except CommandError as e:
+            self._archive.append(commands, encoding, error={
+                'code': e.error_code,
+                'message': e.error_text,
+                'command_error': e.command_error,
+                'output': e.output,
+            })
+            raise
+        self._archive.append(commands, encoding, outputs=outputs)
+        return outputs
+
+    def close_archive(self):
+        self._archive.close()
+
+    def __getattr__(self, name):
+        return getattr(self._device, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._device, name, value)
+
+
+class ReplayDevice(object):
+    """
+    Answer run_commands from an Archive.
+
+    The same commands get the recorded responses in the order they were recorded, the last
+    one being repeated once they run out. Commands never recorded raise ConnectionException.
+    Configuration sessions match whatever their names, the recorded names being replaced by
+    the ones of the replay in the responses.
+    """
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise ConnectionException('No archive to replay at {}'.format(path))
+        self._archive = Archive(path)
+        self._position = defaultdict(int)
+        # recorded session name -> session name of the replay
+        self._sessions = {}
+
+    def _decode(self, content):
+        for recorded, session in self._sessions.items():
+            content = content.replace(json.dumps(recorded)[1:-1], json.dumps(session)[1:-1])
+        return json.loads(content)
+
+    def run_commands(self, commands, encoding='json', **kwargs):
+        key = _key(commands, encoding)
+        calls = self._archive.calls.get(key)
+        if not calls:
+            raise ConnectionException('{} ({}) is not in the archive {}'.format(
+                list(commands), encoding, self._archive.path))
+        call = calls[min(self._position[key], len(calls) - 1)]
+        self._position[key] += 1
+        for recorded, session in zip(_sessions(call['commands']), _sessions(commands)):
+            if recorded != session:
+                self._sessions[recorded] = session
+        if 'error' in call:
+            error = self._decode(_dumps(call['error']))
+            raise CommandError(error['code'], error['message'], commands=list(commands),
+                               command_error=error['command_error'], output=error['output'])
+        return [self._decode(self._archive.blobs[digest]) for digest in call['outputs']]
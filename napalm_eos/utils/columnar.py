@@ -0,0 +1,142 @@
+"""
+Columnar tables: the outputs of the table getters as one array per field.
+
+The columns are filled straight from the eAPI output, without building a dict per row. A
+table is a dict of field -> column, the numeric and boolean fields in typed ``array``
+objects, the booleans as 0/1 bytes, and the strings in lists of interned strings. With
+NumPy installed, a table can be a structured array with a named field per column instead.
+"""
+from __future__ import unicode_literals
+
+from array import array
+
+from napalm_base.utils import py23_compat
+
+from napalm_eos.utils import normalize
+from napalm_eos.utils.counters import COUNTER_FIELDS
+from napalm_eos.utils.records import intern_string
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+ARP_FIELDS = ('interface', 'mac', 'ip', 'age')
+MAC_FIELDS = ('mac', 'interface', 'vlan', 'active', 'static', 'moves', 'last_move')
+COUNTERS_FIELDS = ('interface',) + COUNTER_FIELDS
+
+# signed, so the counters the device did not report can be -1 as in get_interfaces_counters
+try:
+    _COUNTER_TYPECODE = str('q')
+    array(_COUNTER_TYPECODE)
+except ValueError:
+    _COUNTER_TYPECODE = str('l')
+
+# the array typecodes which are not a NumPy type of the same meaning
+_NUMPY_TYPES = {
+    'b': '?',
+}
+
+# eAPI keys of the COUNTER_FIELDS without the errors, in 'show interfaces' and
+# 'show interfaces counters'
+_COUNTER_KEYS = (
+    'outOctets',
+    'inOctets',
+    'outUcastPkts',
+    'inUcastPkts',
+    'outMulticastPkts',
+    'inMulticastPkts',
+    'outBroadcastPkts',
+    'inBroadcastPkts',
+    'outDiscards',
+    'inDiscards',
+)
+
+
+def use_numpy(option):
+    """
+    Whether the ``columnar_tables`` option asks for NumPy structured arrays: True does when
+    NumPy is installed, 'numpy' always does and 'array' never does.
+    """
+    if option == 'numpy':
+        if numpy is None:
+            raise ImportError('columnar_tables is numpy but NumPy is not installed')
+        return True
+    return option is True and numpy is not None
+
+
+def _table(fields, columns, structured):
+    if not structured:
+        return dict(zip(fields, columns))
+    dtype = []
+    for field, column in zip(fields, columns):
+        if isinstance(column, array):
+            dtype.append((str(field), str(_NUMPY_TYPES.get(column.typecode, column.typecode))))
+        else:
+            width = max([len(value) for value in column if value is not None] or [1])
+            dtype.append((str(field), str('U{}'.format(width))))
+    table = numpy.empty(len(columns[0]), dtype=dtype)
+    for field, column in zip(fields, columns):
+        if len(column):
+            table[str(field)] = column
+    return table
+
+
+def arp_table(ipv4_neighbors, structured=False):
+    """The columns of get_arp_table from the ``ipV4Neighbors`` of 'show arp'."""
+    interfaces, macs, ips, ages = [], [], [], array(str('d'))
+    for neighbor in ipv4_neighbors:
+        interfaces.append(intern_string(py23_compat.text_type(neighbor.get('interface'))))
+        macs.append(normalize.mac(neighbor.get('hwAddress')))
+        ips.append(normalize.ip(py23_compat.text_type(neighbor.get('address'))))
+        ages.append(float(neighbor.get('age')))
+    return _table(ARP_FIELDS, (interfaces, macs, ips, ages), structured)
+
+
+def mac_address_table(mac_entries, structured=False):
+    """The columns of get_mac_address_table from the ``tableEntries`` of the unicast table."""
+    macs, interfaces = [], []
+    vlans, statics = array(str('l')), array(str('b'))
+    moves, last_moves = array(str('l')), array(str('d'))
+    for mac_entry in mac_entries:
+        macs.append(normalize.mac(mac_entry.get('macAddress')))
+        interfaces.append(intern_string(mac_entry.get('interface')))
+        vlans.append(mac_entry.get('vlanId'))
+        statics.append(mac_entry.get('entryType') == 'static')
+        moves.append(mac_entry.get('moves', 0))
+        last_moves.append(mac_entry.get('lastMove', 0.0))
+    actives = array(str('b'), [True]) * len(macs)
+    return _table(MAC_FIELDS, (macs, interfaces, vlans, actives, statics, moves, last_moves),
+                  structured)
+
+
+def interfaces_counters(interfaces, errors=None, structured=False):
+    """
+    The columns of get_interfaces_counters from the ``interfaces`` of 'show interfaces', or
+    of 'show interfaces counters' with the ``interfaceErrorCounters`` of
+    'show interfaces counters errors' as ``errors``.
+    """
+    names = []
+    columns = [array(_COUNTER_TYPECODE) for _ in COUNTER_FIELDS]
+    counter_columns = list(zip(columns, _COUNTER_KEYS))
+    tx_errors, rx_errors = columns[-2:]
+    for interface, data in interfaces.items():
+        if errors is None:
+            if data['hardware'] == 'subinterface':
+                continue
+            counters = data.get('interfaceCounters', {})
+            interface_errors = counters
+            error_keys = ('totalOutErrors', 'totalInErrors')
+        else:
+            if '.' in interface:
+                continue
+            counters = data
+            interface_errors = errors.get(interface, {})
+            error_keys = ('outErrors', 'inErrors')
+        names.append(interface)
+        for column, key in counter_columns:
+            column.append(counters.get(key, -1))
+        tx_errors.append(interface_errors.get(error_keys[0], -1))
+        rx_errors.append(interface_errors.get(error_keys[1], -1))
+    return _table(COUNTERS_FIELDS, [names] + columns, structured)
@@ -0,0 +1,154 @@
+"""Per-second interface rates computed from successive get_interfaces_counters samples."""
+from __future__ import division
+from __future__ import unicode_literals
+
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+COUNTER_FIELDS = (
+    'tx_octets',
+    'rx_octets',
+    'tx_unicast_packets',
+    'rx_unicast_packets',
+    'tx_multicast_packets',
+    'rx_multicast_packets',
+    'tx_broadcast_packets',
+    'rx_broadcast_packets',
+    'tx_discards',
+    'rx_discards',
+    'tx_errors',
+    'rx_errors',
+)
+
+# 64-bit unsigned storage, the all-ones value marks a counter the device did not report
+try:
+    _TYPECODE = str('Q')
+    array(_TYPECODE)
+except ValueError:
+    _TYPECODE = str('L')
+_MISSING = 2 ** (8 * array(_TYPECODE).itemsize) - 1
+
+
+def _wrapped_delta(previous, current):
+    """Delta of a counter that went backwards: either a 32/64-bit wrap or a clear."""
+    for bits in (32, 64):
+        limit = 2 ** bits
+        if previous < limit:
+            if previous >= limit // 4 * 3 and current < limit // 4:
+                return limit - previous + current
+            break
+    # the counters were cleared, count from zero the same way Prometheus does
+    return current
+
+
+def _rates(previous, current, elapsed, rates):
+    """Write into ``rates`` the rates of the counters of ``previous`` and ``current``."""
+    if elapsed <= 0 or not rates:
+        return
+    if numpy is not None:
+        # views of the arrays, the rates are computed without a Python loop but for wraps
+        previous = numpy.frombuffer(previous, dtype=_TYPECODE)[:len(rates)]
+        current = numpy.frombuffer(current, dtype=_TYPECODE)[:len(rates)]
+        valid = (previous != _MISSING) & (current != _MISSING)
+        deltas = (current - previous).astype('d')
+        for position in numpy.nonzero(valid & (current < previous))[0]:
+            deltas[position] = _wrapped_delta(int(previous[position]), int(current[position]))
+        numpy.frombuffer(rates, dtype='d')[valid] = deltas[valid] / elapsed
+        return
+    for position in range(len(rates)):
+        last, value = previous[position], current[position]
+        if last == _MISSING or value == _MISSING:
+            continue
+        delta = value - last
+        if delta < 0:
+            delta = _wrapped_delta(last, value)
+        rates[position] = delta / elapsed
+
+
+class CounterRates(object):
+    """
+    Keep the previous counters sample and turn the next one into per-second rates.
+
+    Samples are held in one preallocated array per counter of ``COUNTER_FIELDS``, indexed by
+    the position of the interface in ``interfaces``, so polling thousands of ports does not
+    keep thousands of dicts alive between polls. The rates come back in the same layout, as
+    the columnar table of get_interfaces_counters with the ``columnar_tables`` option: the
+    ``interface`` names and an array of rates per counter. Rates are -1.0 when they cannot be
+    computed, e.g. on the first sample. They are computed with NumPy when it is installed.
+    """
+
+    def __init__(self):
+        self.interfaces = []
+        self._index = {}
+        self._capacity = 0
+        self._previous = [array(_TYPECODE) for _ in COUNTER_FIELDS]
+        self._current = [array(_TYPECODE) for _ in COUNTER_FIELDS]
+        self._missing = array(_TYPECODE)
+        self._timestamp = None
+
+    def poll(self, driver, timestamp=None):
+        """Fetch the counters from ``driver`` and return their rates."""
+        return self.update(driver.get_interfaces_counters(), timestamp=timestamp)
+
+    def _positions(self, interfaces):
+        positions = []
+        for interface in interfaces:
+            position = self._index.get(interface)
+            if position is None:
+                position = self._index[interface] = len(self.interfaces)
+                self.interfaces.append(interface)
+            positions.append(position)
+        if len(self.interfaces) > self._capacity:
+            # grow by doubling, so that new interfaces seldom reallocate the arrays
+            grow = max(len(self.interfaces), 2 * self._capacity) - self._capacity
+            padding = array(_TYPECODE, [_MISSING]) * grow
+            for column in self._previous + self._current + [self._missing]:
+                column.extend(padding)
+            self._capacity += grow
+        return positions
+
+    def update(self, counters, timestamp=None):
+        """
+        Store a new sample, as returned by get_interfaces_counters, with or without the
+        ``columnar_tables`` option, and return the rates of all the interfaces seen so far.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        # a NumPy structured array, or a dict of columns
+        columnar = hasattr(counters, 'dtype') or (
+            'interface' in counters and not isinstance(counters['interface'], dict))
+        positions = self._positions(counters['interface'] if columnar else counters)
+        current = self._current
+        for column in current:
+            column[:] = self._missing
+        if columnar:
+            for field, column in zip(COUNTER_FIELDS, current):
+                for position, value in zip(positions, counters[str(field)]):
+                    if value >= 0:
+                        column[position] = value
+        else:
+            for position, values in zip(positions, counters.values()):
+                for field, column in zip(COUNTER_FIELDS, current):
+                    value = values.get(field, -1)
+                    if value >= 0:
+                        column[position] = value
+
+        elapsed = timestamp - self._timestamp if self._timestamp is not None else 0
+        rates = {'interface': list(self.interfaces)}
+        for field, previous, column in zip(COUNTER_FIELDS, self._previous, current):
+            rates[field] = array(str('d'), [-1.0]) * len(self.interfaces)
+            _rates(previous, column, elapsed, rates[field])
+        self._previous, self._current = current, self._previous
+        self._timestamp = timestamp
+        return rates
+
+    def reset(self):
+        """Forget the previous sample."""
+        self.__init__()
@@ -0,0 +1,313 @@
+"""Timing of the eAPI calls and getters of a driver, split by phase."""
+from __future__ import division
+from __future__ import unicode_literals
+
+import bisect
+import functools
+import re
+import threading
+import time
+
+
+# upper bounds of the histogram buckets in seconds, 1us to ~67s
+BUCKETS = tuple(1e-6 * 2 ** i for i in range(27))
+
+PHASES = ('total', 'transport', 'decode', 'parse')
+
+# distinct names kept per kind, the others being counted under OTHER
+MAX_NAMES = 1000
+OTHER = 'other'
+
+# addresses, prefixes and numbers
+_RE_VALUE = re.compile(r'[0-9a-fA-F.:]*[0-9][0-9a-fA-F.:]*(?:/[0-9]+)?\Z')
+_INTERFACE = (r'(?:ethernet|et|port-channel|po|vlan|vl|loopback|lo|management|ma|vxlan|vx|'
+              r'tunnel|tu)[0-9/.-]+')
+# interfaces, ranges and lists of them
+_RE_INTERFACE = re.compile(r'{0}(?:,(?:{0}|[0-9/.-]+))*\Z'.format(_INTERFACE), re.IGNORECASE)
+_MASKED_AFTER = {
+    'vrf': '<vrf>',
+    'session': '<session>',
+    'section': '<pattern>',
+    'include': '<pattern>',
+    'exclude': '<pattern>',
+    'begin': '<pattern>',
+}
+_SESSION_CONTROL = ('commit', 'abort', 'end')
+
+
+def _command_name(command):
+    words = []
+    for word in command.split():
+        masked = _MASKED_AFTER.get(words[-1]) if words else None
+        if masked == '<pattern>':
+            # the rest of the command is the pattern of the pipe
+            words.append(masked)
+            break
+        if masked is not None:
+            words.append(masked)
+            continue
+        if _RE_VALUE.match(word):
+            word = '<value>'
+        elif _RE_INTERFACE.match(word):
+            word = '<interface>'
+        elif word.startswith('flash:'):
+            word = '<file>'
+        words.append(word)
+    return ' '.join(words)
+
+
+def command_name(commands):
+    """
+    Name of a request of ``commands`` in the histograms, without what changes from one
+    request to the next: addresses, numbers, interfaces, VRFs, sessions and files are masked,
+    and the lines sent in a configuration session are counted as a single 'config'.
+    """
+    names = []
+    configuring = False
+    for command in commands:
+        command = command.strip()
+        if command.startswith('configure session'):
+            configuring = True
+            name = 'configure session'
+        elif configuring and command in _SESSION_CONTROL:
+            configuring = False
+            name = command
+        elif configuring and not command.startswith('show '):
+            name = 'config'
+        else:
+            name = _command_name(command)
+        if not names or names[-1] != name or name != 'config':
+            names.append(name)
+    return '; '.join(names)
+
+
+class Histogram(object):
+    """Counts of values in exponential buckets, with their sum, min and max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min or 0.0,
+            'max': self.max or 0.0,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+        }
+
+
+class Instrumentation(object):
+    """
+    Collect the timings of a driver.
+
+    Every eAPI request and every getter produces an event, a dictionary with the ``kind``
+    ('command' or 'getter') and the ``name`` of the getter, or of the request as given by
+    command_name(). Requests also have their ``encoding``, and with ``raw_commands`` the
+    ``commands`` sent, configuration lines and their secrets included. Events have the
+    ``total``, ``transport``, ``decode`` and ``parse`` durations in seconds, along with the
+    ``request_bytes`` and ``response_bytes`` when the transport exposes them. Events are
+    passed to the callbacks and aggregated into histograms per name and phase, up to
+    MAX_NAMES names per kind, the others under OTHER.
+    """
+
+    def __init__(self, callbacks=None, raw_commands=False):
+        self.callbacks = list(callbacks or [])
+        self.raw_commands = raw_commands
+        self.histograms = {}
+        self.bytes = {}
+        self._names = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, event):
+        key = (event['kind'], event['name'])
+        with self._lock:
+            histograms = self.histograms.get(key)
+            if histograms is None and self._names.get(key[0], 0) >= MAX_NAMES:
+                key = (key[0], OTHER)
+                histograms = self.histograms.get(key)
+            if histograms is None:
+                histograms = self.histograms[key] = {phase: Histogram() for phase in PHASES}
+                self._names[key[0]] = self._names.get(key[0], 0) + 1
+                self.bytes[key] = [0, 0]
+            for phase in PHASES:
+                if phase in event:
+                    histograms[phase].add(event[phase])
+            self.bytes[key][0] += event.get('request_bytes', 0)
+            self.bytes[key][1] += event.get('response_bytes', 0)
+        for callback in self.callbacks:
+            callback(event)
+
+    def summary(self):
+        """Return kind -> name -> phase -> count, sum, min, max, mean and quantiles."""
+        summary = {}
+        with self._lock:
+            for (kind, name), histograms in self.histograms.items():
+                entry = {phase: histogram.summary()
+                         for phase, histogram in histograms.items() if histogram.count}
+                entry['request_bytes'], entry['response_bytes'] = self.bytes[(kind, name)]
+                summary.setdefault(kind, {})[name] = entry
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.bytes = {}
+            self._names = {}
+
+    @property
+    def _frames(self):
+        # getters being timed in this thread, innermost last
+        frames = getattr(self._local, 'frames', None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def wrap_getter(self, name, getter):
+        """Return ``getter`` timed as ``name``, the time not spent in eAPI being parsing."""
+        @functools.wraps(getter)
+        def timed(*args, **kwargs):
+            frames = self._frames
+            frame = {'transport': 0.0, 'decode': 0.0, 'children': 0.0}
+            frames.append(frame)
+            started = time.time()
+            try:
+                return getter(*args, **kwargs)
+            finally:
+                total = time.time() - started
+                frames.pop()
+                if frames:
+                    frames[-1]['children'] += total
+                self.record({
+                    'kind': 'getter',
+                    'name': name,
+                    'total': total,
+                    'transport': frame['transport'],
+                    'decode': frame['decode'],
+                    'parse': max(total - frame['transport'] - frame['decode'] -
+                                 frame['children'], 0.0),
+                })
+        return timed
+
+
+class _ResponseProbe(object):
+
+    def __init__(self, response, probe):
+        self._response = response
+        self._probe = probe
+
+    def read(self, *args, **kwargs):
+        content = self._response.read(*args, **kwargs)
+        self._probe.response_bytes += len(content)
+        self._probe.read_done = time.time()
+        return content
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class _TransportProbe(object):
+    """Stand in for the HTTP connection of pyeapi to see bytes and when the body was read."""
+
+    def __init__(self, transport):
+        self._transport = transport
+        self.reset()
+
+    def reset(self):
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.read_done = None
+
+    def endheaders(self, message_body=None, *args, **kwargs):
+        if message_body is not None:
+            self.request_bytes += len(message_body)
+        return self._transport.endheaders(message_body, *args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        return _ResponseProbe(self._transport.getresponse(*args, **kwargs), self)
+
+    def __getattr__(self, name):
+        return getattr(self._transport, name)
+
+
+class InstrumentedDevice(object):
+    """
+    Wrap a pyeapi Node to time each run_commands call.
+
+    With an HTTP(S) connection the wall time is split between the transport, up to the end
+    of the response body, and the JSON decoding done by pyeapi. Otherwise, e.g. with the
+    unix socket, the whole call counts as transport.
+    """
+
+    def __init__(self, device, instrumentation):
+        self._device = device
+        self._instrumentation = instrumentation
+        self._probe = None
+        connection = getattr(device, 'connection', None)
+        if hasattr(getattr(connection, 'transport', None), 'getresponse'):
+            self._probe = connection.transport = _TransportProbe(connection.transport)
+
+    def run_commands(self, commands, encoding='json', **kwargs):
+        if self._probe is not None:
+            self._probe.reset()
+        started = time.time()
+        try:
+            return self._device.run_commands(commands, encoding=encoding, **kwargs)
+        finally:
+            total = time.time() - started
+            event = {
+                'kind': 'command',
+                'name': command_name(commands),
+                'encoding': encoding,
+                'total': total,
+                'transport': total,
+                'decode': 0.0,
+            }
+            if self._probe is not None and self._probe.read_done is not None:
+                event['transport'] = self._probe.read_done - started
+                event['decode'] = total - event['transport']
+                event['request_bytes'] = self._probe.request_bytes
+                event['response_bytes'] = self._probe.response_bytes
+            if self._instrumentation.raw_commands:
+                event['commands'] = list(commands)
+            frames = self._instrumentation._frames
+            if frames:
+                frames[-1]['transport'] += event['transport']
+                frames[-1]['decode'] += event['decode']
+            self._instrumentation.record(event)
+
+    def __getattr__(self, name):
+        return getattr(self._device, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._device, name, value)
@@ -0,0 +1,24 @@
+"""Modules only imported when first used."""
+from __future__ import unicode_literals
+
+import importlib
+
+
+class LazyModule(object):
+    """
+    Stand in for the module ``name``, importing it on the first attribute access. The
+    attributes looked up are kept, so that the next accesses are plain attribute lookups.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if attribute.startswith('_'):
+            raise AttributeError(attribute)
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        value = getattr(self._module, attribute)
+        setattr(self, attribute, value)
+        return value
@@ -0,0 +1,75 @@
+"""
+Memoized normalization of the MAC and IP addresses in the outputs of the getters.
+
+``mac`` and ``ip`` return the same as ``napalm_base.helpers.mac`` and
+``napalm_base.helpers.ip``. The forms EOS prints, dotted MACs and plain IPv4 addresses, are
+converted without building netaddr objects, and the results of the last ``MAXSIZE``
+distinct values are kept, since the same MACs, next hops and peers show up over and over
+across the getters.
+"""
+from __future__ import unicode_literals
+
+import functools
+import re
+import threading
+
+from napalm_base.utils import py23_compat
+
+from napalm_eos.utils.lazy import LazyModule
+
+helpers = LazyModule('napalm_base.helpers')
+
+
+MAXSIZE = 65536
+
+_RE_MAC_CANONICAL = re.compile(r'[0-9A-F]{2}(?::[0-9A-F]{2}){5}\Z', re.IGNORECASE)
+_RE_MAC_DOTTED = re.compile(r'([0-9a-fA-F]{2})([0-9a-fA-F]{2})\.([0-9a-fA-F]{2})([0-9a-fA-F]{2})'
+                            r'\.([0-9a-fA-F]{2})([0-9a-fA-F]{2})\Z')
+_OCTET = r'(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])'
+_RE_IPV4_CANONICAL = re.compile(r'{0}(?:\.{0}){{3}}\Z'.format(_OCTET))
+
+
+def _memoize(maxsize):
+    """functools.lru_cache, or on python 2 a cache emptied whenever it is full."""
+    if hasattr(functools, 'lru_cache'):
+        return functools.lru_cache(maxsize=maxsize)
+
+    def decorator(function):
+        cache = {}
+        lock = threading.Lock()
+
+        @functools.wraps(function)
+        def memoized(value):
+            try:
+                return cache[value]
+            except KeyError:
+                pass
+            result = function(value)
+            with lock:
+                if len(cache) >= maxsize:
+                    cache.clear()
+                cache[value] = result
+            return result
+        memoized.cache_clear = cache.clear
+        return memoized
+    return decorator
+
+
+@_memoize(MAXSIZE)
+def mac(raw):
+    """Return ``raw`` as a MAC address in the EUI format, e.g. ``01:23:45:67:89:AB``."""
+    if isinstance(raw, py23_compat.string_types):
+        if _RE_MAC_CANONICAL.match(raw):
+            return py23_compat.text_type(raw.upper())
+        dotted = _RE_MAC_DOTTED.match(raw)
+        if dotted:
+            return py23_compat.text_type(':'.join(dotted.groups()).upper())
+    return helpers.mac(raw)
+
+
+@_memoize(MAXSIZE)
+def ip(addr):
+    """Return ``addr`` as an IP address without leading zeros, compressed and lowercase."""
+    if isinstance(addr, py23_compat.string_types) and _RE_IPV4_CANONICAL.match(addr):
+        return py23_compat.text_type(addr)
+    return helpers.ip(addr)
@@ -0,0 +1,128 @@
+"""Sampled cProfile and tracemalloc profiles of the getters of a driver."""
+from __future__ import unicode_literals
+
+import cProfile
+import contextlib
+import functools
+import itertools
+import os
+import pstats
+import threading
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2
+    tracemalloc = None
+
+
+class Profiler(object):
+    """
+    Profile one call in ``sample`` of the ``getters`` (all the getters and cli by default).
+
+    Every profiled call leaves two files in ``directory``: ``<getter>-<time>-<n>.prof``, the
+    raw cProfile stats to load with pstats or snakeviz, and ``<getter>-<time>-<n>.txt`` with
+    the ``top`` functions by cumulative time and, when tracemalloc is available, the peak of
+    memory traced during the call and the lines allocating the most of what was still held
+    at its end. Calls which are not sampled only pay for a counter, and only one call is
+    profiled at a time, the concurrent ones are skipped.
+    """
+
+    def __init__(self, directory, getters=None, sample=1, top=25):
+        self.directory = directory
+        self.getters = getters
+        self.sample = max(int(sample), 1)
+        self.top = top
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._sequence = itertools.count()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def selects(self, name):
+        if self.getters is None:
+            return name.startswith('get_') or name == 'cli'
+        return name in self.getters
+
+    def _sampled(self, name):
+        with self._lock:
+            count = self._calls.get(name, 0)
+            self._calls[name] = count + 1
+        return count % self.sample == 0
+
+    def wrap_getter(self, name, getter):
+        """Return ``getter`` profiled one call in ``sample``."""
+        @functools.wraps(getter)
+        def profiled(*args, **kwargs):
+            if not self._sampled(name) or not self._busy.acquire(False):
+                return getter(*args, **kwargs)
+            try:
+                return self._profile(name, getter, args, kwargs)
+            finally:
+                self._busy.release()
+        return profiled
+
+    def _profile(self, name, getter, args, kwargs):
+        trace = tracemalloc is not None and not tracemalloc.is_tracing()
+        if trace:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        started = time.time()
+        profile.enable()
+        try:
+            return getter(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.time() - started
+            peak, snapshot = None, None
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            self._dump(name, started, elapsed, profile, peak, snapshot)
+
+    def _dump(self, name, started, elapsed, profile, peak, snapshot):
+        path = os.path.join(self.directory, '{}-{}-{}'.format(
+            name, time.strftime('%Y%m%dT%H%M%S', time.gmtime(started)), next(self._sequence)))
+        profile.dump_stats(path + '.prof')
+
+        with open(path + '.txt', 'w') as report:
+            report.write('{} took {:.6f}s\n\n'.format(name, elapsed))
+            stats = pstats.Stats(profile, stream=report)
+            stats.sort_stats('cumulative').print_stats(self.top)
+            if snapshot is not None:
+                report.write('peak traced memory: {} bytes\n\n'.format(peak))
+                for statistic in snapshot.statistics('lineno')[:self.top]:
+                    report.write('{}\n'.format(statistic))
+
+
+def profile_getters(driver, profiler):
+    """Wrap the getters of ``driver`` selected by ``profiler``, on that instance only."""
+    wrapped = {}
+    for name in dir(driver):
+        if profiler.selects(name) and callable(getattr(driver, name)):
+            wrapped[name] = driver.__dict__.get(name)
+            setattr(driver, name, profiler.wrap_getter(name, getattr(driver, name)))
+    return wrapped
+
+
+@contextlib.contextmanager
+def profiling(driver, directory, getters=None, sample=1, top=25):
+    """
+    Profile the getters of ``driver`` within the block::
+
+        with profiling(device, '/tmp/profiles', getters=['get_bgp_neighbors']):
+            device.get_bgp_neighbors()
+    """
+    profiler = Profiler(directory, getters=getters, sample=sample, top=top)
+    wrapped = profile_getters(driver, profiler)
+    try:
+        yield profiler
+    finally:
+        for name, previous in wrapped.items():
+            if previous is None:
+                delattr(driver, name)
+            else:
+                setattr(driver, name, previous)
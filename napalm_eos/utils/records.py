@@ -0,0 +1,205 @@
+"""
+Compact rows for the table getters.
+
+Each row is a slotted object instead of a dict, a fraction of the size of a dict holding the
+same keys, with the interface, VRF and protocol names interned so every row refers to the
+same strings, and the MAC addresses kept as integers. Rows are read-only, hashable mappings:
+``row['mac']``, ``row.get('vlan')``, ``dict(row)`` and comparisons with dicts behave as with
+the dicts the getters return by default, and ``to_dict()`` returns such a dict. The rows are
+not dicts for the json module: dump them with ``json.dumps(rows, default=json_default)``.
+"""
+from __future__ import unicode_literals
+
+import re
+import sys
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    # python 2
+    from collections import Mapping
+
+try:
+    _STRING_TYPES = (basestring,)
+except NameError:
+    # python 3
+    _STRING_TYPES = (str,)
+
+INTERN_MAXSIZE = 65536
+
+# the MAC addresses as normalize.mac returns them, kept as integers
+_RE_MAC = re.compile(r'[0-9A-F]{2}(?::[0-9A-F]{2}){5}\Z')
+
+_interned = {}
+
+
+def _intern_table(value):
+    # python 2 has no sys.intern and its intern() does not take unicode: keep a table of the
+    # strings instead, emptied whenever it is full
+    if len(_interned) >= INTERN_MAXSIZE:
+        _interned.clear()
+    return _interned.setdefault(value, value)
+
+
+_intern = getattr(sys, 'intern', _intern_table)
+
+
+def intern_string(value):
+    """Return the interned ``value``, or ``value`` itself when it is not a string."""
+    if isinstance(value, _STRING_TYPES):
+        return _intern(value)
+    return value
+
+
+def _pack_mac(value):
+    if isinstance(value, _STRING_TYPES) and _RE_MAC.match(value):
+        return int(value.replace(':', ''), 16)
+    return value
+
+
+def _mac_field(slot):
+    # property returning the MAC address kept as an integer in ``slot`` as a string again
+    def get(self):
+        value = getattr(self, slot)
+        if isinstance(value, _STRING_TYPES) or value is None:
+            return value
+        digits = '{:012X}'.format(value)
+        return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+    return property(get)
+
+
+def _frozen(value):
+    if isinstance(value, Mapping):
+        return frozenset((key, _frozen(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+def json_default(value):
+    """``default`` of json.dump and json.dumps, turning the rows into dicts."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+
+class Record(object):
+    """
+    Read-only mapping over the ``_fields`` of a slotted row, given in that order or by name,
+    with the strings of its ``_interned`` fields interned and its ``_macs`` fields kept as
+    integers in the ``_<field>`` slots.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _interned = ()
+    _macs = ()
+
+    def __init__(self, *values, **fields):
+        if len(values) > len(self._fields):
+            raise TypeError('{} takes {} fields, {} given'.format(
+                type(self).__name__, len(self._fields), len(values)))
+        for field, value in zip(self._fields, values):
+            if field in fields:
+                raise TypeError('{} given twice'.format(field))
+            fields[field] = value
+        for field in self._fields:
+            try:
+                value = fields.pop(field)
+            except KeyError:
+                raise TypeError('{} is missing {}'.format(type(self).__name__, field))
+            if field in self._interned:
+                value = intern_string(value)
+            elif field in self._macs:
+                value = _pack_mac(value)
+                field = '_' + field
+            object.__setattr__(self, field, value)
+        if fields:
+            raise TypeError('{} has no field {}'.format(type(self).__name__, ', '.join(fields)))
+
+    def _read_only(self, *args):
+        raise TypeError('{} rows are read-only'.format(type(self).__name__))
+
+    __setattr__ = __delattr__ = _read_only
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._fields:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def keys(self):
+        return list(self._fields)
+
+    def values(self):
+        return [getattr(self, field) for field in self._fields]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self._fields]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(_frozen(self))
+
+    def __reduce__(self):
+        return type(self), tuple(self.values())
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(field, value) for field, value in self.items()))
+
+
+Mapping.register(Record)
+
+
+class ArpEntry(Record):
+    """A row of get_arp_table."""
+
+    __slots__ = ('interface', '_mac', 'ip', 'age')
+    _fields = ('interface', 'mac', 'ip', 'age')
+    _interned = ('interface',)
+    _macs = ('mac',)
+    mac = _mac_field('_mac')
+
+
+class MacEntry(Record):
+    """A row of get_mac_address_table."""
+
+    __slots__ = ('_mac', 'interface', 'vlan', 'active', 'static', 'moves', 'last_move')
+    _fields = ('mac', 'interface', 'vlan', 'active', 'static', 'moves', 'last_move')
+    _interned = ('interface',)
+    _macs = ('mac',)
+    mac = _mac_field('_mac')
+
+
+class RouteEntry(Record):
+    """A route of get_route_to."""
+
+    __slots__ = _fields = ('current_active', 'last_active', 'age', 'next_hop', 'protocol',
+                           'outgoing_interface', 'preference', 'inactive_reason',
+                           'routing_table', 'selected_next_hop', 'protocol_attributes')
+    _interned = ('protocol', 'outgoing_interface', 'routing_table')
@@ -0,0 +1,96 @@
+"""
+Locking of the configuration sessions of a device between concurrent writers.
+
+A writer holds the lock while its configuration session is the only pending one. The
+commands are pushed optimistically, in a request which also lists the pending sessions
+after them, so an uncontended load takes a single round trip. When other sessions are
+pending, the writer whose session was created last gives way: it aborts its session and
+polls the pending sessions until the device is free before pushing again. Session names sort
+by creation time, so concurrent writers agree on who gives way and one always goes through.
+"""
+from __future__ import unicode_literals
+
+import random
+import time
+import uuid
+
+from napalm_base.exceptions import SessionLockedException
+
+SESSION_PREFIX = 'napalm_'
+
+
+def session_name():
+    """Return a new, unique, configuration session name, ordered by creation time."""
+    return '{}{:013d}_{}'.format(SESSION_PREFIX, int(time.time() * 1000), uuid.uuid4().hex[:12])
+
+
+def pending_sessions(sessions, own=None):
+    """Names of the pending sessions of 'show configuration sessions', but ``own``."""
+    return sorted(name for name, session in sessions.items()
+                  if session.get('state') == 'pending' and name != own)
+
+
+def _gives_way(own, others):
+    # sessions of other tools, or of a writer which came first, keep the lock
+    return any(not other.startswith(SESSION_PREFIX) or other < own for other in others)
+
+
+class SessionLock(object):
+    """
+    Wait-for-lock on the configuration sessions of ``device``.
+
+    A contended lock is retried with exponential backoff and full jitter, starting at
+    ``backoff`` seconds, for up to ``timeout`` seconds before SessionLockedException is raised.
+    """
+
+    max_backoff = 30
+
+    def __init__(self, device, timeout=0, backoff=0.5, names=session_name):
+        self.device = device
+        self.timeout = timeout
+        self.backoff = backoff
+        self.names = names
+        self.session = None
+
+    def pending(self, own=None):
+        """Names of the sessions pending on the device, but ``own``."""
+        output = self.device.run_commands(['show configuration sessions'])
+        return pending_sessions(output[0]['sessions'], own)
+
+    def wait(self, attempt, deadline):
+        """Sleep before the next attempt. Return False once the deadline has passed."""
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        # full jitter keeps concurrent writers from retrying in lockstep
+        delay = random.uniform(0, min(self.backoff * 2 ** attempt, self.max_backoff))
+        time.sleep(min(delay, remaining))
+        return True
+
+    def acquire(self, commands):
+        """
+        Open a session, run ``commands`` in it and return the outputs of 'configure session'
+        and of the commands, giving way and retrying while other sessions are pending.
+
+        The session is left in ``session``, also when the commands fail, for the caller to
+        commit or abort it.
+        """
+        deadline = time.time() + self.timeout
+        attempt = 0
+        while True:
+            self.session = self.names()
+            configure = 'configure session {}'.format(self.session)
+            output = self.device.run_commands(
+                [configure] + commands + ['show configuration sessions'])
+            if not _gives_way(self.session, pending_sessions(output[-1]['sessions'],
+                                                             self.session)):
+                return output[:-1]
+            self.device.run_commands([configure, 'abort'])
+            self.session = None
+            # only poll while backing off, until the other sessions are gone
+            while True:
+                if not self.wait(attempt, deadline):
+                    raise SessionLockedException('Session is already in use')
+                attempt += 1
+                if not self.pending():
+                    break
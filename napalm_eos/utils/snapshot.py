@@ -0,0 +1,123 @@
+"""Report only what changed in the result of a getter since its previous call."""
+from __future__ import unicode_literals
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    # python 2
+    from collections import Mapping
+
+
+def _freeze(value, ignore=frozenset()):
+    # Mapping also covers the compact rows of the compact_tables option
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items() if k not in ignore))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class Snapshot(object):
+    """
+    Hashed index of the entries returned by the previous call of a getter.
+
+    Entries are compared on their hash first, and on their frozen values when the hashes
+    match, so a hash collision can not hide a change.
+
+    ``key`` returns the identity of an entry, e.g. the IP address of an ARP entry. Top-level
+    fields listed in ``ignore`` are left out of the comparison, which is useful for values
+    that change on every call such as ages and uptimes.
+    """
+
+    def __init__(self, key, ignore=()):
+        self.key = key
+        self.ignore = frozenset(ignore)
+        self._index = {}
+
+    def diff(self, entries):
+        """
+        Store ``entries`` as the new snapshot and return what changed since the previous one.
+
+        The result has the ``added``, ``removed`` and ``changed`` lists of entries. On the
+        first call every entry is reported as added.
+        """
+        index = {}
+        for entry in entries:
+            frozen = _freeze(entry, self.ignore)
+            index[self.key(entry)] = (hash(frozen), frozen, entry)
+
+        previous = self._index
+        added = []
+        changed = []
+        for key, (digest, frozen, entry) in index.items():
+            if key not in previous:
+                added.append(entry)
+            elif previous[key][0] != digest or previous[key][1] != frozen:
+                changed.append(entry)
+        removed = [entry for key, (_, _, entry) in previous.items() if key not in index]
+
+        self._index = index
+        return {
+            'added': added,
+            'removed': removed,
+            'changed': changed,
+        }
+
+    def clear(self):
+        """Forget the snapshot, the next diff reports every entry as added."""
+        self._index = {}
+
+
+class ChangeTracker(object):
+    """
+    Change-only variants of the table getters of a driver.
+
+    Each method calls the getter of the same name and returns the ``added``, ``removed`` and
+    ``changed`` entries since its previous call on this tracker.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._snapshots = {}
+
+    def _diff(self, name, entries, key, ignore=()):
+        if name not in self._snapshots:
+            self._snapshots[name] = Snapshot(key, ignore=ignore)
+        return self._snapshots[name].diff(entries)
+
+    def get_arp_table(self):
+        """ARP entries are identified by their IP address, their age is not compared."""
+        return self._diff('arp_table', self.driver.get_arp_table(),
+                          key=lambda entry: entry['ip'],
+                          ignore=('age',))
+
+    def get_mac_address_table(self):
+        """MAC table entries are identified by their MAC address and VLAN."""
+        return self._diff('mac_address_table', self.driver.get_mac_address_table(),
+                          key=lambda entry: (entry['mac'], entry['vlan']))
+
+    def get_lldp_neighbors_detail(self, interface=''):
+        """Neighbors are returned as a flat list, ``parent_interface`` being the local port."""
+        neighbors = [neighbor
+                     for interface_neighbors in
+                     self.driver.get_lldp_neighbors_detail(interface).values()
+                     for neighbor in interface_neighbors]
+        return self._diff('lldp_neighbors_detail_{}'.format(interface), neighbors,
+                          key=lambda entry: (entry['parent_interface'],
+                                             entry['remote_chassis_id'],
+                                             entry['remote_port']))
+
+    def get_bgp_neighbors(self):
+        """
+        Neighbors are returned as a flat list of the peer dictionaries with the extra ``vrf``
+        and ``address`` keys. Their uptime is not compared.
+        """
+        peers = []
+        for vrf, vrf_data in self.driver.get_bgp_neighbors().items():
+            for address, peer_data in vrf_data['peers'].items():
+                peer = dict(peer_data)
+                peer.update(vrf=vrf, address=address)
+                peers.append(peer)
+        return self._diff('bgp_neighbors', peers,
+                          key=lambda entry: (entry['vrf'], entry['address']),
+                          ignore=('uptime',))
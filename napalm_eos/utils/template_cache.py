@@ -0,0 +1,84 @@
+"""Per-process cache of the compiled Jinja templates shipped with the driver."""
+from __future__ import unicode_literals
+
+import os
+import threading
+import multiprocessing
+
+import jinja2
+
+import napalm_base.exceptions
+from napalm_base.utils.jinja_filters import CustomJinjaFilters
+
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'templates')
+
+_environments = {}
+_lock = threading.Lock()
+
+
+def get_environment(search_path=None):
+    """Return the Jinja environment for ``search_path``, building it only once per process."""
+    search_path = tuple(search_path or (TEMPLATES_PATH,))
+    environment = _environments.get(search_path)
+    if environment is None:
+        with _lock:
+            environment = _environments.get(search_path)
+            if environment is None:
+                for path in search_path:
+                    if not os.path.isdir(path):
+                        raise napalm_base.exceptions.DriverTemplateNotImplemented(
+                            'Config template dir does not exist: {}'.format(path))
+                # templates ship with the package, there is no need to stat them on every lookup
+                environment = jinja2.Environment(loader=jinja2.FileSystemLoader(search_path),
+                                                 auto_reload=False,
+                                                 cache_size=-1)
+                environment.filters.update(CustomJinjaFilters.filters())
+                _environments[search_path] = environment
+    return environment
+
+
+def render(template_name, search_path=None, **template_vars):
+    """Render ``<template_name>.j2`` with the cached environment."""
+    search_path = tuple(search_path or (TEMPLATES_PATH,))
+    try:
+        template = get_environment(search_path).get_template('{}.j2'.format(template_name))
+        return template.render(**template_vars)
+    except jinja2.exceptions.TemplateNotFound:
+        raise napalm_base.exceptions.TemplateNotImplemented(
+            'Config template {}.j2 is not defined under {}'.format(
+                template_name, ', '.join(search_path)))
+    except (jinja2.exceptions.UndefinedError, jinja2.exceptions.TemplateSyntaxError) as e:
+        raise napalm_base.exceptions.TemplateRenderException(
+            'Unable to render the template {}.j2: {}'.format(template_name, e))
+
+
+def _render_star(args):
+    template_name, search_path, template_vars = args
+    return render(template_name, search_path, **template_vars)
+
+
+def render_many(template_name, template_vars_list, processes=None, search_path=None,
+                chunksize=64):
+    """
+    Render the same template for many devices.
+
+    ``template_vars_list`` is a sequence of dictionaries, one per device, and the rendered
+    configurations are returned in the same order. With ``processes`` greater than 1 the
+    work is spread over a process pool, each worker compiling the template only once.
+    """
+    search_path = tuple(search_path or (TEMPLATES_PATH,))
+    if not processes or processes < 2:
+        return [render(template_name, search_path, **template_vars)
+                for template_vars in template_vars_list]
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_render_star,
+                        [(template_name, search_path, template_vars)
+                         for template_vars in template_vars_list],
+                        chunksize)
+    finally:
+        pool.close()
+        pool.join()
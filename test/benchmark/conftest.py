@@ -0,0 +1,157 @@
+"""Fixtures of the benchmarks."""
+import gc
+import json
+import os
+import time
+
+import pytest
+
+from napalm_eos import eos
+from napalm_eos.utils import normalize
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2
+    tracemalloc = None
+
+
+ROUNDS = 3
+
+
+def _load_unit_conftest():
+    # the unit tests are not a package, load FakeEOSDevice from their conftest by path
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'unit', 'conftest.py')
+    try:
+        from importlib.machinery import SourceFileLoader
+        return SourceFileLoader('unit_conftest', path).load_module()
+    except ImportError:
+        import imp
+        return imp.load_source('unit_conftest', path)
+
+
+FakeEOSDevice = _load_unit_conftest().FakeEOSDevice
+
+
+class ScaledEOSDevice(FakeEOSDevice):
+    """FakeEOSDevice reading the outputs from a directory of scaled fixtures."""
+
+    def __init__(self, directory):
+        super(ScaledEOSDevice, self).__init__()
+        self.directory = directory
+
+    def find_file(self, filename):
+        full_path = os.path.join(self.directory, filename)
+        if os.path.exists(full_path):
+            return full_path
+        raise IOError("Couldn't find file with mocked data: {}".format(full_path))
+
+
+def scaled_eos_driver(directory, optional_args=None):
+    """
+    A plain EOSDriver running its commands against a ScaledEOSDevice, the templates of the
+    getters being looked up next to the module of the driver class.
+    """
+    driver = eos.EOSDriver('localhost', 'admin', 'admin', optional_args=optional_args)
+    driver.device = ScaledEOSDevice(directory)
+    return driver
+
+
+def write_outputs(directory, outputs):
+    """Write command -> output as the files FakeEOSDevice looks for."""
+    for command, output in outputs.items():
+        name = FakeEOSDevice.sanitize_text(command)
+        if isinstance(output, dict):
+            with open(os.path.join(directory, name + '.json'), 'w') as f:
+                json.dump(output, f)
+        else:
+            with open(os.path.join(directory, name + '.text'), 'w') as f:
+                f.write(output)
+
+
+@pytest.fixture(scope='session')
+def scaled_driver(tmpdir_factory):
+    """Return a function building a driver over the outputs of a scaling function."""
+    cache = {}
+
+    def build(scale, count, optional_args=None):
+        key = (scale.__name__, count)
+        if key not in cache:
+            directory = str(tmpdir_factory.mktemp('{}_{}'.format(*key)))
+            write_outputs(directory, scale(count))
+            cache[key] = directory
+        return scaled_eos_driver(cache[key], optional_args=optional_args)
+    return build
+
+
+def _best_time(method, *args):
+    best = None
+    for _ in range(ROUNDS):
+        started = time.time()
+        method(*args)
+        elapsed = time.time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _peak_memory(method, *args):
+    tracemalloc.start()
+    try:
+        method(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _clear_caches():
+    # what the caches of the normalized addresses keep is not held by the result
+    normalize.mac.cache_clear()
+    normalize.ip.cache_clear()
+    gc.collect()
+
+
+def _held_memory(method):
+    _clear_caches()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = method()
+        _clear_caches()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture(scope='session')
+def rounds():
+    """Number of rounds of the timed calls."""
+    return ROUNDS
+
+
+@pytest.fixture(scope='session')
+def best_time():
+    """Return a function returning the best time of ROUNDS calls of ``method(*args)``."""
+    return _best_time
+
+
+@pytest.fixture(scope='session')
+def held_memory():
+    """
+    Return a function calling ``method`` and returning its result along with the memory the
+    result holds, skipping the test without tracemalloc.
+    """
+    if tracemalloc is None:
+        pytest.skip('tracemalloc is not available')
+    return _held_memory
+
+
+@pytest.fixture(scope='session')
+def peak_memory():
+    """
+    Return a function returning the peak memory of a call of ``method(*args)``, or None
+    without tracemalloc.
+    """
+    if tracemalloc is None:
+        return None
+    return _peak_memory
@@ -0,0 +1,259 @@
+"""
+Outputs of benchmark sizes, from the DeviceGenerator or, for the commands it does not cover,
+from the hand-captured mocked_data samples scaled up.
+"""
+from __future__ import unicode_literals
+
+import copy
+import json
+import os
+
+from napalm_eos.test.generator import DeviceGenerator
+
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'unit', 'mocked_data')
+
+PEERS_PER_VRF = 100
+
+SELECTED_PEERS = 20
+
+VLANS = 10
+
+ROUTE_DESTINATION = '11.0.0.1'
+
+NEIGHBOR_FILTER = 'bgp neighbors vrf all | include remote AS | remote router ID |IPv[46] Unicast:.*[0-9]+|^Local AS|Desc|BGP state'  # noqa
+
+
+def _sample(test, filename):
+    with open(os.path.join(SAMPLES, test, 'normal', filename)) as f:
+        return json.load(f) if filename.endswith('.json') else f.read()
+
+
+def _generate(commands, **sizes):
+    device = DeviceGenerator(now=1500000000.0, **sizes)
+    return {command: device.output(command, encoding) for command, encoding in commands}
+
+
+def ipv4(index):
+    return '10.{}.{}.{}'.format(index >> 16 & 255, index >> 8 & 255, index & 255)
+
+
+def interface(index):
+    return 'Ethernet{}/{}'.format(index // 48 + 1, index % 48 + 1)
+
+
+def vrf(index):
+    return 'VRF{}'.format(index)
+
+
+def mac_address_table(count):
+    return _generate([('show mac address-table', 'json')],
+                     vlans=100, mac_addresses=count, arp_entries=0, bgp_peers=0)
+
+
+def arp_table(count):
+    return _generate([('show arp', 'json')],
+                     vlans=100, mac_addresses=count, arp_entries=count, bgp_peers=0)
+
+
+def interfaces(count):
+    # Management1, Loopback0 and a VLAN interface per VLAN come on top of the ports
+    return _generate([('show interfaces', 'json')],
+                     interfaces=count - 2 - VLANS, vlans=VLANS, mac_addresses=0, arp_entries=0)
+
+
+def facts(count):
+    return _generate([('show version', 'json'), ('show hostname', 'json'),
+                      ('show interfaces description', 'json')],
+                     interfaces=count - 2 - VLANS, vlans=VLANS, mac_addresses=0, arp_entries=0)
+
+
+def bgp_neighbors(count):
+    return _generate([('show ip bgp summary vrf all', 'json'),
+                      ('show ipv6 bgp summary vrf all', 'json'),
+                      ('show ip ' + NEIGHBOR_FILTER, 'text'),
+                      ('show ipv6 ' + NEIGHBOR_FILTER, 'text')],
+                     vrfs=count // PEERS_PER_VRF, bgp_peers=count, routes=count * 10,
+                     mac_addresses=0, arp_entries=0)
+
+
+def _bgp_device(count):
+    return DeviceGenerator(now=1500000000.0, vrfs=count // PEERS_PER_VRF, bgp_peers=count,
+                           routes=count * 10, mac_addresses=0, arp_entries=0)
+
+
+def selected_peers(count):
+    """Addresses of SELECTED_PEERS peers spread over the bgp_neighbors_detail peers."""
+    peers = _bgp_device(count).peers
+    return [peer['address'] for peer in peers[::max(len(peers) // SELECTED_PEERS, 1)]][
+        :SELECTED_PEERS]
+
+
+def bgp_neighbors_detail(count):
+    """The outputs of all the peers, and of the selected_peers alone."""
+    device = _bgp_device(count)
+    commands = [('show ip bgp summary vrf all', 'json'),
+                ('show ipv6 bgp summary vrf all', 'json'),
+                ('show ip bgp neighbors vrf all', 'text'),
+                ('show ipv6 bgp neighbors vrf all', 'text')]
+    peers = dict((peer['address'], peer) for peer in device.peers)
+    for address in selected_peers(count):
+        commands += [('show ip bgp neighbors {} vrf all'.format(address), 'text'),
+                     ('show ip bgp summary vrf {}'.format(peers[address]['vrf']), 'json')]
+    return {command: device.output(command, encoding) for command, encoding in commands}
+
+
+def bgp_config(count):
+    return _generate([('show running-config | section router bgp', 'text')],
+                     bgp_peers=count, mac_addresses=0, arp_entries=0)
+
+
+def config(count):
+    """Configurations of exactly ``count`` lines, padded with an access-list."""
+    sizes = dict(interfaces=count // 200, vlans=max(count // 2000, 10), bgp_peers=count // 200,
+                 mac_addresses=0, arp_entries=0)
+    lines = DeviceGenerator(**sizes).show_running_config().count('\n')
+    return _generate([('show running-config', 'text'), ('show startup-config', 'text')],
+                     acl_entries=max(count - lines - 2, 0), **sizes)
+
+
+def interfaces_ip(count):
+    ipv4_output = _sample('test_get_interfaces_ip', 'show_ip_interface.json')
+    ipv6_output = _sample('test_get_interfaces_ip', 'show_ipv6_interface.json')
+    ipv4_entry = ipv4_output['interfaces']['Ethernet36']
+    ipv6_entry = ipv6_output['interfaces']['Ethernet36']
+    ipv4_output['interfaces'] = {}
+    ipv6_output['interfaces'] = {}
+    for i in range(count):
+        name = interface(i)
+        entry = copy.deepcopy(ipv4_entry)
+        entry['name'] = name
+        entry['interfaceAddress']['primaryIp'] = {'address': ipv4(i * 4 + 1), 'maskLen': 30}
+        ipv4_output['interfaces'][name] = entry
+        entry = copy.deepcopy(ipv6_entry)
+        entry['name'] = name
+        entry['addresses'] = [{
+            'subnet': '2001:db8:{:x}::/64'.format(i),
+            'dadfailed': False,
+            'active': True,
+            'address': '2001:db8:{:x}::1'.format(i),
+        }]
+        ipv6_output['interfaces'][name] = entry
+    return {'show ip interface': ipv4_output, 'show ipv6 interface': ipv6_output}
+
+
+def lldp_neighbors(count):
+    output = _sample('test_get_lldp_neighbors', 'show_lldp_neighbors.json')
+    entry = output['lldpNeighbors'][0]
+    output['lldpNeighbors'] = [
+        dict(entry, port=interface(i), neighborDevice='switch{}'.format(i // 48))
+        for i in range(count)
+    ]
+    return {'show lldp neighbors': output}
+
+
+def lldp_neighbors_detail(count):
+    output = _sample('test_get_lldp_neighbors_detail', 'show_lldp_neighbors__detail.json')
+    entry = output['lldpNeighbors']['Ethernet1']
+    output['lldpNeighbors'] = {}
+    for i in range(count):
+        neighbor = copy.deepcopy(entry)
+        neighbor['lldpNeighborInfo'][0]['systemName'] = 'switch{}'.format(i // 48)
+        output['lldpNeighbors'][interface(i)] = neighbor
+    return {'show lldp neighbors  detail': output}
+
+
+def optics(count):
+    output = _sample('test_get_optics', 'show_interfaces_transceiver.json')
+    entry = output['interfaces']['Ethernet3/1/1']
+    output['interfaces'] = {interface(i): dict(entry) for i in range(count)}
+    return {'show interfaces transceiver': output}
+
+
+def vrfs(count):
+    lines = ['Maximum number of vrfs allowed: {}'.format(count + 1),
+             ' Vrf     RD           Protocols    State                    Interfaces',
+             '------- ------------ ------------ ------------------------- -------------------']
+    for i in range(count):
+        lines.extend([
+            ' {}    {}:{}      ipv4,ipv6    v4:routing,              {}'.format(
+                vrf(i), 65000, i, interface(i)),
+            '                                   v6:no routing',
+            '',
+        ])
+    brief = ['Interface              IP Address         Status     Protocol          MTU',
+             '---------------------- ------------------ ---------- -------------- ------']
+    for i in range(count * 2):
+        brief.append('{:<22} {:<18} {:<10} {:<14} {:>6}'.format(
+            interface(i), '{}/31'.format(ipv4(i * 2)), 'up', 'up', 1500))
+    return {'show vrf': '\n'.join(lines) + '\n',
+            'show ip interface brief': '\n'.join(brief) + '\n'}
+
+
+def rib(count):
+    # count BGP routes on top of the connected ones, in the default VRF
+    return _generate([('show vrf', 'text'), ('show ip route vrf all detail', 'json'),
+                      ('show ipv6 route vrf default detail', 'json')],
+                     routes=count, vlans=VLANS, bgp_peers=10, mac_addresses=0, arp_entries=0)
+
+
+def route_to(count):
+    """get_route_to ROUTE_DESTINATION over ``count`` VRFs, a BGP route of the default one."""
+    device = DeviceGenerator(now=1500000000.0, vrfs=count, bgp_peers=10, routes=100,
+                             mac_addresses=0, arp_entries=0)
+    outputs = {'show vrf': device.show_vrf()}
+    for command in device.route_commands(ROUTE_DESTINATION):
+        outputs[command] = device.output(command, 'json')
+    return outputs
+
+
+def environment(count):
+    """``count`` temperature sensors, on the cards, the power supplies and the chassis."""
+    outputs = dict((command, _sample('test_get_environment', command.replace(' ', '_') + ext))
+                   for command, ext in (('show version', '.json'),
+                                        ('show environment cooling', '.json'),
+                                        ('show environment power', '.json'),
+                                        ('show environment temperature', '.json'),
+                                        ('show processes top once', '.text')))
+    temperature = outputs['show environment temperature']
+    sensor = temperature['cardSlots'][0]['tempSensors'][0]
+    slots = temperature['cardSlots'] + temperature['powerSupplySlots']
+    for slot in slots:
+        slot['tempSensors'] = []
+    temperature['tempSensors'] = []
+    for i in range(count):
+        sensors = temperature['tempSensors'] if i % 2 else slots[i // 2 % len(slots)][
+            'tempSensors']
+        sensors.append(dict(sensor, name='TempSensor{}'.format(i)))
+    return outputs
+
+
+def ntp_servers(count):
+    return {'show running-config | section ntp': ''.join(
+        'ntp server {}\n'.format(ipv4(i)) for i in range(count))}
+
+
+def ntp_stats(count):
+    lines = _sample('test_get_ntp_stats', 'show_ntp_associations.text').splitlines()
+    header, association = lines[:2], lines[2]
+    return {'show ntp associations': '\n'.join(header + [
+        '{:<16} {}'.format(ipv4(i), association[17:]) for i in range(count)]) + '\n'}
+
+
+def snmp_information(count):
+    outputs = dict((command, _sample('test_get_snmp_information',
+                                     command.replace(' ', '_') + '.json'))
+                   for command in ('show snmp chassis', 'show snmp location',
+                                   'show snmp contact'))
+    outputs['show running-config | section snmp-server community'] = ''.join(
+        'snmp-server community community{} ro acl{}\n'.format(i, i % 10) for i in range(count))
+    return outputs
+
+
+def users(count):
+    output = _sample('test_get_users', 'show_user_account.json')
+    entry = output['users']['dummy-test']
+    output['users'] = dict(('user{}'.format(i), dict(entry, username='user{}'.format(i)))
+                           for i in range(count))
+    return {'show user-account': output}
@@ -0,0 +1,46 @@
+"""
+Benchmark get_bgp_neighbors_detail for a few neighbors of a route server.
+
+Asking for the ``SELECTED_PEERS`` (20) neighbors out of 5k peers must return the same
+details as the full getter, and be at least ``NAPALM_EOS_NEIGHBORS_SPEEDUP`` (10 by default)
+times faster than fetching all of them.
+"""
+from __future__ import division
+
+import os
+
+import scaling
+
+
+SCALE = float(os.environ.get('NAPALM_EOS_BENCHMARK_SCALE', 1))
+MIN_SPEEDUP = float(os.environ.get('NAPALM_EOS_NEIGHBORS_SPEEDUP', 10))
+PEERS = 5000
+ROUNDS = 3
+
+
+def _flatten(result):
+    return sorted((vrf, remote_as, peer['remote_address'], sorted(peer.items()))
+                  for vrf, peers in result.items()
+                  for remote_as, entries in peers.items()
+                  for peer in entries)
+
+
+def test_selected_neighbors(benchmark, scaled_driver, best_time):
+    """Time the details of the selected peers and compare them with the full getter."""
+    size = max(int(PEERS * SCALE), 1000)
+    driver = scaled_driver(scaling.bgp_neighbors_detail, size)
+    neighbors = scaling.selected_peers(size)
+
+    result = benchmark.pedantic(driver.get_bgp_neighbors_detail, args=(neighbors,),
+                                rounds=ROUNDS, iterations=1)
+    everything = driver.get_bgp_neighbors_detail()
+    assert _flatten(result) == [peer for peer in _flatten(everything) if peer[2] in neighbors]
+    assert len(_flatten(result)) == len(neighbors)
+
+    selected_time = best_time(driver.get_bgp_neighbors_detail, neighbors)
+    full_time = best_time(driver.get_bgp_neighbors_detail)
+    benchmark.extra_info['peers'] = size
+    benchmark.extra_info['speedup'] = full_time / selected_time
+    assert full_time / selected_time >= MIN_SPEEDUP, \
+        '{} neighbors out of {} took {:.3f}s, {:.3f}s for all of them'.format(
+            len(neighbors), size, selected_time, full_time)
@@ -0,0 +1,52 @@
+"""
+Benchmark the memory held by the table getters with and without columnar_tables.
+
+As for compact_tables, the results are kept while tracemalloc measures them. The typed
+arrays of a 500k rows table must take at most ``NAPALM_EOS_COLUMNAR_RATIO`` (0.6 by
+default) of the memory of the dicts, and hold the same values.
+"""
+from __future__ import division
+
+import os
+
+import pytest
+
+import scaling
+
+
+SCALE = float(os.environ.get('NAPALM_EOS_BENCHMARK_SCALE', 1))
+MAX_RATIO = float(os.environ.get('NAPALM_EOS_COLUMNAR_RATIO', 0.6))
+ROUNDS = 3
+
+# getter, scaling function, rows
+CASES = [
+    ('get_mac_address_table', scaling.mac_address_table, 500000),
+    ('get_arp_table', scaling.arp_table, 500000),
+]
+
+
+def _rows(columns, fields):
+    return [dict(zip(fields, values)) for values in zip(*[columns[field] for field in fields])]
+
+
+@pytest.mark.parametrize('getter, scale, size', CASES, ids=[case[0] for case in CASES])
+def test_columnar_table(benchmark, scaled_driver, held_memory, getter, scale, size):
+    """Time the columnar getter and compare the memory it holds with the dicts."""
+    size = max(int(size * SCALE), 100)
+    columnar = getattr(scaled_driver(scale, size, {'columnar_tables': 'array'}), getter)
+    default = getattr(scaled_driver(scale, size), getter)
+
+    result = benchmark.pedantic(columnar, rounds=ROUNDS, iterations=1)
+    assert all(len(column) == size for column in result.values())
+    del result
+
+    columns, columnar_memory = held_memory(columnar)
+    dicts, default_memory = held_memory(default)
+    assert _rows(columns, list(dicts[0])) == dicts
+    benchmark.extra_info['size'] = size
+    benchmark.extra_info['columnar_memory'] = columnar_memory
+    benchmark.extra_info['default_memory'] = default_memory
+    benchmark.extra_info['memory_ratio'] = columnar_memory / default_memory
+    assert columnar_memory / default_memory <= MAX_RATIO, \
+        '{} held {} bytes for {} rows of columns but {} bytes for the dicts'.format(
+            getter, columnar_memory, size, default_memory)
@@ -0,0 +1,94 @@
+"""
+Benchmark the getters against scaled fixtures.
+
+Every getter runs at its full size and at a tenth of it. Beyond the timings recorded by
+pytest-benchmark, which can be compared across runs with ``--benchmark-compare`` and
+``--benchmark-compare-fail``, a test fails when its time or peak memory grows more than
+``NAPALM_EOS_BENCHMARK_RATIO`` times (30 by default) for the ten times larger input, which
+catches parsers going quadratic on any machine.
+
+``NAPALM_EOS_BENCHMARK_SCALE`` multiplies every size, e.g. 0.1 for a quick run.
+"""
+from __future__ import division
+
+import os
+
+import pytest
+
+import scaling
+
+
+SCALE = float(os.environ.get('NAPALM_EOS_BENCHMARK_SCALE', 1))
+MAX_RATIO = float(os.environ.get('NAPALM_EOS_BENCHMARK_RATIO', 30))
+
+
+def _peers(result):
+    return sum(len(vrf['peers']) for vrf in result.values())
+
+
+def _peers_detail(result):
+    return sum(len(peers) for vrf in result.values() for peers in vrf.values())
+
+
+# getter, arguments, scaling function, size, size of the result if it grows with the size
+CASES = [
+    ('get_mac_address_table', (), scaling.mac_address_table, 500000, len),
+    ('get_arp_table', (), scaling.arp_table, 100000, len),
+    ('get_facts', (), scaling.facts, 4000, lambda result: len(result['interface_list'])),
+    ('get_interfaces', (), scaling.interfaces, 4000, len),
+    ('get_interfaces_counters', (), scaling.interfaces, 4000, len),
+    ('get_interfaces_ip', (), scaling.interfaces_ip, 4000, len),
+    ('get_lldp_neighbors', (), scaling.lldp_neighbors, 4000, len),
+    ('get_lldp_neighbors_detail', (), scaling.lldp_neighbors_detail, 4000, len),
+    ('get_optics', (), scaling.optics, 4000, len),
+    ('get_bgp_neighbors', (), scaling.bgp_neighbors, 10000, _peers),
+    ('get_bgp_neighbors_detail', (), scaling.bgp_neighbors_detail, 10000, _peers_detail),
+    ('get_bgp_config', (), scaling.bgp_config, 10000,
+     lambda result: len(result['_']['neighbors'])),
+    ('get_network_instances', (), scaling.vrfs, 1000, lambda result: len(result) - 1),
+    ('get_config', (), scaling.config, 200000,
+     lambda result: result['running'].count('\n')),
+    # one route, looked up in every VRF
+    ('get_route_to', (scaling.ROUTE_DESTINATION,), scaling.route_to, 1000, None),
+    ('get_environment', (), scaling.environment, 1000, lambda result: len(result['temperature'])),
+    ('get_ntp_servers', (), scaling.ntp_servers, 1000, len),
+    ('get_ntp_stats', (), scaling.ntp_stats, 1000, len),
+    ('get_snmp_information', (), scaling.snmp_information, 1000,
+     lambda result: len(result['community'])),
+    ('get_users', (), scaling.users, 1000, len),
+]
+
+
+@pytest.mark.parametrize('getter, args, scale, size, result_size', CASES,
+                         ids=[case[0] for case in CASES])
+def test_getter(benchmark, scaled_driver, rounds, best_time, peak_memory, getter, args, scale,
+                size, result_size):
+    """Time the getter at full size and check it scales linearly."""
+    size = max(int(size * SCALE), 100)
+    small = getattr(scaled_driver(scale, size // 10), getter)
+    large = getattr(scaled_driver(scale, size), getter)
+
+    result = benchmark.pedantic(large, args=args, rounds=rounds, iterations=1)
+    if result_size is not None:
+        assert result_size(result) == size
+
+    if benchmark.disabled:
+        large_time = best_time(large, *args)
+    else:
+        large_time = benchmark.stats.stats.min
+    small_time = best_time(small, *args)
+    benchmark.extra_info['size'] = size
+    benchmark.extra_info['time_ratio'] = large_time / small_time
+    assert large_time / small_time <= MAX_RATIO, \
+        '{} took {:.3f}s for {} entries but {:.3f}s for {}'.format(
+            getter, large_time, size, small_time, size // 10)
+
+    if peak_memory is None:
+        return
+    large_peak = peak_memory(large, *args)
+    small_peak = peak_memory(small, *args)
+    benchmark.extra_info['peak_memory'] = large_peak
+    benchmark.extra_info['memory_ratio'] = large_peak / small_peak
+    assert large_peak / small_peak <= MAX_RATIO, \
+        '{} peaked at {} bytes for {} entries but {} bytes for {}'.format(
+            getter, large_peak, size, small_peak, size // 10)
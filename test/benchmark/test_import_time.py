@@ -0,0 +1,56 @@
+"""
+Benchmark importing the driver, in a fresh interpreter every time.
+
+Each import must stay under its budget in seconds, on top of starting the interpreter,
+which ``NAPALM_EOS_IMPORT_BUDGET`` multiplies for slower machines. Importing the package
+alone must not load napalm_base, pyeapi or pkg_resources, and the driver must not load
+pyeapi before it is opened.
+"""
+from __future__ import division
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+BUDGET_FACTOR = float(os.environ.get('NAPALM_EOS_IMPORT_BUDGET', 1))
+ROUNDS = 5
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEAVY_MODULES = ('napalm_base', 'pyeapi', 'pkg_resources')
+
+# statement, budget in seconds, heavy modules it may load
+CASES = [
+    ('import napalm_eos', 0.05, ()),
+    ('from napalm_eos import EOSDriver', 1.0, ('napalm_base', 'pkg_resources')),
+]
+
+
+def _run(statement):
+    script = 'import json, sys\n{}\nprint(json.dumps(sorted(sys.modules)))'.format(statement)
+    started = time.time()
+    # from the root of the repository, to import the package from the source tree
+    output = subprocess.check_output([sys.executable, '-c', script], cwd=ROOT)
+    return time.time() - started, json.loads(output.decode('utf-8'))
+
+
+def _best_time(statement):
+    return min(_run(statement)[0] for _ in range(ROUNDS))
+
+
+@pytest.mark.parametrize('statement, budget, allowed', CASES, ids=[case[0] for case in CASES])
+def test_import_time(benchmark, statement, budget, allowed):
+    """Time the import and check which modules it loaded."""
+    modules = set(benchmark.pedantic(lambda: _run(statement)[1], rounds=ROUNDS, iterations=1))
+    loaded = set(module.split('.')[0] for module in modules) & set(HEAVY_MODULES)
+    assert loaded <= set(allowed), '{} loaded {}'.format(statement, sorted(loaded))
+
+    elapsed = _best_time(statement) - _best_time('')
+    benchmark.extra_info['import_time'] = elapsed
+    assert elapsed <= budget * BUDGET_FACTOR, \
+        '{} took {:.3f}s, over its budget of {:.3f}s'.format(
+            statement, elapsed, budget * BUDGET_FACTOR)
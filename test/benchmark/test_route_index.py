@@ -0,0 +1,68 @@
+"""
+Benchmark the lookups of a RouteIndex built from a scaled RIB.
+
+A longest prefix match must take less than ``NAPALM_EOS_LOOKUP_BUDGET`` microseconds on
+average (100 by default), and a route_to() less than ``NAPALM_EOS_ROUTE_TO_BUDGET`` (200 by
+default), whatever the size of the RIB.
+"""
+from __future__ import division
+
+import os
+import time
+
+import pytest
+
+import scaling
+
+from napalm_eos.route_index import RouteIndex
+
+
+SCALE = float(os.environ.get('NAPALM_EOS_BENCHMARK_SCALE', 1))
+SIZE = max(int(1000000 * SCALE), 100)
+ROUNDS = 3
+LOOKUPS = 10000
+
+# method, budget in seconds per lookup
+CASES = [
+    ('longest_match', float(os.environ.get('NAPALM_EOS_LOOKUP_BUDGET', 100)) * 1e-6),
+    ('route_to', float(os.environ.get('NAPALM_EOS_ROUTE_TO_BUDGET', 200)) * 1e-6),
+]
+
+
+def _destinations(count):
+    # addresses within the generated BGP /24s, from 11.0.0.0
+    return ['11.{}.{}.{}'.format(i // 256 % 256, i % 256, i % 254 + 1)
+            for i in range(0, count, max(count // LOOKUPS, 1))][:LOOKUPS]
+
+
+@pytest.fixture(scope='module')
+def index(scaled_driver):
+    """A RouteIndex over the 1M routes RIB, with the time its first refresh took."""
+    index = RouteIndex(scaled_driver(scaling.rib, SIZE), ipv6=True)
+    started = time.time()
+    index.refresh()
+    return index, time.time() - started
+
+
+@pytest.mark.parametrize('method, budget', CASES, ids=[case[0] for case in CASES])
+def test_route_index(benchmark, best_time, index, method, budget):
+    """Time the lookups of the index."""
+    index, refresh_time = index
+    benchmark.extra_info['refresh_time'] = refresh_time
+    assert len(index) >= SIZE
+
+    destinations = _destinations(SIZE)
+    lookup = getattr(index, method)
+
+    def lookups():
+        return [lookup(destination) for destination in destinations]
+
+    matches = benchmark.pedantic(lookups, rounds=ROUNDS, iterations=1)
+    assert all(matches)
+
+    elapsed = best_time(lookups) / len(destinations)
+    benchmark.extra_info['lookup_time'] = elapsed
+    assert elapsed <= budget, 'a {} took {:.1f}us over {} routes'.format(
+        method, elapsed * 1e6, SIZE)
+
+    assert index.refresh() == {'added': 0, 'changed': 0, 'removed': 0}
@@ -0,0 +1,63 @@
+"""
+Benchmark the queries of a Topology over a leaf and spine fabric.
+
+A shortest path between two leaves must take less than ``NAPALM_EOS_PATH_BUDGET``
+milliseconds on average (1 by default).
+"""
+from __future__ import division
+
+import os
+import random
+import time
+
+import pytest
+
+from napalm_eos.topology import Topology
+
+
+SCALE = float(os.environ.get('NAPALM_EOS_BENCHMARK_SCALE', 1))
+BUDGET = float(os.environ.get('NAPALM_EOS_PATH_BUDGET', 1)) * 1e-3
+SPINES = 16
+QUERIES = 1000
+
+
+def _fabric(leaves):
+    # LLDP neighbors of every switch, each leaf having an uplink to every spine
+    neighbors = {}
+    for leaf in range(leaves):
+        for spine in range(SPINES):
+            neighbors.setdefault('leaf{}'.format(leaf), {})['Et{}/1'.format(49 + spine)] = [
+                {'hostname': 'spine{}.example.net'.format(spine), 'port': 'Et{}'.format(leaf + 1)}]
+            neighbors.setdefault('spine{}'.format(spine), {})['Ethernet{}'.format(leaf + 1)] = [
+                {'hostname': 'leaf{}.example.net'.format(leaf),
+                 'port': 'Ethernet{}/1'.format(49 + spine)}]
+    return neighbors
+
+
+@pytest.mark.parametrize('switches', [5000], ids=['5k switches'])
+def test_topology(benchmark, switches):
+    """Build the graph, then time shortest paths between random leaves."""
+    leaves = max(int(switches * SCALE), 100) - SPINES
+    topology = Topology()
+    for node, neighbors in sorted(_fabric(leaves).items()):
+        topology.update(node, neighbors)
+    assert len(topology) == leaves + SPINES
+    assert topology.degree('spine0') == leaves
+    assert len(topology.links()) == leaves * SPINES
+
+    randomizer = random.Random(0)
+    pairs = [('leaf{}'.format(randomizer.randrange(leaves)),
+              'leaf{}'.format(randomizer.randrange(leaves))) for _ in range(QUERIES)]
+
+    def paths():
+        return [topology.shortest_path(source, target) for source, target in pairs]
+
+    result = benchmark.pedantic(paths, rounds=3, iterations=1)
+    assert all(len(path) == (1 if path[0] == path[-1] else 3) for path in result)
+
+    started = time.time()
+    paths()
+    elapsed = (time.time() - started) / QUERIES
+    benchmark.extra_info['path_time'] = elapsed
+    assert elapsed <= BUDGET, 'a path took {:.2f}ms over {} switches'.format(
+        elapsed * 1e3, leaves + SPINES)
@@ -6,6 +6,8 @@ from napalm_base.test import conftest as parent_conftest
 
 from napalm_base.test.double import BaseTestDouble
 
+from pyeapi.eapilib import CommandError
+
 from napalm_eos import eos
 
 
@@ -45,6 +47,8 @@ class FakeEOSDevice(BaseTestDouble):
         result = list()
 
         for command in command_list:
+            self.raise_command_error(command, command_list, result)
+
             filename = '{}.{}'.format(self.sanitize_text(command), encoding)
             full_path = self.find_file(filename)
 
@@ -54,3 +58,17 @@ class FakeEOSDevice(BaseTestDouble):
                 result.append({'output': self.read_txt_file(full_path)})
 
         return result
+
+    def raise_command_error(self, command, command_list, result):
+        """Raise the CommandError of pyeapi if there is a <command>.error.json with its errors."""
+        try:
+            full_path = self.find_file('{}.error.json'.format(self.sanitize_text(command)))
+        except IOError:
+            return
+        errors = self.read_json_file(full_path)
+        # as eAPI does, counting the enable command pyeapi sends first
+        message = "CLI command {} of {} '{}' failed: invalid command".format(
+            len(result) + 2, len(command_list) + 1, command)
+        raise CommandError(
+            1002, message, command_error=', '.join(errors), commands=command_list,
+            output=[{}] + result + [{'errors': errors}])
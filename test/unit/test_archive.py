@@ -0,0 +1,133 @@
+"""Tests for the recording and replay of eAPI calls."""
+import gzip
+import zlib
+
+import pytest
+from pyeapi.eapilib import CommandError
+
+from napalm_base.exceptions import ConnectionException
+
+from napalm_eos.utils.archive import Archive, RecordingDevice, ReplayDevice
+from napalm_eos.utils.session_lock import SessionLock
+
+
+class CountingDevice(object):
+    """A device answering the number of times it was called."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def run_commands(self, commands, encoding='json'):
+        self.calls += 1
+        if commands == ['typo']:
+            raise CommandError(1002, 'invalid command', command_error='invalid command',
+                               commands=commands, output=[{}, {'errors': ['invalid command']}])
+        return [{'calls': self.calls, 'hostname': 'localhost'} for command in commands]
+
+
+class SessionsDevice(object):
+    """A device only keeping track of its configuration sessions."""
+
+    def __init__(self):
+        self.sessions = {}
+
+    def run_commands(self, commands, encoding='json'):
+        output = []
+        for command in commands:
+            if command.startswith('configure session '):
+                session = command.split()[-1]
+                self.sessions[session] = 'pending'
+            elif command == 'commit':
+                self.sessions[session] = 'completed'
+            elif command == 'show configuration sessions':
+                output.append({'sessions': dict(
+                    (name, {'state': state}) for name, state in self.sessions.items())})
+                continue
+            output.append({})
+        return output
+
+
+def members(path):
+    """Number of gzip members in the file at ``path``."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    count = 0
+    while data:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decompressor.decompress(data)
+        data = decompressor.unused_data
+        count += 1
+    return count
+
+
+def record(path, *requests):
+    device = RecordingDevice(CountingDevice(), str(path))
+    for commands in requests:
+        device.run_commands(commands)
+    device.close_archive()
+
+
+def test_record_replay(tmpdir):
+    path = tmpdir.join('archive.gz')
+    device = RecordingDevice(CountingDevice(), str(path))
+    first = device.run_commands(['show version'])
+    second = device.run_commands(['show version'])
+    with pytest.raises(CommandError):
+        device.run_commands(['typo'])
+    device.close_archive()
+
+    replay = ReplayDevice(str(path))
+    assert replay.run_commands(['show version']) == first
+    assert replay.run_commands(['show version']) == second
+    # the last response is repeated once they run out
+    assert replay.run_commands(['show version']) == second
+    with pytest.raises(CommandError) as e:
+        replay.run_commands(['typo'])
+    assert e.value.command_error == 'invalid command'
+    with pytest.raises(ConnectionException):
+        replay.run_commands(['show clock'])
+
+
+def test_single_stream(tmpdir):
+    path = tmpdir.join('archive.gz')
+    record(path, ['show version'], ['show version'], ['show hostname'])
+    assert members(str(path)) == 1
+    # recording again to the same archive keeps it a single stream
+    record(path, ['show version'])
+    assert members(str(path)) == 1
+    assert len(Archive(str(path)).calls[('json', '["show version"]')]) == 3
+
+
+def test_same_outputs_stored_once(tmpdir):
+    path = tmpdir.join('archive.gz')
+    device = RecordingDevice(CountingDevice(), str(path))
+    device.run_commands(['show version', 'show version'])
+    device.close_archive()
+    with gzip.open(str(path), 'rb') as f:
+        assert len(f.readlines()) == 2
+
+
+def test_interrupted_recording(tmpdir):
+    path = tmpdir.join('archive.gz')
+    device = RecordingDevice(CountingDevice(), str(path))
+    outputs = device.run_commands(['show version'])
+    # not closed: the stream has no end yet, but the calls flushed so far are readable
+    assert ReplayDevice(str(path)).run_commands(['show version']) == outputs
+
+
+def test_replay_sessions(tmpdir):
+    path = str(tmpdir.join('archive.gz'))
+    device = RecordingDevice(SessionsDevice(), path)
+    lock = SessionLock(device)
+    lock.acquire(['hostname a'])
+    device.run_commands(['configure session {}'.format(lock.session), 'commit'])
+    device.run_commands(['show configuration sessions'])
+    device.close_archive()
+
+    # the session of the replay has another name, still not giving way to the recorded one
+    replay = ReplayDevice(path)
+    lock = SessionLock(replay)
+    assert lock.acquire(['hostname a']) == [{}, {}]
+    replay.run_commands(['configure session {}'.format(lock.session), 'commit'])
+    assert replay.run_commands(['show configuration sessions']) == [
+        {'sessions': {lock.session: {'state': 'completed'}}}]
@@ -0,0 +1,15 @@
+"""Tests for get_bgp_neighbors_detail with a list of neighbors."""
+import pytest
+
+from napalm_base.test.getters import wrap_test_cases
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestBgpNeighborsDetail(object):
+    """Test get_bgp_neighbors_detail on given neighbors."""
+
+    @wrap_test_cases
+    def test_get_bgp_neighbors_detail_list(self, test_case):
+        # the details of both neighbors in one request, the summaries of their VRF only
+        return self.device.get_bgp_neighbors_detail(
+            ['192.168.56.2', '2001:7f8::f10:0:2', '192.168.56.2'])
@@ -0,0 +1,116 @@
+"""Tests for the rollback checkpoints."""
+import pytest
+
+from napalm_base.exceptions import CommandErrorException, ReplaceConfigException
+
+from napalm_eos import eos
+
+STARTUP_HASH = '0123456789abcdef0123456789abcdef'
+
+DIR_OUTPUT = """Directory of flash:/
+
+       -rwx         300           Jan 1 00:00  rollback-300-{0}
+       -rwx         100           Jan 1 00:00  rollback-100-{1}
+       -rwx         200           Jan 1 00:00  rollback-200-{1}
+       -rwx        1024           Jan 1 00:00  startup-config
+""".format('f' * 32, 'e' * 32)
+
+
+class CheckpointsDevice(object):
+    """A device answering the checkpoint commands, and recording the others."""
+
+    def __init__(self, dir_output=DIR_OUTPUT, startup_hash=STARTUP_HASH):
+        self.dir_output = dir_output
+        self.verify_output = 'verify /md5 (flash:startup-config) = {}\n'.format(startup_hash)
+        self.requests = []
+
+    def run_commands(self, commands, encoding='json'):
+        if commands == ['dir flash:']:
+            return [{'output': self.dir_output}]
+        if commands == ['dir flash:', 'verify /md5 flash:startup-config']:
+            return [{'output': self.dir_output}, {'output': self.verify_output}]
+        self.requests.append(commands)
+        return [{} for command in commands]
+
+
+def driver(device, session=None, **optional_args):
+    """
+    A driver over ``device``, within the configuration ``session`` when given. Closing the
+    driver, as napalm_base does when it is collected, aborts that session.
+    """
+    driver = eos.EOSDriver('localhost', 'admin', 'admin', optional_args=optional_args)
+    driver.device = device
+    if session:
+        driver.config_session = session
+        driver.locked = True
+    return driver
+
+
+def test_commit_prunes_after_commit():
+    device = CheckpointsDevice()
+    eos_driver = driver(device, 'napalm_1', rollback_checkpoints=2)
+    eos_driver.commit_config()
+    commit, prune = device.requests
+    assert commit[0].startswith('copy startup-config flash:rollback-')
+    assert commit[0].endswith(STARTUP_HASH)
+    assert commit[1:] == ['configure session napalm_1', 'commit', 'write memory']
+    assert prune == ['delete flash:rollback-200-{}'.format('e' * 32),
+                     'delete flash:rollback-100-{}'.format('e' * 32)]
+
+
+def test_commit_reuses_checkpoint():
+    device = CheckpointsDevice(startup_hash='f' * 32)
+    eos_driver = driver(device, 'napalm_1', rollback_checkpoints=3)
+    eos_driver.commit_config()
+    assert device.requests == [['configure session napalm_1', 'commit', 'write memory']]
+
+
+def test_commit_no_digest():
+    device = CheckpointsDevice()
+    device.verify_output = '% Error verifying flash:startup-config\n'
+    eos_driver = driver(device, 'napalm_1')
+    with pytest.raises(CommandErrorException):
+        eos_driver.commit_config()
+    assert device.requests == []
+    assert eos_driver.config_session == 'napalm_1'
+
+
+def test_commit_failed_keeps_checkpoints():
+    class FailingDevice(CheckpointsDevice):
+        def run_commands(self, commands, encoding='json'):
+            output = super(FailingDevice, self).run_commands(commands, encoding)
+            if 'commit' in commands:
+                raise ValueError('commit failed')
+            return output
+
+    device = FailingDevice()
+    eos_driver = driver(device, 'napalm_1')
+    with pytest.raises(ValueError):
+        eos_driver.commit_config()
+    assert not [command for request in device.requests for command in request
+                if command.startswith('delete')]
+
+
+@pytest.mark.parametrize('checkpoint, name', [
+    (0, 'rollback-300-{}'.format('f' * 32)),
+    (1, 'rollback-200-{}'.format('e' * 32)),
+    (2, 'rollback-100-{}'.format('e' * 32)),
+])
+def test_rollback_to(checkpoint, name):
+    device = CheckpointsDevice()
+    eos.rollback_to(driver(device), checkpoint)
+    assert device.requests == [['configure replace flash:{}'.format(name), 'write memory']]
+
+
+def test_rollback_to_missing():
+    device = CheckpointsDevice()
+    with pytest.raises(ReplaceConfigException):
+        eos.rollback_to(driver(device), 3)
+    assert device.requests == []
+
+
+def test_rollback():
+    device = CheckpointsDevice()
+    driver(device).rollback()
+    assert device.requests == [
+        ['configure replace flash:rollback-300-{}'.format('f' * 32), 'write memory']]
@@ -0,0 +1,87 @@
+"""Tests for the cli_batch option of cli."""
+import ast
+
+import pytest
+from pyeapi.eapilib import CommandError
+
+from napalm_base.exceptions import CommandErrorException
+from napalm_base.test.getters import wrap_test_cases
+
+COMMANDS = ['show version', 'show typo', 'show hostname', 'show clock']
+TYPO_ERROR = "Invalid command: \"show typo\" (Invalid input (at token 1: 'typo'))"
+
+
+@pytest.fixture
+def requests(request, monkeypatch):
+    """The batches of commands sent to the device."""
+    device = request.instance.device.device
+    run_commands = device.run_commands
+    sent = []
+
+    def spy(commands, encoding='json'):
+        sent.append(list(commands))
+        return run_commands(commands, encoding)
+    monkeypatch.setattr(device, 'run_commands', spy)
+    return sent
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestCliBatch(object):
+    """Test cli sending its commands in batches."""
+
+    def batched(self, monkeypatch, cli_batch, test='test_cli_batch_error'):
+        monkeypatch.setattr(self.device, 'cli_batch', cli_batch)
+        self.device.device.current_test = test
+        self.device.device.current_test_case = 'normal'
+
+    def failed_cli(self, commands):
+        with pytest.raises(CommandErrorException) as e:
+            self.device.cli(commands)
+        return ast.literal_eval(str(e.value))
+
+    @wrap_test_cases
+    def test_cli_batch(self, test_case):
+        self.device.cli_batch = 2
+        try:
+            return self.device.cli(['show version', 'show hostname', 'show clock'])
+        finally:
+            self.device.cli_batch = 0
+
+    def test_cli_batch_all(self, monkeypatch, requests):
+        self.batched(monkeypatch, True, 'test_cli_batch')
+        commands = ['show version', 'show hostname', 'show clock']
+        assert list(self.device.cli(commands)) == commands
+        assert requests == [commands]
+
+    def test_cli_batch_error(self, monkeypatch, requests):
+        self.batched(monkeypatch, True)
+        output = self.failed_cli(COMMANDS)
+        assert output['show typo'] == TYPO_ERROR
+        assert output['show version'].startswith('Arista DCS-7150S')
+        assert output['show hostname'].startswith('Hostname: localhost')
+        assert output['show clock'].startswith('Mon Oct 19')
+        # the outputs before the failing command come from the error, the commands after it
+        # are sent in the next request
+        assert requests == [COMMANDS, ['show hostname', 'show clock']]
+
+    def test_cli_batch_error_in_second_batch(self, monkeypatch, requests):
+        self.batched(monkeypatch, 2)
+        commands = ['show version', 'show hostname', 'show clock', 'show typo']
+        output = self.failed_cli(commands)
+        assert output['show typo'] == TYPO_ERROR
+        assert sorted(output) == sorted(commands)
+        assert requests == [['show version', 'show hostname'], ['show clock', 'show typo']]
+
+    def test_cli_batch_error_not_attributed(self, monkeypatch, requests):
+        self.batched(monkeypatch, True)
+
+        def raise_command_error(command, command_list, result):
+            if command == 'show typo':
+                raise CommandError(1002, 'invalid command', command_error='invalid command',
+                                   commands=command_list, output=None)
+        monkeypatch.setattr(self.device.device, 'raise_command_error', raise_command_error)
+        output = self.failed_cli(COMMANDS)
+        assert output['show typo'] == 'Invalid command: "show typo"'
+        assert sorted(output) == sorted(COMMANDS)
+        # sent again one at a time
+        assert requests == [COMMANDS] + [[command] for command in COMMANDS]
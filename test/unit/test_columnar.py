@@ -0,0 +1,103 @@
+"""Tests for the columnar tables of the table getters."""
+import json
+import os
+import re
+from array import array
+
+import pytest
+
+from napalm_eos import eos
+from napalm_eos.utils import columnar
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mocked_data')
+
+
+def mocked(test, filename):
+    with open(os.path.join(MOCKED_DATA, test, 'normal', filename)) as f:
+        return json.load(f)
+
+
+class MockedDevice(object):
+    """A device answering the commands with the mocked outputs of ``test``."""
+
+    def __init__(self, test):
+        self.test = test
+
+    def run_commands(self, commands, encoding='json'):
+        return [mocked(self.test, re.sub('[^a-zA-Z0-9]', '_', command) + '.json')
+                for command in commands]
+
+
+def rows(table, fields):
+    """The rows of a table as dicts, whatever the form of its columns."""
+    if hasattr(table, 'dtype'):
+        return [dict(zip(fields, row)) for row in table.tolist()]
+    columns = [table[field] for field in fields]
+    return [dict(zip(fields, row)) for row in zip(*columns)]
+
+
+@pytest.fixture(params=['array', 'numpy'])
+def structured(request):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    return request.param == 'numpy'
+
+
+def test_use_numpy(monkeypatch):
+    assert not columnar.use_numpy('array')
+    assert not columnar.use_numpy(False)
+    monkeypatch.setattr(columnar, 'numpy', None)
+    assert not columnar.use_numpy(True)
+    with pytest.raises(ImportError):
+        columnar.use_numpy('numpy')
+
+
+def test_arp_table(structured):
+    neighbors = mocked('test_get_arp_table', 'show_arp.json')['ipV4Neighbors']
+    table = columnar.arp_table(neighbors, structured=structured)
+    assert rows(table, columnar.ARP_FIELDS) == mocked('test_get_arp_table',
+                                                      'expected_result.json')
+    if structured:
+        assert table.dtype.names == columnar.ARP_FIELDS
+        assert table.dtype['age'].kind == 'f'
+    else:
+        assert isinstance(table['age'], array)
+        assert table['interface'][0] is columnar.intern_string(
+            ''.join(list(table['interface'][0])))
+
+
+def test_mac_address_table(structured):
+    entries = mocked('test_get_mac_address_table', 'show_mac_address_table.json')
+    table = columnar.mac_address_table(entries['unicastTable']['tableEntries'],
+                                       structured=structured)
+    assert rows(table, columnar.MAC_FIELDS) == mocked('test_get_mac_address_table',
+                                                      'expected_result.json')
+    if structured:
+        assert table.dtype.names == columnar.MAC_FIELDS
+        assert table.dtype['static'].kind == 'b'
+        assert table.dtype['vlan'].kind == 'i'
+        assert table['active'].all()
+    else:
+        assert [table[field].typecode for field in ('vlan', 'active', 'static', 'moves',
+                                                    'last_move')] == ['l', 'b', 'b', 'l', 'd']
+
+
+def test_empty_tables(structured):
+    for table, fields in ((columnar.arp_table([], structured=structured), columnar.ARP_FIELDS),
+                          (columnar.mac_address_table([], structured=structured),
+                           columnar.MAC_FIELDS)):
+        assert len(table['mac']) == 0
+        assert rows(table, fields) == []
+
+
+@pytest.mark.parametrize('test, getter, fields', [
+    ('test_get_arp_table', 'get_arp_table', columnar.ARP_FIELDS),
+    ('test_get_mac_address_table', 'get_mac_address_table', columnar.MAC_FIELDS),
+])
+def test_driver(structured, test, getter, fields):
+    driver = eos.EOSDriver('localhost', 'admin', 'admin', optional_args={
+        'columnar_tables': 'numpy' if structured else 'array'})
+    driver.device = MockedDevice(test)
+    table = getattr(driver, getter)()
+    assert hasattr(table, 'dtype') == structured
+    assert rows(table, fields) == mocked(test, 'expected_result.json')
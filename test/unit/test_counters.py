@@ -0,0 +1,63 @@
+"""Tests for the interface counter rates."""
+import pytest
+
+from napalm_eos.utils import columnar
+from napalm_eos.utils import counters
+from napalm_eos.utils.counters import COUNTER_FIELDS, CounterRates
+
+
+@pytest.fixture(params=['array', 'numpy'])
+def rates(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(counters, 'numpy', None)
+    return CounterRates()
+
+
+def test_first_sample(rates):
+    result = rates.update({'Ethernet1': {'tx_octets': 100}}, timestamp=0)
+    assert result['interface'] == ['Ethernet1']
+    assert set(result) == set(('interface',) + COUNTER_FIELDS)
+    assert list(result['tx_octets']) == [-1.0]
+
+
+def test_rates(rates):
+    rates.update({
+        'Ethernet1': {'tx_octets': 100, 'rx_octets': 2 ** 32 - 10, 'tx_errors': 3},
+        'Ethernet2': {'tx_octets': 2 ** 64 - 10},
+    }, timestamp=0)
+    result = rates.update({
+        'Ethernet3': {'tx_octets': 7},
+        'Ethernet2': {'tx_octets': 10},
+        'Ethernet1': {'tx_octets': 200, 'rx_octets': 20, 'tx_errors': 1},
+    }, timestamp=10)
+    assert result['interface'] == ['Ethernet1', 'Ethernet2', 'Ethernet3']
+    # plain, 32-bit wrap, clear, 64-bit wrap and new interface
+    assert list(result['tx_octets']) == [10.0, 2.0, -1.0]
+    assert list(result['rx_octets']) == [3.0, -1.0, -1.0]
+    assert list(result['tx_errors']) == [0.1, -1.0, -1.0]
+
+    # an interface missing from a sample
+    result = rates.update({'Ethernet1': {'tx_octets': 300}}, timestamp=20)
+    assert list(result['tx_octets']) == [10.0, -1.0, -1.0]
+
+
+def test_columnar(rates):
+    interfaces = {
+        'Ethernet1': {'hardware': 'ethernet', 'interfaceCounters': {'outOctets': 100}},
+        'Ethernet2': {'hardware': 'ethernet', 'interfaceCounters': {'outOctets': 10}},
+    }
+    rates.update(columnar.interfaces_counters(interfaces), timestamp=0)
+    interfaces['Ethernet1']['interfaceCounters']['outOctets'] = 600
+    result = rates.update(columnar.interfaces_counters(interfaces), timestamp=5)
+    assert result['tx_octets'][result['interface'].index('Ethernet1')] == 100.0
+    assert result['tx_octets'][result['interface'].index('Ethernet2')] == 0.0
+
+
+def test_reset(rates):
+    rates.update({'Ethernet1': {'tx_octets': 100}}, timestamp=0)
+    rates.reset()
+    result = rates.update({'Ethernet2': {'tx_octets': 200}}, timestamp=10)
+    assert result['interface'] == ['Ethernet2']
+    assert list(result['tx_octets']) == [-1.0]
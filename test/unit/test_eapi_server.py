@@ -0,0 +1,118 @@
+"""Tests for the local eAPI server, driven by an EOSDriver."""
+import base64
+import gzip
+import io
+import json
+import time
+
+import pytest
+
+try:
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+except ImportError:
+    # python 2
+    from urllib2 import HTTPError, Request, urlopen
+
+from pyeapi.eapilib import CommandError, ConnectionError
+
+from napalm_base.exceptions import ConnectionException
+
+from napalm_eos import eos
+from napalm_eos.test.generator import DeviceGenerator
+from napalm_eos.test.server import EapiServer
+
+
+@pytest.fixture
+def server():
+    source = DeviceGenerator(interfaces=8, vlans=2, mac_addresses=8, arp_entries=4, bgp_peers=1,
+                             routes=8)
+    eapi = EapiServer(source, username='admin', password='secret', seed=0).start()
+    yield eapi
+    eapi.stop()
+
+
+def driver(server, password='secret'):
+    return eos.EOSDriver('127.0.0.1', 'admin', password,
+                         optional_args={'transport': 'http', 'port': server.port})
+
+
+def post(server, commands, headers=None):
+    request = Request('http://127.0.0.1:{}/command-api'.format(server.port), json.dumps({
+        'jsonrpc': '2.0', 'method': 'runCmds', 'id': 1,
+        'params': {'version': 1, 'cmds': commands, 'format': 'json'},
+    }).encode('utf-8'), dict({
+        'Content-Type': 'application/json',
+        'Authorization': 'Basic {}'.format(base64.b64encode(b'admin:secret').decode('ascii')),
+    }, **(headers or {})))
+    return urlopen(request)
+
+
+def test_driver(server):
+    eos_driver = driver(server)
+    eos_driver.open()
+    assert eos_driver.get_facts()['hostname'] == 'eos-synthetic'
+    assert len(eos_driver.get_interfaces()) > 8
+    assert server.stats['requests'] == 3
+    assert server.stats['errors'] == 0
+    assert server.stats['bytes_sent'] > 0
+
+
+def test_auth(server):
+    with pytest.raises(ConnectionException):
+        driver(server, password='wrong').open()
+    assert server.stats['requests'] == 0
+
+
+def test_gzip(server):
+    response = post(server, ['show hostname'], {'Accept-Encoding': 'gzip'})
+    assert response.info()['Content-Encoding'] == 'gzip'
+    content = gzip.GzipFile(fileobj=io.BytesIO(response.read())).read()
+    assert json.loads(content.decode('utf-8'))['result'][0]['hostname'] == 'eos-synthetic'
+
+    response = post(server, ['show hostname'])
+    assert response.info()['Content-Encoding'] is None
+    assert json.loads(response.read().decode('utf-8'))['result'][0]['hostname'] == \
+        'eos-synthetic'
+
+
+def test_bandwidth(server):
+    eos_driver = driver(server)
+    eos_driver.open()
+    server.bandwidth = 10000
+    server.reset_stats()
+    started = time.time()
+    eos_driver.get_interfaces()
+    elapsed = time.time() - started
+    assert server.stats['bytes_sent'] > 2000
+    # the last of the ten chunks of a second is written without waiting
+    assert elapsed >= server.stats['bytes_sent'] / 10000.0 - 0.1
+
+
+@pytest.mark.parametrize('kind, error', [
+    ('command', CommandError),
+    ('http', ConnectionError),
+    ('disconnect', ConnectionError),
+])
+def test_injected_errors(server, kind, error):
+    eos_driver = driver(server)
+    eos_driver.open()
+    server.error_rate, server.error_kinds = 1.0, (kind,)
+    server.reset_stats()
+    with pytest.raises(error):
+        eos_driver.get_facts()
+    assert server.stats['errors'] == 1
+    if kind == 'command':
+        assert 'Injected error' in '{}'.format(server.run_cmds(
+            {'params': {'cmds': ['show hostname']}}, inject_error=True)['error']['data'])
+
+    # and the next requests go through again
+    server.error_rate = 0.0
+    assert eos_driver.get_facts()['hostname'] == 'eos-synthetic'
+
+
+def test_not_found(server):
+    request = Request('http://127.0.0.1:{}/other'.format(server.port), b'{}')
+    with pytest.raises(HTTPError) as e:
+        urlopen(request)
+    assert e.value.code == 404
@@ -0,0 +1,162 @@
+"""Tests for the OpenMetrics exporter."""
+import json
+import os
+
+import pytest
+
+try:
+    from urllib.error import HTTPError
+    from urllib.request import urlopen
+except ImportError:
+    # python 2
+    from urllib2 import HTTPError, urlopen
+
+from napalm_eos import exporter
+from napalm_eos.exporter import MetricsExporter
+from napalm_eos.scheduler import PollJob
+from napalm_eos.utils import columnar
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mocked_data')
+
+
+def mocked(getter, filename='expected_result.json'):
+    with open(os.path.join(MOCKED_DATA, 'test_' + getter, 'normal', filename)) as f:
+        return json.load(f)
+
+
+class Driver(object):
+
+    def __init__(self, hostname):
+        self.hostname = hostname
+
+
+class CannedScheduler(object):
+    """A scheduler whose jobs come with their result, polled once at 1500000000.0."""
+
+    def __init__(self, results):
+        self.results = results
+
+    def add(self, driver, getter, interval):
+        job = PollJob(driver, getter, interval)
+        job.last_result = self.results.get((driver.hostname, getter))
+        if job.last_result is not None:
+            job.last_run = 1500000000.0
+            job.runs = 1
+        return job
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def metrics_exporter(results, *hostnames):
+    metrics = MetricsExporter([Driver(hostname) for hostname in hostnames or ('switch1',)],
+                              scheduler=CannedScheduler(results))
+    metrics.start(port=0, address='127.0.0.1')
+    return metrics
+
+
+def samples(text):
+    return [line for line in text.splitlines() if not line.startswith('#')]
+
+
+@pytest.fixture
+def canned():
+    results = dict((('switch1', getter), mocked(getter)) for getter in exporter.DEFAULT_INTERVALS)
+    metrics = metrics_exporter(results)
+    yield metrics
+    metrics.stop()
+
+
+def test_format_value():
+    assert exporter._format_value(True) == '1'
+    assert exporter._format_value(False) == '0'
+    assert exporter._format_value(3) == '3'
+    assert exporter._format_value(-40.5) == '-40.5'
+    assert exporter._format_value(float('nan')) == 'NaN'
+    assert exporter._format_value(float('inf')) == '+Inf'
+    assert exporter._format_value(float('-inf')) == '-Inf'
+
+
+def test_generate(canned):
+    text = ''.join(canned.generate())
+    assert text.endswith('\n# EOF\n')
+    assert text.count('# EOF') == 1
+    lines = samples(text)
+    assert 'eos_interface_tx_octets_total{device="switch1",interface="Ethernet1"} 0' in lines
+    assert 'eos_fan_ok{device="switch1",fan="1"} 1' in lines
+    assert 'eos_bgp_peer_up{device="switch1",vrf="global",peer="192.168.56.2"} 1' in lines
+    assert 'eos_poll_errors_total{device="switch1",getter="get_optics"} 0' in lines
+    assert 'eos_poll_last_timestamp_seconds{device="switch1",getter="get_optics"} ' \
+        '1500000000.0' in lines
+    assert any(line.startswith('eos_optics_input_power_dbm{device="switch1",'
+                               'interface="Ethernet3/1/1",channel="0"} -1.80') for line in lines)
+    # every sample belongs to a declared family, counters ending in _total
+    families = dict(line.split()[2:4] for line in text.splitlines()
+                    if line.startswith('# TYPE'))
+    for line in lines:
+        name = line.split('{')[0]
+        if name.endswith('_total'):
+            assert families[name[:-len('_total')]] == 'counter'
+        else:
+            assert families[name] == 'gauge'
+
+
+def test_label_escaping():
+    results = {('a"b\\c\nd', 'get_environment'): mocked('get_environment')}
+    metrics = metrics_exporter(results, 'a"b\\c\nd')
+    try:
+        lines = samples(''.join(metrics.generate()))
+    finally:
+        metrics.stop()
+    assert 'eos_memory_used_bytes{device="a\\"b\\\\c\\nd"} ' in [
+        line[:line.index('} ') + 2] for line in lines]
+
+
+@pytest.mark.parametrize('structured', [False, True], ids=['array', 'numpy'])
+def test_columnar_counters(structured):
+    if structured:
+        pytest.importorskip('numpy')
+    interfaces = mocked('get_interfaces_counters', 'show_interfaces.json')['interfaces']
+    dicts = metrics_exporter({('switch1', 'get_interfaces_counters'):
+                              mocked('get_interfaces_counters')})
+    columns = metrics_exporter({('switch1', 'get_interfaces_counters'):
+                                columnar.interfaces_counters(interfaces, structured=structured)})
+    try:
+        expected = samples(''.join(dicts.generate()))
+        assert samples(''.join(columns.generate())) == expected
+        assert [line for line in expected if line.startswith('eos_interface_')]
+        assert not columns.export_errors
+    finally:
+        dicts.stop()
+        columns.stop()
+
+
+def test_unexpected_result():
+    metrics = metrics_exporter({('switch1', 'get_environment'): {'fans': None}})
+    try:
+        text = ''.join(metrics.generate())
+        text = ''.join(metrics.generate())
+    finally:
+        metrics.stop()
+    # counted for every metric left out, on every scrape
+    errors = 2 * len([metric for metric in exporter.METRICS if metric[3] == 'get_environment'])
+    assert 'eos_export_errors_total{{device="switch1",getter="get_environment"}} {}'.format(
+        errors) in samples(text)
+    assert text.endswith('# EOF\n')
+
+
+def test_scrape(canned):
+    url = 'http://127.0.0.1:{}'.format(canned._server.server_address[1])
+    response = urlopen(url + '/metrics')
+    try:
+        assert response.info()['Content-Type'] == exporter.CONTENT_TYPE
+        body = response.read().decode('utf-8')
+    finally:
+        response.close()
+    assert body == ''.join(canned.generate())
+    with pytest.raises(HTTPError) as e:
+        urlopen(url + '/other')
+    assert e.value.code == 404
@@ -0,0 +1,106 @@
+"""Tests for the instrumentation of the eAPI calls and getters."""
+from napalm_eos import eos
+from napalm_eos.utils import instrumentation as instrumentation_module
+from napalm_eos.utils.instrumentation import Instrumentation, InstrumentedDevice, command_name
+
+
+class FakeNode(object):
+    """A pyeapi Node without HTTP connection, returning an empty output per command."""
+
+    def run_commands(self, commands, encoding='json'):
+        return [{} for command in commands]
+
+
+def test_commands_histograms_by_command():
+    instrumentation = Instrumentation()
+    device = InstrumentedDevice(FakeNode(), instrumentation)
+    device.run_commands(['show version'])
+    device.run_commands(['show version'])
+    device.run_commands(['show arp'])
+    device.run_commands(['show vrf', 'show ip interface brief'], encoding='text')
+
+    commands = instrumentation.summary()['command']
+    assert sorted(commands) == ['show arp', 'show version', 'show vrf; show ip interface brief']
+    assert commands['show version']['total']['count'] == 2
+    assert commands['show arp']['total']['count'] == 1
+
+
+def test_events():
+    events = []
+    instrumentation = Instrumentation(callbacks=[events.append])
+    device = InstrumentedDevice(FakeNode(), instrumentation)
+
+    def get_facts():
+        device.run_commands(['show version', 'show hostname'])
+        return {}
+
+    instrumentation.wrap_getter('get_facts', get_facts)()
+    command, getter = events
+    assert command['kind'] == 'command'
+    assert command['name'] == 'show version; show hostname'
+    assert 'commands' not in command
+    assert command['encoding'] == 'json'
+    assert getter['kind'] == 'getter'
+    assert getter['name'] == 'get_facts'
+    assert getter['transport'] == command['transport']
+
+
+class SessionsNode(FakeNode):
+    """A node answering 'show configuration sessions' with no pending session."""
+
+    def run_commands(self, commands, encoding='json'):
+        return [{'sessions': {}} if command == 'show configuration sessions' else {}
+                for command in commands]
+
+
+def test_config_path():
+    events = []
+    instrumentation = Instrumentation(callbacks=[events.append])
+    driver = eos.EOSDriver('localhost', 'admin', 'admin')
+    driver.device = InstrumentedDevice(SessionsNode(), instrumentation)
+    driver.load_merge_candidate(config='username admin secret s3cr3t\nhostname x')
+    driver.load_merge_candidate(config='username other secret pa55w0rd')
+    driver.discard_config()
+
+    names = sorted(instrumentation.summary()['command'])
+    assert names == ['configure session; abort', 'configure session; config',
+                     'configure session; config; show configuration sessions']
+    for event in events:
+        assert 'secret' not in repr(event)
+        assert 'napalm_' not in repr(event)
+
+
+def test_raw_commands():
+    events = []
+    instrumentation = Instrumentation(callbacks=[events.append], raw_commands=True)
+    InstrumentedDevice(FakeNode(), instrumentation).run_commands(['show ip route 10.0.0.1'])
+    assert events[0]['name'] == 'show ip route <value>'
+    assert events[0]['commands'] == ['show ip route 10.0.0.1']
+
+
+def test_command_names():
+    assert command_name(['configure session napalm_1', 'commit', 'write memory']) == \
+        'configure session; commit; write memory'
+    assert command_name(['show ip route vrf VRF1 11.0.0.1 bgp detail']) == \
+        'show ip route vrf <vrf> <value> bgp detail'
+    assert command_name(['show ipv6 bgp neighbors 2001:db8::1 vrf all']) == \
+        'show ipv6 bgp neighbors <value> vrf <vrf>'
+    assert command_name(['ping vrf mgmt 10.0.0.1 source Ethernet1 repeat 5']) == \
+        'ping vrf <vrf> <value> source <interface> repeat <value>'
+    assert command_name(['show interfaces Et1/1,Po1', 'show interfaces Ethernet1-2']) == \
+        'show interfaces <interface>; show interfaces <interface>'
+    assert command_name(['configure replace flash:rollback-1-abc']) == 'configure replace <file>'
+    assert command_name(['show running-config | section router bgp']) == \
+        'show running-config | section <pattern>'
+
+
+def test_names_bounded(monkeypatch):
+    monkeypatch.setattr(instrumentation_module, 'MAX_NAMES', 2)
+    instrumentation = Instrumentation()
+    device = InstrumentedDevice(FakeNode(), instrumentation)
+    for command in ('show version', 'show arp', 'show clock', 'show hostname', 'show version'):
+        device.run_commands([command])
+    commands = instrumentation.summary()['command']
+    assert sorted(commands) == ['other', 'show arp', 'show version']
+    assert commands['other']['total']['count'] == 2
+    assert commands['show version']['total']['count'] == 2
@@ -0,0 +1,39 @@
+"""Tests for the interfaces filter of get_interfaces and get_interfaces_counters."""
+import pytest
+
+from napalm_base.exceptions import CommandErrorException
+from napalm_base.test.getters import wrap_test_cases
+
+from napalm_eos import eos
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestInterfacesFilter(object):
+    """Test the getters with an interfaces filter."""
+
+    @wrap_test_cases
+    def test_get_interfaces_filtered(self, test_case):
+        with eos.interfaces_filter(self.device, 'Ethernet1-2'):
+            return self.device.get_interfaces()
+
+    @wrap_test_cases
+    def test_get_interfaces_counters_filtered(self, test_case):
+        with eos.interfaces_filter(self.device, ['Ethernet1', 'Port-Channel1']):
+            return self.device.get_interfaces_counters()
+
+    @wrap_test_cases
+    def test_get_interfaces_counters_light_filtered(self, test_case):
+        self.device.lightweight_counters = True
+        try:
+            with eos.interfaces_filter(self.device, ['Ethernet1', 'Port-Channel1']):
+                return self.device.get_interfaces_counters()
+        finally:
+            self.device.lightweight_counters = False
+
+    def test_interfaces_filter_invalid(self):
+        self.device.device.current_test = 'test_interfaces_filter_invalid'
+        self.device.device.current_test_case = 'normal'
+        with eos.interfaces_filter(self.device, 'Foo1'):
+            with pytest.raises(CommandErrorException):
+                self.device.get_interfaces()
+        assert self.device.interfaces is None
@@ -0,0 +1,123 @@
+"""Tests for the endpoint locator."""
+import pytest
+
+from napalm_eos.locator import EndpointLocator
+
+HOST = '00:00:00:00:00:05'
+ROUTED_HOST = '00:00:00:00:00:06'
+
+
+def arp(ip, mac, interface):
+    return {'interface': interface, 'mac': mac, 'ip': ip, 'age': 0.0}
+
+
+def mac_entry(mac, interface, vlan=10):
+    return {'mac': mac, 'interface': interface, 'vlan': vlan, 'static': False, 'active': True,
+            'moves': 1, 'last_move': 0.0}
+
+
+def lldp(hostname, port):
+    return [{'hostname': hostname, 'port': port}]
+
+
+# the core switch routes VLAN 10 and reaches the host through access1, the router resolves
+# a host on a routed port and does not switch at all
+TABLES = {
+    'core': ([arp('10.0.0.5', HOST, 'Vlan10')],
+             [mac_entry(HOST, 'Ethernet1')],
+             {'Ethernet1': lldp('access1.example.net', 'Ethernet49')}),
+    'access1': ([],
+                [mac_entry(HOST, 'Ethernet10'), mac_entry(ROUTED_HOST, 'Ethernet11')],
+                {'Ethernet49': lldp('core.example.net', 'Ethernet1')}),
+    'router': ([arp('10.0.0.6', ROUTED_HOST, 'Ethernet2')], [], {}),
+}
+
+
+class FakeDriver(object):
+    """An opened driver returning the tables of a device."""
+
+    def __init__(self, hostname, arp_table, mac_table, lldp_neighbors):
+        self.hostname = hostname
+        self.tables = arp_table, mac_table, lldp_neighbors
+
+    def get_facts(self):
+        return {'hostname': self.hostname, 'fqdn': self.hostname + '.example.net'}
+
+    def get_arp_table(self):
+        return self.tables[0]
+
+    def get_mac_address_table(self):
+        return self.tables[1]
+
+    def get_lldp_neighbors(self):
+        return self.tables[2]
+
+
+@pytest.fixture
+def locator():
+    locator = EndpointLocator()
+    for device, (arp_table, mac_table, lldp_neighbors) in sorted(TABLES.items()):
+        locator.add(device, arp_table, mac_table, lldp_neighbors,
+                    names=(device, device + '.example.net'))
+    return locator
+
+
+def test_locate_ip_follows_lldp(locator):
+    assert len(locator) == 3
+    assert locator.locate('10.0.0.5') == [{
+        'ip': '10.0.0.5',
+        'mac': HOST,
+        'device': 'access1',
+        'interface': 'Ethernet10',
+        'vlan': 10,
+        'path': [{'device': 'core', 'interface': 'Ethernet1'},
+                 {'device': 'access1', 'interface': 'Ethernet10'}],
+    }]
+
+
+def test_locate_mac(locator):
+    # the shortest path to the edge port, from access1 itself
+    assert locator.locate('0000.0000.0005') == [{
+        'ip': '',
+        'mac': HOST,
+        'device': 'access1',
+        'interface': 'Ethernet10',
+        'vlan': 10,
+        'path': [{'device': 'access1', 'interface': 'Ethernet10'}],
+    }]
+
+
+def test_locate_ip_resolved_by_router(locator):
+    assert locator.locate('10.0.0.6') == [{
+        'ip': '10.0.0.6',
+        'mac': ROUTED_HOST,
+        'device': 'access1',
+        'interface': 'Ethernet11',
+        'vlan': 10,
+        'path': [{'device': 'access1', 'interface': 'Ethernet11'}],
+    }]
+
+
+def test_locate_unknown(locator):
+    assert locator.locate('10.0.0.7') == []
+    assert locator.locate('00:00:00:00:00:07') == []
+
+
+def test_remove(locator):
+    locator.remove('access1')
+    assert len(locator) == 2
+    # core is now the edge
+    assert [(location['device'], location['interface'])
+            for location in locator.locate('10.0.0.5')] == [('core', 'Ethernet1')]
+    assert locator.locate('10.0.0.6') == []
+    locator.remove('access1')
+
+
+def test_collect_replaces_device(locator):
+    driver = FakeDriver('core', [], [mac_entry(HOST, 'Ethernet1')],
+                        {'Ethernet1': lldp('access1', 'Ethernet49')})
+    locator.collect(driver)
+    assert len(locator) == 3
+    assert locator.locate('10.0.0.5') == []
+    assert [location['path'] for location in locator.locate(HOST)] == [
+        [{'device': 'access1', 'interface': 'Ethernet10'}]]
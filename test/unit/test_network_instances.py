@@ -0,0 +1,21 @@
+"""Tests for get_network_instances with a name."""
+import pytest
+
+from napalm_base.test.getters import wrap_test_cases
+
+# the network instance each mocked case asks for
+NAMES = {
+    'default': 'default',
+    'vrf': 'TEST',
+    'missing': 'NOPE',
+}
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestNetworkInstances(object):
+    """Test get_network_instances on a single instance."""
+
+    @wrap_test_cases
+    def test_get_network_instances_by_name(self, test_case):
+        # a VRF only runs 'show vrf <name>', a missing one fails with a CommandError
+        return self.device.get_network_instances(NAMES[test_case])
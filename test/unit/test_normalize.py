@@ -0,0 +1,27 @@
+"""Tests for the memoized normalization of MAC and IP addresses."""
+import napalm_base.helpers
+import pytest
+
+from napalm_eos.utils import normalize
+
+
+@pytest.mark.parametrize('raw', [
+    '01:23:45:67:89:AB',
+    '01:23:45:67:89:ab',
+    '0123.4567.89ab',
+    '0123.4567.89AB',
+    '01-23-45-67-89-ab',
+    '0123456789ab',
+])
+def test_mac(raw):
+    assert normalize.mac(raw) == napalm_base.helpers.mac(raw) == '01:23:45:67:89:AB'
+
+
+@pytest.mark.parametrize('addr', [
+    '10.0.0.1',
+    '2001:DB8::1',
+    '2001:0db8:0000::0001',
+    'fe80::1',
+])
+def test_ip(addr):
+    assert normalize.ip(addr) == napalm_base.helpers.ip(addr)
@@ -0,0 +1,33 @@
+"""Tests for the optics_window and optics_lanes options of get_optics."""
+import json
+
+import pytest
+
+from napalm_base.test.getters import dict_diff, wrap_test_cases
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestOptics(object):
+    """Test get_optics with its optional arguments."""
+
+    @wrap_test_cases
+    def test_get_optics_lanes(self, test_case):
+        self.device.optics_lanes = True
+        try:
+            return self.device.get_optics()
+        finally:
+            self.device.optics_lanes = False
+
+    def test_get_optics_window(self):
+        # avg, min and max over the last two of three samples
+        fake_device = self.device.device
+        fake_device.current_test = 'test_get_optics_window'
+        self.device.optics_window = 2
+        try:
+            for sample in ('sample1', 'sample2', 'sample3'):
+                fake_device.current_test_case = sample
+                result = self.device.get_optics()
+        finally:
+            self.device.optics_window = 0
+            self.device._optics_samples = {}
+        assert not dict_diff(json.loads(json.dumps(result)), fake_device.expected_result)
@@ -0,0 +1,116 @@
+"""Tests for the sampled profiles of the getters."""
+import threading
+
+from napalm_eos import eos
+from napalm_eos.utils import profiling
+from napalm_eos.utils.profiling import Profiler, profile_getters
+
+
+class Driver(object):
+    """A driver with getters answering at once."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_facts(self):
+        self.calls += 1
+        return {'hostname': 'localhost', 'calls': self.calls}
+
+    def get_arp_table(self):
+        return []
+
+    def cli(self, commands):
+        return dict((command, '') for command in commands)
+
+    def open(self):
+        pass
+
+
+def reports(tmpdir, extension):
+    return sorted(path.basename for path in tmpdir.listdir('*.' + extension))
+
+
+def test_selects(tmpdir):
+    profiler = Profiler(str(tmpdir))
+    assert [name for name in ('get_facts', 'cli', 'open', 'getters') if profiler.selects(name)] \
+        == ['get_facts', 'cli']
+    profiler = Profiler(str(tmpdir), getters=['get_arp_table'])
+    assert not profiler.selects('get_facts')
+    assert profiler.selects('get_arp_table')
+
+
+def test_sample(tmpdir):
+    driver = Driver()
+    profile_getters(driver, Profiler(str(tmpdir), sample=3))
+    results = [driver.get_facts() for _ in range(7)]
+    assert [result['calls'] for result in results] == list(range(1, 8))
+    # the 1st, 4th and 7th calls
+    assert len(reports(tmpdir, 'prof')) == 3
+    # counted per getter
+    driver.get_arp_table()
+    assert len(reports(tmpdir, 'prof')) == 4
+
+
+def test_reports(tmpdir):
+    driver = Driver()
+    profile_getters(driver, Profiler(str(tmpdir.join('profiles')), top=5))
+    driver.cli(['show version'])
+    prof, = reports(tmpdir.join('profiles'), 'prof')
+    txt, = reports(tmpdir.join('profiles'), 'txt')
+    assert prof.startswith('cli-') and prof.endswith('-0.prof')
+    assert txt == prof[:-len('prof')] + 'txt'
+    report = tmpdir.join('profiles', txt).read()
+    assert report.startswith('cli took ')
+    assert 'cumulative' in report
+    if profiling.tracemalloc is not None:
+        assert 'peak traced memory: ' in report
+
+
+def test_concurrent_calls_skipped(tmpdir):
+    driver = Driver()
+    results = []
+
+    def get_facts():
+        # a call of another thread while this one is profiled
+        thread = threading.Thread(target=lambda: results.append(driver.get_arp_table()))
+        thread.start()
+        thread.join()
+        return {}
+
+    driver.get_facts = get_facts
+    profile_getters(driver, Profiler(str(tmpdir)))
+    driver.get_facts()
+    assert results == [[]]
+    assert [name.split('-')[0] for name in reports(tmpdir, 'prof')] == ['get_facts']
+    # profiled again once the first call is done
+    driver.get_arp_table()
+    assert len(reports(tmpdir, 'prof')) == 2
+
+
+def test_profiling_restores_methods(tmpdir):
+    driver = Driver()
+
+    def cli(commands):
+        return {}
+
+    driver.cli = cli
+    with profiling.profiling(driver, str(tmpdir), getters=['get_facts', 'cli']) as profiler:
+        assert isinstance(profiler, Profiler)
+        assert 'get_facts' in driver.__dict__
+        assert driver.cli is not cli
+        driver.get_facts()
+        driver.cli(['show version'])
+        driver.get_arp_table()
+    assert 'get_facts' not in driver.__dict__
+    assert driver.cli is cli
+    assert [name.split('-')[0] for name in reports(tmpdir, 'prof')] == ['cli', 'get_facts']
+    driver.get_facts()
+    assert len(reports(tmpdir, 'prof')) == 2
+
+
+def test_driver_option(tmpdir):
+    driver = eos.EOSDriver('localhost', 'admin', 'admin', optional_args={
+        'profile_dir': str(tmpdir), 'profile_getters': ['get_facts'], 'profile_sample': 2})
+    assert driver.profiler.sample == 2
+    assert 'get_facts' in driver.__dict__
+    assert 'get_arp_table' not in driver.__dict__
@@ -0,0 +1,131 @@
+"""Tests for the compact rows of the table getters."""
+import json
+import pickle
+
+import pytest
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    # python 2
+    from collections import Mapping
+
+from napalm_eos.utils import records
+from napalm_eos.utils.records import ArpEntry, RouteEntry, json_default
+from napalm_eos.utils.snapshot import Snapshot
+
+
+def arp_entry(ip='10.0.0.1', age=1.0):
+    return ArpEntry('Ethernet1', 'AA:AA:AA:AA:AA:01', ip, age)
+
+
+def route_entry():
+    return RouteEntry(True, True, 0, '10.0.0.2', 'eBGP', 'Ethernet1', 200, '', 'default', True,
+                      {'local_as': 65000, 'as_path': '65001'})
+
+
+def test_rows_are_mappings():
+    entry = arp_entry()
+    assert isinstance(entry, Mapping)
+    assert not hasattr(entry, '__dict__')
+    assert entry == {'interface': 'Ethernet1', 'mac': 'AA:AA:AA:AA:AA:01', 'ip': '10.0.0.1',
+                     'age': 1.0}
+    assert {'interface': 'Ethernet1', 'mac': 'AA:AA:AA:AA:AA:01', 'ip': '10.0.0.1',
+            'age': 1.0} == entry
+    assert entry != arp_entry(age=2.0)
+    assert ArpEntry(interface='Ethernet1', mac='AA:AA:AA:AA:AA:01', ip='10.0.0.1',
+                    age=1.0) == entry
+    assert dict(entry) == entry.to_dict()
+    assert type(entry.to_dict()) is dict
+    assert entry['ip'] == entry.get('ip') == '10.0.0.1'
+    assert entry.get('vlan', 1) == 1
+    assert 'mac' in entry and 'vlan' not in entry
+    assert list(entry) == ['interface', 'mac', 'ip', 'age']
+    with pytest.raises(KeyError):
+        entry['vlan']
+
+
+def test_rows_macs():
+    entry = arp_entry()
+    assert isinstance(entry._mac, int)
+    assert entry['mac'] == entry.mac == 'AA:AA:AA:AA:AA:01'
+    assert ArpEntry('Ethernet1', '00:00:00:00:00:01', '10.0.0.1', 1.0)['mac'] == \
+        '00:00:00:00:00:01'
+    # anything else is kept as given
+    for mac in ('aa:aa:aa:aa:aa:01', 'unknown', None):
+        assert ArpEntry('Ethernet1', mac, '10.0.0.1', 1.0)['mac'] == mac
+
+
+def test_rows_fields():
+    for fields in ((), ('Ethernet1', 'AA:AA:AA:AA:AA:01', '10.0.0.1', 1.0, None)):
+        with pytest.raises(TypeError):
+            ArpEntry(*fields)
+    with pytest.raises(TypeError):
+        ArpEntry('Ethernet1', 'AA:AA:AA:AA:AA:01', '10.0.0.1', 1.0, vlan=1)
+    with pytest.raises(TypeError):
+        ArpEntry('Ethernet1', 'AA:AA:AA:AA:AA:01', '10.0.0.1', 1.0, age=1.0)
+
+
+def test_rows_json():
+    rows = [arp_entry(), route_entry()]
+    with pytest.raises(TypeError):
+        json.dumps(rows)
+    assert json.loads(json.dumps(rows, default=json_default)) == rows
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=json_default)
+
+
+def test_rows_are_read_only():
+    entry = arp_entry()
+    for mutate in (lambda: entry.__setitem__('age', 2.0), lambda: setattr(entry, 'age', 2.0),
+                   lambda: setattr(entry, 'vlan', 1), lambda: delattr(entry, 'age'),
+                   lambda: entry.__delitem__('age')):
+        with pytest.raises((TypeError, AttributeError)):
+            mutate()
+    assert entry['age'] == 1.0
+    copy = entry.to_dict()
+    copy['age'] = 2.0
+    assert entry['age'] == 1.0
+
+
+def test_rows_are_hashable():
+    assert hash(arp_entry()) == hash(arp_entry())
+    assert len(set([arp_entry(), arp_entry(), arp_entry(age=2.0)])) == 2
+    # the nested protocol attributes are hashed too
+    assert hash(route_entry()) == hash(route_entry())
+
+
+def test_rows_pickle():
+    for entry in (arp_entry(), route_entry()):
+        loaded = pickle.loads(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+        assert type(loaded) is type(entry)
+        assert loaded == entry
+    assert pickle.loads(pickle.dumps(arp_entry(), 0)) == arp_entry()
+
+
+def test_rows_intern_names():
+    interface = ''.join(['Ethernet', '1'])
+    assert ArpEntry(interface, 'AA:AA:AA:AA:AA:01', '10.0.0.1', 1.0)['interface'] is \
+        arp_entry()['interface']
+
+
+def test_rows_snapshot():
+    snapshot = Snapshot(key=lambda entry: entry['ip'], ignore=('age',))
+    snapshot.diff([arp_entry('10.0.0.1'), arp_entry('10.0.0.2')])
+    diff = snapshot.diff([arp_entry('10.0.0.1', age=5.0), arp_entry('10.0.0.3')])
+    assert diff['added'] == [arp_entry('10.0.0.3')]
+    assert diff['removed'] == [arp_entry('10.0.0.2')]
+    assert diff['changed'] == []
+
+
+def test_intern_table(monkeypatch):
+    monkeypatch.setattr(records, '_intern', records._intern_table)
+    monkeypatch.setattr(records, 'INTERN_MAXSIZE', 2)
+    monkeypatch.setattr(records, '_interned', {})
+    first = records.intern_string(''.join(['Ethernet', '1']))
+    assert records.intern_string(''.join(['Ethernet', '1'])) is first
+    assert records.intern_string(None) is None
+    records.intern_string('Ethernet2')
+    # full: emptied before the next string is added
+    records.intern_string('Ethernet3')
+    assert records._interned == {'Ethernet3': 'Ethernet3'}
@@ -0,0 +1,66 @@
+"""Tests for the offline longest prefix match index."""
+import pytest
+
+from napalm_eos import eos
+from napalm_eos.route_index import RouteIndex
+from napalm_eos.test.generator import DeviceGenerator
+
+
+class GeneratedDevice(object):
+    """A device answering from a DeviceGenerator, as pyeapi would."""
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def run_commands(self, commands, encoding='json'):
+        outputs = [self.generator.output(command, encoding) for command in commands]
+        if encoding == 'json':
+            return outputs
+        return [{'output': output} for output in outputs]
+
+
+@pytest.fixture(scope='module')
+def driver():
+    generator = DeviceGenerator(vrfs=2, bgp_peers=4, routes=20, mac_addresses=0,
+                                arp_entries=0, now=1500000000.0)
+    driver = eos.EOSDriver('localhost', 'admin', 'admin')
+    driver.device = GeneratedDevice(generator)
+    return driver
+
+
+def without_bgp_attributes(routes):
+    # the index does not read the protocol_attributes of BGP routes from 'show ip bgp'
+    for next_hops in routes.values():
+        for route in next_hops:
+            if 'BGP' in route['protocol']:
+                route['protocol_attributes'] = {}
+    return routes
+
+
+@pytest.mark.parametrize('destination', [
+    '11.0.3.7',
+    '11.0.0.0/24',
+    '172.31.255.1',
+    '10.0.1.1',
+    '9.9.9.9',
+])
+@pytest.mark.parametrize('protocol', ['', 'bgp', 'connected', 'direct'])
+def test_route_to(driver, destination, protocol):
+    index = RouteIndex(driver)
+    index.refresh()
+    expected = without_bgp_attributes(driver.get_route_to(destination, protocol))
+    assert index.route_to(destination, protocol) == expected
+
+
+def test_longest_match(driver):
+    index = RouteIndex(driver)
+    assert index.refresh() == {'added': 31, 'changed': 0, 'removed': 0}
+    assert index.longest_match('11.0.3.7') == '11.0.3.0/24'
+    assert index.longest_match('172.31.255.1') == '172.31.255.1/32'
+    assert index.longest_match('9.9.9.9') is None
+    assert index.refresh() == {'added': 0, 'changed': 0, 'removed': 0}
+
+
+def test_route_to_invalid(driver):
+    index = RouteIndex(driver)
+    assert index.route_to('not an address') == driver.get_route_to('not an address')
@@ -0,0 +1,114 @@
+"""Tests for the poll scheduler."""
+import threading
+
+from napalm_eos.scheduler import PollScheduler, open_lane
+
+
+class FakeDriver(object):
+    """A driver whose heavy getter blocks until it is released."""
+
+    def __init__(self, hostname, username, password, timeout=60, optional_args=None):
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.optional_args = optional_args
+        self.opened = False
+        self.closed = False
+        self.heavy_started = threading.Event()
+        self.release = threading.Event()
+        self.light_done = threading.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def open(self):
+        self.opened = True
+
+    def close(self):
+        self.closed = True
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def get_bgp_neighbors_detail(self):
+        self._enter()
+        self.heavy_started.set()
+        self.release.wait(5)
+        self._exit()
+        return {'heavy': True}
+
+    def get_environment(self):
+        self._enter()
+        self._exit()
+        self.light_done.set()
+        return {'light': True}
+
+
+def test_light_getter_runs_while_heavy_in_flight():
+    driver = FakeDriver('switch1', 'admin', 'admin')
+    lanes = []
+
+    def lane_factory(driver):
+        lane = FakeDriver(driver.hostname, driver.username, driver.password)
+        lane.release = driver.release
+        lane.heavy_started = driver.heavy_started
+        lanes.append(lane)
+        return lane
+
+    scheduler = PollScheduler(max_workers=2, jitter=0, lane_factory=lane_factory)
+    heavy = scheduler.add(driver, 'get_bgp_neighbors_detail', 60)
+    scheduler.start()
+    try:
+        assert driver.heavy_started.wait(5)
+        light = scheduler.add(driver, 'get_environment', 60)
+        # the light getter completes while the heavy one is still blocked
+        assert driver.light_done.wait(5)
+        assert heavy.runs == 0
+        assert light.runs == 1
+        assert light.last_result == {'light': True}
+    finally:
+        driver.release.set()
+        scheduler.stop()
+    assert heavy.runs == 1
+    assert heavy.last_result == {'heavy': True}
+    # each connection only ever ran one getter at a time
+    assert driver.max_in_flight == 1
+    assert [lane.max_in_flight for lane in lanes] == [1]
+    assert lanes[0].closed and not driver.closed
+
+
+def test_single_lane_serializes_device():
+    driver = FakeDriver('switch1', 'admin', 'admin')
+    scheduler = PollScheduler(max_workers=2, jitter=0, lane_factory=None)
+    heavy = scheduler.add(driver, 'get_bgp_neighbors_detail', 60)
+    scheduler.start()
+    try:
+        assert driver.heavy_started.wait(5)
+        light = scheduler.add(driver, 'get_environment', 60)
+        assert not driver.light_done.wait(0.2)
+        assert light.runs == 0
+        driver.release.set()
+        assert driver.light_done.wait(5)
+    finally:
+        driver.release.set()
+        scheduler.stop()
+    assert heavy.runs == 1
+    assert driver.max_in_flight == 1
+
+
+def test_open_lane():
+    driver = FakeDriver('switch1', 'admin', 'pwd', timeout=10,
+                        optional_args={'record': '/tmp/archive', 'port': 8443})
+    lane = open_lane(driver)
+    assert lane is not driver
+    assert lane.opened
+    assert (lane.hostname, lane.username, lane.password, lane.timeout) == \
+        ('switch1', 'admin', 'pwd', 10)
+    assert lane.optional_args == {'port': 8443}
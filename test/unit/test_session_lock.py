@@ -0,0 +1,129 @@
+"""Tests for the configuration session lock."""
+import time
+
+import pytest
+
+from napalm_base.exceptions import SessionLockedException
+
+from napalm_eos.utils import session_lock
+from napalm_eos.utils.session_lock import SessionLock
+
+
+class SessionsDevice(object):
+    """A device only keeping track of its configuration sessions."""
+
+    def __init__(self, *pending):
+        self.sessions = dict((name, 'pending') for name in pending)
+        self.requests = []
+        # called with the device before each request, to act as a concurrent writer
+        self.before = []
+
+    def run_commands(self, commands):
+        self.requests.append(commands)
+        if self.before:
+            self.before.pop(0)(self)
+        output = []
+        session = None
+        for command in commands:
+            if command.startswith('configure session '):
+                session = command.split()[-1]
+                self.sessions.setdefault(session, 'pending')
+            elif command == 'abort':
+                del self.sessions[session]
+            elif command == 'show configuration sessions':
+                output.append({'sessions': dict(
+                    (name, {'state': state}) for name, state in self.sessions.items())})
+                continue
+            output.append({})
+        return output
+
+
+def names(*sequence):
+    sequence = list(sequence)
+    return lambda: sequence.pop(0)
+
+
+def test_session_names_sort_by_creation():
+    first = session_lock.session_name()
+    assert first.startswith('napalm_')
+    assert first != session_lock.session_name()
+    time.sleep(0.002)
+    assert first < session_lock.session_name()
+
+
+def test_pending_sessions():
+    sessions = {
+        'napalm_1': {'state': 'pending'},
+        'napalm_2': {'state': 'completed'},
+        'napalm_3': {'state': 'pending'},
+    }
+    assert session_lock.pending_sessions(sessions) == ['napalm_1', 'napalm_3']
+    assert session_lock.pending_sessions(sessions, 'napalm_1') == ['napalm_3']
+
+
+def test_acquire_pushes_in_one_request():
+    device = SessionsDevice()
+    lock = SessionLock(device, names=names('napalm_1'))
+    assert lock.acquire(['hostname a']) == [{}, {}]
+    assert lock.session == 'napalm_1'
+    assert device.requests == [
+        ['configure session napalm_1', 'hostname a', 'show configuration sessions'],
+    ]
+
+
+def test_acquire_gives_way_while_locked():
+    device = SessionsDevice('other')
+    lock = SessionLock(device, names=names('napalm_1'))
+    with pytest.raises(SessionLockedException):
+        lock.acquire(['hostname a'])
+    assert lock.session is None
+    assert device.requests == [
+        ['configure session napalm_1', 'hostname a', 'show configuration sessions'],
+        ['configure session napalm_1', 'abort'],
+    ]
+    assert device.sessions == {'other': 'pending'}
+
+
+def test_acquire_waits_for_the_lock(monkeypatch):
+    monkeypatch.setattr(session_lock.time, 'sleep', lambda delay: None)
+    device = SessionsDevice('other')
+    # the other writer commits after our first poll
+    device.before = [lambda d: None, lambda d: None, lambda d: None,
+                     lambda d: d.sessions.clear()]
+    lock = SessionLock(device, timeout=60, names=names('napalm_1', 'napalm_2'))
+    lock.acquire(['hostname a'])
+    assert lock.session == 'napalm_2'
+    assert device.sessions == {'napalm_2': 'pending'}
+    assert device.requests[2:4] == [['show configuration sessions']] * 2
+
+
+def test_acquire_first_writer_wins():
+    # both writers pushed at once, and the second one opened its session first
+    device = SessionsDevice()
+    device.before = [lambda d: d.sessions.update({'napalm_2': 'pending'})]
+    lock = SessionLock(device, names=names('napalm_1'))
+    lock.acquire(['hostname a'])
+    assert lock.session == 'napalm_1'
+
+    device = SessionsDevice()
+    device.before = [lambda d: d.sessions.update({'napalm_0': 'pending'})]
+    lock = SessionLock(device, names=names('napalm_1'))
+    with pytest.raises(SessionLockedException):
+        lock.acquire(['hostname a'])
+    assert lock.session is None
+    assert device.sessions == {'napalm_0': 'pending'}
+
+
+def test_acquire_leaves_failed_session():
+    class FailingDevice(SessionsDevice):
+        def run_commands(self, commands):
+            output = super(FailingDevice, self).run_commands(commands)
+            if 'typo' in commands:
+                raise ValueError('invalid command')
+            return output
+
+    device = FailingDevice()
+    lock = SessionLock(device, names=names('napalm_1'))
+    with pytest.raises(ValueError):
+        lock.acquire(['typo'])
+    assert lock.session == 'napalm_1'
@@ -0,0 +1,135 @@
+"""Tests for the change-only snapshots of the table getters."""
+from napalm_eos.utils import snapshot
+from napalm_eos.utils.records import ArpEntry, MacEntry
+from napalm_eos.utils.snapshot import ChangeTracker, Snapshot
+
+
+def arp(ip, mac, age=0.0, interface='Ethernet1', compact=False):
+    if compact:
+        return ArpEntry(interface, mac, ip, age)
+    return {'interface': interface, 'mac': mac, 'ip': ip, 'age': age}
+
+
+def test_snapshot_diff():
+    snap = Snapshot(key=lambda entry: entry['ip'], ignore=('age',))
+    first = [arp('10.0.0.1', 'AA:AA:AA:AA:AA:01'), arp('10.0.0.2', 'AA:AA:AA:AA:AA:02')]
+    assert snap.diff(first) == {'added': first, 'removed': [], 'changed': []}
+
+    second = [
+        arp('10.0.0.1', 'AA:AA:AA:AA:AA:01', age=30.0),
+        arp('10.0.0.3', 'AA:AA:AA:AA:AA:03'),
+        arp('10.0.0.2', 'AA:AA:AA:AA:AA:FF'),
+    ]
+    assert snap.diff(second) == {
+        'added': [second[1]],
+        'removed': [],
+        'changed': [second[2]],
+    }
+    diff = snap.diff(second[:1])
+    assert diff['added'] == diff['changed'] == []
+    assert sorted(diff['removed'], key=lambda entry: entry['ip']) == \
+        sorted(second[1:], key=lambda entry: entry['ip'])
+
+    snap.clear()
+    assert snap.diff(second[:1])['added'] == second[:1]
+
+
+def test_snapshot_nested_values():
+    snap = Snapshot(key=lambda entry: entry['name'])
+    snap.diff([{'name': 'a', 'attributes': {'as_path': [1, 2]}}])
+    changed = [{'name': 'a', 'attributes': {'as_path': [1, 3]}}]
+    assert snap.diff(changed)['changed'] == changed
+
+
+def test_snapshot_hash_collision(monkeypatch):
+    # every entry hashes the same, changes are still found on the values
+    monkeypatch.setattr(snapshot, 'hash', lambda value: 0, raising=False)
+    snap = Snapshot(key=lambda entry: entry['ip'])
+    snap.diff([arp('10.0.0.1', 'AA:AA:AA:AA:AA:01')])
+    changed = [arp('10.0.0.1', 'AA:AA:AA:AA:AA:02')]
+    assert snap.diff(changed)['changed'] == changed
+    assert snap.diff(changed)['changed'] == []
+
+
+def test_snapshot_compact_rows():
+    snap = Snapshot(key=lambda entry: entry['ip'], ignore=('age',))
+    snap.diff([arp('10.0.0.1', 'AA:AA:AA:AA:AA:01', compact=True)])
+    same = [arp('10.0.0.1', 'AA:AA:AA:AA:AA:01', age=60.0, compact=True)]
+    assert snap.diff(same)['changed'] == []
+    changed = [arp('10.0.0.1', 'AA:AA:AA:AA:AA:02', compact=True)]
+    assert snap.diff(changed)['changed'] == changed
+    # compact rows and dicts of the same values are the same entry
+    assert snap.diff([arp('10.0.0.1', 'AA:AA:AA:AA:AA:02')])['changed'] == []
+
+
+class FakeDriver(object):
+    """A driver returning the next of the prepared results of each getter."""
+
+    def __init__(self, **results):
+        self.results = results
+
+    def __getattr__(self, name):
+        results = self.results[name]
+        return lambda *args: results.pop(0)
+
+
+def test_change_tracker_arp_table():
+    driver = FakeDriver(get_arp_table=[
+        [arp('10.0.0.1', 'AA:AA:AA:AA:AA:01', compact=True)],
+        [arp('10.0.0.1', 'AA:AA:AA:AA:AA:01', age=5.0, compact=True),
+         arp('10.0.0.2', 'AA:AA:AA:AA:AA:02', compact=True)],
+    ])
+    tracker = ChangeTracker(driver)
+    assert len(tracker.get_arp_table()['added']) == 1
+    diff = tracker.get_arp_table()
+    assert [entry['ip'] for entry in diff['added']] == ['10.0.0.2']
+    assert diff['changed'] == diff['removed'] == []
+
+
+def test_change_tracker_mac_address_table():
+    def mac(vlan, interface):
+        return MacEntry('AA:AA:AA:AA:AA:01', interface, vlan, True, False, 1, 0.0)
+
+    driver = FakeDriver(get_mac_address_table=[
+        [mac(10, 'Ethernet1'), mac(20, 'Ethernet1')],
+        [mac(10, 'Ethernet2'), mac(30, 'Ethernet1')],
+    ])
+    tracker = ChangeTracker(driver)
+    tracker.get_mac_address_table()
+    diff = tracker.get_mac_address_table()
+    assert [(entry['vlan'], entry['interface']) for entry in diff['changed']] == \
+        [(10, 'Ethernet2')]
+    assert [entry['vlan'] for entry in diff['added']] == [30]
+    assert [entry['vlan'] for entry in diff['removed']] == [20]
+
+
+def test_change_tracker_bgp_neighbors():
+    def neighbors(is_up, uptime):
+        return {'global': {'router_id': '1.1.1.1', 'peers': {
+            '10.0.0.1': {'is_up': is_up, 'uptime': uptime, 'remote_as': 65001},
+        }}}
+
+    driver = FakeDriver(get_bgp_neighbors=[
+        neighbors(True, 10), neighbors(True, 20), neighbors(False, 0),
+    ])
+    tracker = ChangeTracker(driver)
+    assert tracker.get_bgp_neighbors()['added'][0]['address'] == '10.0.0.1'
+    assert tracker.get_bgp_neighbors()['changed'] == []
+    changed = tracker.get_bgp_neighbors()['changed']
+    assert [(peer['vrf'], peer['address'], peer['is_up']) for peer in changed] == \
+        [('global', '10.0.0.1', False)]
+
+
+def test_change_tracker_lldp_neighbors_detail():
+    def neighbor(port, description):
+        return {'parent_interface': 'Ethernet1', 'remote_chassis_id': '00:1C:73:00:00:01',
+                'remote_port': port, 'remote_port_description': description}
+
+    driver = FakeDriver(get_lldp_neighbors_detail=[
+        {'Ethernet1': [neighbor('Ethernet9', 'uplink')]},
+        {'Ethernet1': [neighbor('Ethernet9', 'spine1')]},
+    ])
+    tracker = ChangeTracker(driver)
+    tracker.get_lldp_neighbors_detail()
+    assert [entry['remote_port_description']
+            for entry in tracker.get_lldp_neighbors_detail()['changed']] == ['spine1']
@@ -0,0 +1,120 @@
+"""Tests for the cache of the compiled configuration templates."""
+import pytest
+
+from napalm_base.base import NetworkDriver
+from napalm_base.exceptions import (DriverTemplateNotImplemented, TemplateNotImplemented,
+                                    TemplateRenderException)
+
+from napalm_eos import eos
+from napalm_eos.utils import template_cache
+
+
+class SessionsDevice(object):
+    """A device recording the requests, answering its configuration sessions."""
+
+    def __init__(self):
+        self.requests = []
+
+    def run_commands(self, commands, encoding='json'):
+        self.requests.append(commands)
+        return [{'sessions': {}} if command == 'show configuration sessions' else {}
+                for command in commands]
+
+
+@pytest.fixture
+def templates(tmpdir):
+    tmpdir.join('hostname.j2').write('hostname {{ hostname }}\n')
+    tmpdir.join('openconfig.j2').write('{% if openconfig is defined %}openconfig{% endif %}\n')
+    tmpdir.join('undefined.j2').write('hostname {{ device.hostname }}\n')
+    tmpdir.join('syntax.j2').write('hostname {% hostname %}\n')
+    return str(tmpdir)
+
+
+def driver(device, search_path=None):
+    driver = eos.EOSDriver('localhost', 'admin', 'admin')
+    driver.device = device
+    if search_path:
+        driver._template_search_path = lambda: (search_path,)
+    return driver
+
+
+def test_environment_cached(templates, tmpdir_factory):
+    environment = template_cache.get_environment([templates])
+    assert template_cache.get_environment((templates,)) is environment
+    assert template_cache.get_environment() is template_cache.get_environment(
+        [template_cache.TEMPLATES_PATH])
+    assert template_cache.get_environment([str(tmpdir_factory.mktemp('other'))]) \
+        is not environment
+    # the compiled templates are kept by the environment
+    template = environment.get_template('hostname.j2')
+    template_cache.render('hostname', [templates], hostname='a')
+    assert environment.get_template('hostname.j2') is template
+
+
+def test_environment_missing_path(tmpdir):
+    with pytest.raises(DriverTemplateNotImplemented):
+        template_cache.get_environment([str(tmpdir.join('missing'))])
+
+
+def test_render(templates):
+    assert template_cache.render('hostname', [templates], hostname='a') == 'hostname a'
+    assert template_cache.render('set_ntp_servers', servers=['10.0.0.1']).split() == [
+        'ntp', 'server', '10.0.0.1']
+
+
+def test_render_errors(templates):
+    with pytest.raises(TemplateNotImplemented) as e:
+        template_cache.render('missing')
+    assert str(e.value) == 'Config template missing.j2 is not defined under {}'.format(
+        template_cache.TEMPLATES_PATH)
+    with pytest.raises(TemplateNotImplemented) as e:
+        template_cache.render('missing', [templates])
+    assert templates in str(e.value)
+    for template_name in ('undefined', 'syntax'):
+        with pytest.raises(TemplateRenderException):
+            template_cache.render(template_name, [templates])
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_render_many(templates, processes):
+    template_vars_list = [{'hostname': 'device{}'.format(i)} for i in range(10)]
+    assert template_cache.render_many('hostname', template_vars_list, processes=processes,
+                                      search_path=[templates], chunksize=3) == [
+        'hostname device{}'.format(i) for i in range(10)]
+
+
+def test_render_many_errors(templates):
+    with pytest.raises(TemplateNotImplemented):
+        template_cache.render_many('missing', [{}, {}], processes=2, search_path=[templates])
+
+
+def test_load_template():
+    device = SessionsDevice()
+    eos_driver = driver(device)
+    eos_driver.load_template('set_ntp_servers', servers=['10.0.0.1'])
+    assert device.requests == [['configure session {}'.format(eos_driver.config_session),
+                                'ntp server 10.0.0.1', 'show configuration sessions']]
+
+
+def test_load_template_source():
+    device = SessionsDevice()
+    eos_driver = driver(device)
+    eos_driver.load_template('hostname', template_source='hostname {{ hostname }}',
+                             hostname='a')
+    assert device.requests[0][1:] == ['hostname a', 'show configuration sessions']
+
+
+def test_load_template_openconfig(templates, monkeypatch):
+    # openconfig is not a variable of the driver templates
+    device = SessionsDevice()
+    eos_driver = driver(device, templates)
+    eos_driver.load_template('openconfig', openconfig=False)
+    assert device.requests[0][1:] == ['show configuration sessions']
+
+    # and the openconfig templates are looked up by napalm_base
+    calls = []
+    monkeypatch.setattr(NetworkDriver, 'load_template',
+                        lambda self, *args, **kwargs: calls.append((args, kwargs)))
+    eos_driver.load_template('interfaces', openconfig=True, interfaces={})
+    assert calls == [(('interfaces',), {'template_source': None, 'template_path': None,
+                                        'openconfig': True, 'interfaces': {}})]
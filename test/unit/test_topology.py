@@ -0,0 +1,170 @@
+"""Tests for the LLDP topology of a fleet of devices."""
+import pytest
+
+from napalm_eos import topology
+from napalm_eos.topology import Topology, canonical_interface
+
+
+class Driver(object):
+    """A driver reporting ``neighbors`` over LLDP, counting the calls of its getters."""
+
+    def __init__(self, hostname, neighbors=None, error=None):
+        self.hostname = hostname
+        self.neighbors = neighbors or {}
+        self.error = error
+        self.calls = {}
+
+    def _call(self, getter):
+        self.calls[getter] = self.calls.get(getter, 0) + 1
+        if self.error is not None:
+            raise self.error
+
+    def get_facts(self):
+        self._call('get_facts')
+        return {'hostname': self.hostname}
+
+    def get_lldp_neighbors(self):
+        self._call('get_lldp_neighbors')
+        return dict((interface, [{'hostname': hostname, 'port': port}])
+                    for interface, (hostname, port) in self.neighbors.items())
+
+    def get_lldp_neighbors_detail(self):
+        self._call('get_lldp_neighbors_detail')
+        return dict((interface, [{
+            'remote_system_name': hostname,
+            'remote_port': port,
+            'remote_chassis_id': 'chassis-' + hostname,
+            'remote_system_description': 'Arista Networks EOS',
+            'remote_system_capab': 'bridge, router',
+        }]) for interface, (hostname, port) in self.neighbors.items())
+
+
+@pytest.mark.parametrize('name, canonical', [
+    ('Et1/1', 'Ethernet1/1'),
+    ('Ethernet1/1', 'Ethernet1/1'),
+    ('eth1', 'Ethernet1'),
+    (' Et2 ', 'Ethernet2'),
+    ('Ma1', 'Management1'),
+    ('mgmt0', 'Management0'),
+    ('Po10', 'Port-Channel10'),
+    ('Gi0/1', 'GigabitEthernet0/1'),
+    ('Te1/1', 'TenGigabitEthernet1/1'),
+    ('Vx1', 'Vxlan1'),
+    ('E1', 'E1'),
+    ('xe-0/0/0', 'xe-0/0/0'),
+    ('Unknown1', 'Unknown1'),
+])
+def test_canonical_interface(name, canonical):
+    assert canonical_interface(name) == canonical
+
+
+def test_links_counted_once():
+    graph = Topology()
+    graph.update('a', {'Et1': [{'hostname': 'b.example.com', 'port': 'Et2'}]})
+    assert graph.links() == [('a', 'Ethernet1', 'b', 'Ethernet2')]
+    assert graph.neighbors('b') == {'a': [('Ethernet2', 'Ethernet1')]}
+    assert graph.degrees() == {'a': 1, 'b': 1}
+
+    # the other end reporting the same link
+    graph.update('b', {'Ethernet2': [{'hostname': 'a', 'port': 'Ethernet1'}]})
+    assert graph.links() == [('a', 'Ethernet1', 'b', 'Ethernet2')]
+    assert graph.degrees() == {'a': 1, 'b': 1}
+
+    # still known from one end
+    graph.update('b', {})
+    assert graph.links() == [('a', 'Ethernet1', 'b', 'Ethernet2')]
+    graph.update('a', {})
+    assert graph.links() == []
+    assert graph.nodes() == ['a', 'b']
+
+
+def test_remove():
+    graph = Topology()
+    graph.update('a', {'Et1': [{'hostname': 'b', 'port': 'Et1'}],
+                       'Et2': [{'hostname': 'c', 'port': 'Et1'}]})
+    graph.update('c', {'Et1': [{'hostname': 'a', 'port': 'Et2'}]})
+    graph.remove('a')
+    # b was only known from a, c still reports its link to a
+    assert graph.nodes() == ['a', 'c']
+    assert graph.links() == [('a', 'Ethernet2', 'c', 'Ethernet1')]
+    graph.remove('c')
+    assert len(graph) == 0
+    assert 'a' not in graph
+
+
+def test_shortest_path():
+    graph = Topology()
+    # a - b - c - d and a - e - d
+    for node, neighbors in (('a', 'be'), ('b', 'c'), ('c', 'd'), ('e', 'd')):
+        graph.update(node, dict(('Et{}'.format(index), [{'hostname': neighbor, 'port': 'Et9'}])
+                                for index, neighbor in enumerate(neighbors)))
+    assert graph.shortest_path('a', 'd') == ['a', 'e', 'd']
+    assert graph.shortest_path('d', 'b') == ['d', 'c', 'b']
+    assert graph.shortest_path('a', 'a') == ['a']
+    assert graph.shortest_path('a', 'z') is None
+    graph.update('x', {'Et1': [{'hostname': 'y', 'port': 'Et1'}]})
+    assert graph.shortest_path('a', 'y') is None
+
+
+def test_refresh_changed_devices():
+    a = Driver('a.example.com', {'Et1': ('b.example.com', 'Et1')})
+    b = Driver('b.example.com', {'Et1': ('a.example.com', 'Et1')})
+    graph = Topology([a, b], workers=2)
+    assert graph.refresh() == ['a', 'b']
+    assert graph.links() == [('a', 'Ethernet1', 'b', 'Ethernet1')]
+
+    assert graph.refresh() == []
+    a.neighbors['Et2'] = ('c', 'Et1')
+    assert graph.refresh() == ['a']
+    assert graph.links() == [('a', 'Ethernet1', 'b', 'Ethernet1'),
+                             ('a', 'Ethernet2', 'c', 'Ethernet1')]
+    # the hostname is only asked once, the neighbors on every refresh
+    assert a.calls == {'get_facts': 1, 'get_lldp_neighbors': 3}
+    assert b.calls == {'get_facts': 1, 'get_lldp_neighbors': 3}
+
+
+def test_refresh_errors():
+    a = Driver('a', {'Et1': ('b', 'Et1')})
+    b = Driver('b', error=ValueError('unreachable'))
+    graph = Topology([a, b])
+    assert graph.refresh() == ['a']
+    assert list(graph.errors) == ['b']
+    assert isinstance(graph.errors['b'], ValueError)
+    # not named yet, asked again
+    b.error = None
+    assert graph.refresh() == ['b']
+    assert graph.errors == {}
+    assert b.calls['get_facts'] == 2
+
+    a.error = ValueError('unreachable')
+    assert graph.refresh() == []
+    assert list(graph.errors) == ['a']
+    # the links of a device which can not be polled are kept
+    assert graph.links() == [('a', 'Ethernet1', 'b', 'Ethernet1')]
+
+
+def test_poll():
+    drivers = [Driver('a'), Driver('b', error=ValueError('unreachable')), Driver('c')]
+    results, errors = topology.poll(drivers, 'get_facts', workers=2)
+    assert sorted(result['hostname'] for result in results.values()) == ['a', 'c']
+    assert list(errors) == [drivers[1]]
+    assert topology.poll([], 'get_facts') == ({}, {})
+
+
+def test_detail():
+    a = Driver('a', {'Et1': ('b.example.com', 'Et1')})
+    b = Driver('b', {'Et1': ('a', 'Et1')})
+    graph = Topology([a, b], detail=True)
+    graph.refresh()
+    assert graph.attributes == {
+        'a': {'chassis_id': 'chassis-a', 'description': 'Arista Networks EOS',
+              'capabilities': 'bridge, router'},
+        'b': {'chassis_id': 'chassis-b.example.com', 'description': 'Arista Networks EOS',
+              'capabilities': 'bridge, router'},
+    }
+    # only polled on the devices whose neighbors changed
+    a.neighbors['Et2'] = ('c', 'Et1')
+    assert graph.refresh() == ['a']
+    assert a.calls['get_lldp_neighbors_detail'] == 2
+    assert b.calls['get_lldp_neighbors_detail'] == 1
+    assert 'c' in graph.attributes